@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# =========================================================
+# 챗봇 답변 캐시 (TTL + LRU + single-flight)
+# =========================================================
+# "도톤보리 맛집", "감기약 추천"처럼 여러 여행자가 같은 첫 질문을 하는데,
+# temperature=0 이라 매번 같은 답을 받으려고 몇 초짜리 API 호출을 반복하고 있었습니다.
+# - 키: (선택 지역, 정규화한 첫 질문, system 프롬프트 버전) -> 프롬프트를 고치면 버전이 바뀌어 자동 무효화
+# - ttl초가 지난 답변은 버림, max_entries개를 넘으면 가장 오래 안 쓴 답변부터 삭제 (LRU)
+# - 같은 키 요청이 동시에 들어오면 첫 요청(leader)만 API를 부르고 나머지는 그 결과를 기다림 (single-flight)
+# - 첫 턴 질문만 캐시 (이어지는 대화는 앞 대화에 따라 답이 달라짐)
+#
+# 사용 예)
+#   cache = get_cache("chat")
+#   key = cache_key(region, prompt, system_text)
+#   answer, leader = cache.acquire(key)
+#   if answer is None and leader:
+#       try:    answer = call_api(); cache.complete(key, answer)
+#       except: cache.abandon(key); raise
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 512
+TTL = 6 * 3600
+# leader 답변을 기다리는 최대 시간 (넘으면 직접 호출)
+WAIT_TIMEOUT = 60
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def normalize_prompt(text):
+    """전각/반각, 대소문자, 문장부호, 공백 차이를 없앤 질문 ("도톤보리 맛집!!" == "도톤보리  맛집")"""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def prompt_version(system_text):
+    """system 프롬프트 내용으로 만든 짧은 버전 문자열"""
+    return hashlib.sha1(system_text.encode("utf-8")).hexdigest()[:12]
+
+
+def cache_key(region, prompt, system_text):
+    return (region, normalize_prompt(prompt), prompt_version(system_text))
+
+
+class AnswerCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL, wait_timeout=WAIT_TIMEOUT):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()
+        # 진행 중인 upstream 호출 (키 -> 끝나면 set 되는 Event)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _get(self, key):
+        # self._lock 안에서만 호출
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        answer, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def acquire(self, key):
+        """
+        (캐시된 답변, leader 여부)
+        - (답변, False): 캐시 적중 (다른 요청이 방금 받아온 답변 포함)
+        - (None, True): 이 요청이 upstream을 호출 -> 끝나면 complete() 또는 abandon() 필수
+        - (None, False): leader를 기다리다 시간 초과 -> 캐시 없이 직접 호출
+        """
+        waited = False
+        while True:
+            with self._lock:
+                answer = self._get(key)
+                if answer is not None:
+                    self.hits += 1
+                    if waited:
+                        self.coalesced += 1
+                    return answer, False
+                flight = self._flights.get(key)
+                if flight is None:
+                    # 첫 요청이거나 leader가 실패한 경우 -> 이 요청이 leader
+                    self._flights[key] = threading.Event()
+                    self.misses += 1
+                    return None, True
+            waited = True
+            if not flight.wait(self.wait_timeout):
+                logger.warning(f"Answer cache wait timed out ({self.wait_timeout}s): {key[1][:30]}")
+                return None, False
+
+    def complete(self, key, answer):
+        """leader가 받은 답변 저장 + 기다리던 요청 깨우기"""
+        with self._lock:
+            if answer:
+                self._entries[key] = (answer, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.set()
+
+    def abandon(self, key):
+        """leader 호출 실패 -> 기다리던 요청 중 하나가 다시 leader가 됨"""
+        self.complete(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "in_flight": len(self._flights),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+def get_cache(name, **options):
+    """이름별 AnswerCache (프로세스당 1개, 모든 세션이 공유)"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = AnswerCache(**options)
+        return _caches[name]
@@ -1,5 +1,7 @@
 import streamlit as st
 import pandas as pd
+import app_core
+import result_window
 
 # ---------------------------------------------------------
 # 0. 세션 상태 초기화
@@ -18,31 +20,18 @@ def toggle_tag(tag):
 # ---------------------------------------------------------
 st.set_page_config(page_title="Osaka Travel Guide", layout="wide")
 
-# @st.cache_data # 개발 중에는 주석 처리 (배포 시 해제)
-def load_data():
-    try:
-        # 보내주신 헤더에 맞춰 데이터 읽기
-        df = pd.read_excel("data.xlsx")
-    except:
-        return None
-    
-    # 필수 데이터 확인 (한국어 이름 없으면 삭제)
-    df = df.dropna(subset=['Name_KR'])
-    
-    # 시간 숫자 변환
-    if 'Deep_Time' in df.columns:
-        df['Deep_Time'] = df['Deep_Time'].astype(str).str.replace('분', '').str.strip()
-        df['Deep_Time'] = pd.to_numeric(df['Deep_Time'], errors='coerce').fillna(0).astype(int)
-    
-    df = df.fillna("")
-    return df
-
-df = load_data()
+# 엑셀 읽기 / 필터 인덱스 / 소요 시간표는 app_core가 파일이 바뀔 때만 만들어 app_v2와 공유
+workbook = app_core.workbook_service()
 
-if df is None:
+if workbook is None:
     st.error("🚨 '오사카 데이터.xlsx' 파일을 찾을 수 없습니다.")
     st.stop()
 
+df = workbook.df
+facets = workbook.facets
+travel_times = workbook.travel_times
+RESULT_PAGE_SIZE = 10  # 한 번에 그리는 장소 수 (더 보기로 추가)
+
 # ---------------------------------------------------------
 # 2. 언어 설정 및 변수 매핑 (핵심!)
 # ---------------------------------------------------------
@@ -80,6 +69,7 @@ if language == "🇰🇷 한국어":
     ui_btn_img = "📸 사진 보기"
     ui_tag_info = "📢 **선택된 태그:**"
     ui_btn_reset = "🔄 태그 초기화"
+    ui_btn_more = "더 보기"
 
 else: # English
     # [Data Columns]
@@ -110,35 +100,10 @@ else: # English
     ui_btn_img = "📸 Gallery"
     ui_tag_info = "📢 **Selected Tags:**"
     ui_btn_reset = "🔄 Reset Tags"
+    ui_btn_more = "Load more"
 
 # ---------------------------------------------------------
-# 3. 로직 함수 (시간 계산)
-# ---------------------------------------------------------
-def calculate_total_time(user_hub, place_hub, deep_time):
-    # 허브 간 이동 시간 (한국어/영어 모두 대응하도록 매핑 필요하지만, 
-    # 간단하게 영문 Hub 이름도 내부적으로는 한글 로직을 태우거나, 
-    # 여기서는 '선택된 옵션의 인덱스'로 판단하는게 안전함. 
-    # 하지만 일단 텍스트 매칭으로 구현)
-    
-    # [간단 로직] 입력이 영어면 한글로 변환해서 계산
-    hub_map = {
-        "Namba": "난바", "Umeda": "우메다", "Kyoto Station": "교토역",
-        "난바": "난바", "우메다": "우메다", "교토역": "교토역"
-    }
-    
-    u_hub = hub_map.get(user_hub, user_hub)
-    p_hub = hub_map.get(place_hub, place_hub)
-
-    transit_time = 0
-    if u_hub == p_hub: transit_time = 0
-    elif (u_hub == "난바" and p_hub == "우메다") or (u_hub == "우메다" and p_hub == "난바"): transit_time = 20
-    elif (u_hub == "우메다" and p_hub == "교토역") or (u_hub == "교토역" and p_hub == "우메다"): transit_time = 30
-    elif (u_hub == "난바" and p_hub == "교토역") or (u_hub == "교토역" and p_hub == "난바"): transit_time = 50
-    
-    return transit_time + deep_time
-
-# ---------------------------------------------------------
-# 4. 화면 구성 (UI)
+# 3. 화면 구성 (UI)
 # ---------------------------------------------------------
 st.title(ui_title)
 
@@ -177,50 +142,37 @@ with col_f2:
 st.divider()
 
 # ---------------------------------------------------------
-# 5. 데이터 필터링 로직
+# 4. 데이터 필터링 로직
 # ---------------------------------------------------------
-# 1) 시간 계산 (현재 언어의 Hub 컬럼 사용)
-df['Total_Time'] = df.apply(lambda row: calculate_total_time(user_hub, row[col_hub], row['Deep_Time']), axis=1)
+# 1) 시간 계산 (미리 계산된 허브별 소요 시간에서 현재 숙소 열만 꺼냄)
+# (공유 df는 수정하지 않고, 소요 시간 컬럼을 붙인 이번 rerun용 df를 만듦)
+df = df.assign(Total_Time=travel_times.for_hub(user_hub))
 
-# 2) 시간 필터
-if not selected_times:
-    filtered_df = pd.DataFrame(columns=df.columns)
-else:
-    conditions = []
-    # 선택된 시간 옵션이 무엇인지에 따라 조건 분기
-    # (언어가 달라도 리스트 순서는 같으므로 인덱스로 하거나, 문자열 포함으로 처리)
-    
-    # 30분 이내 (옵션 리스트의 0번째)
-    if ui_time_opts[0] in selected_times: 
-        conditions.append(df['Total_Time'] <= 30)
-    # 30분~1시간 (옵션 리스트의 1번째)
-    if ui_time_opts[1] in selected_times: 
-        conditions.append((df['Total_Time'] > 30) & (df['Total_Time'] <= 60))
-    # 1시간~2시간 (옵션 리스트의 2번째)
-    if ui_time_opts[2] in selected_times: 
-        conditions.append((df['Total_Time'] > 60) & (df['Total_Time'] <= 120))
-    
-    if conditions:
-        final_condition = conditions[0]
-        for c in conditions[1:]: final_condition = final_condition | c
-        filtered_df = df[final_condition]
-    else:
-        filtered_df = df
-
-# 3) 테마 & 그룹 필터 (언어별 컬럼 사용: col_cat, col_grp)
+# 2) 테마 & 그룹 & 태그 필터 -> 비트마스크 (언어별 컬럼 사용: col_cat, col_grp)
+facet_mask = facets.all_rows
 if selected_categories:
-    filtered_df = filtered_df[filtered_df[col_cat].apply(lambda x: any(cat in str(x) for cat in selected_categories))]
+    facet_mask &= facets.any_of(col_cat, selected_categories, contains=True)
 
 if selected_groups:
-    filtered_df = filtered_df[filtered_df[col_grp].apply(lambda x: any(grp in str(x) for grp in selected_groups))]
+    facet_mask &= facets.any_of(col_grp, selected_groups, contains=True)
 
-# 4) 태그 필터 (태그는 현재 한국어 공통 사용 - 영어 모드에서도 태그 기능 유지)
+# 태그 컬럼은 'Tag' 하나뿐이므로 공통 사용
+if st.session_state.selected_tags:
+    facet_mask &= facets.any_of('Tag', st.session_state.selected_tags, contains=True)
+
+# 3) 시간 필터
+if not selected_times:
+    filtered_df = pd.DataFrame(columns=df.columns)
+else:
+    # 선택된 시간 옵션의 순서(0: 30분 이내, 1: 30분~1시간, 2: 1시간~2시간)로 구간 판단
+    # (언어가 달라도 리스트 순서는 같으므로 인덱스로 처리)
+    bucket_ids = [i for i, opt in enumerate(ui_time_opts) if opt in selected_times]
+    time_rows = travel_times.bucket_mask(user_hub, bucket_ids)
+    filtered_df = df[time_rows & facets.to_bool(facet_mask)]
+
+# 4) 선택된 태그 표시 (태그는 현재 한국어 공통 사용 - 영어 모드에서도 태그 기능 유지)
 if st.session_state.selected_tags:
     st.info(f"{ui_tag_info} {', '.join([f'#{t}' for t in st.session_state.selected_tags])}")
-    
-    pattern = '|'.join(st.session_state.selected_tags)
-    # 태그 컬럼은 'Tag' 하나뿐이므로 공통 사용
-    filtered_df = filtered_df[filtered_df['Tag'].str.contains(pattern, na=False)]
 
     if st.button(ui_btn_reset):
         st.session_state.selected_tags = []
@@ -230,15 +182,17 @@ if st.session_state.selected_tags:
 filtered_df = filtered_df.sort_values('Total_Time')
 
 # ---------------------------------------------------------
-# 6. 결과 출력
+# 5. 결과 출력
 # ---------------------------------------------------------
 st.markdown(f"{ui_msg_result} **{len(filtered_df)}**")
 
 if len(filtered_df) == 0:
     st.warning(ui_msg_no_result)
 else:
-    # 여기가 263번째 줄 (for 문)
-    for index, row in filtered_df.iterrows():
+    # 결과가 많아도 보이는 만큼만 그림 (필터가 바뀌면 다시 처음 RESULT_PAGE_SIZE개부터)
+    filter_state = (user_hub, tuple(selected_times), tuple(selected_categories), tuple(selected_groups), tuple(st.session_state.selected_tags))
+    visible_df = result_window.visible_rows(filtered_df, "results", reset_key=filter_state, page_size=RESULT_PAGE_SIZE)
+    for index, row in visible_df.iterrows():
         # [중요] 여기서부터 들여쓰기가 되어야 합니다!
         with st.container():
             # 레이아웃: 왼쪽(설명) 4 : 오른쪽(정보+버튼) 1.5 로 비율 조정
@@ -283,4 +237,6 @@ else:
                 else:
                     st.button(ui_btn_img, disabled=True, key=f"img_dis_{index}", use_container_width=True)
 
-            st.divider()
\ No newline at end of file
+            st.divider()
+
+    result_window.show_more_button(len(filtered_df), "results", ui_btn_more, page_size=RESULT_PAGE_SIZE)
@@ -0,0 +1,295 @@
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pytz
+import streamlit as st
+
+import catalog
+import event_sink
+import image_assets
+import locales
+import map_cache
+import place_search
+from facet_index import FacetIndex
+from lazy_imports import lazy_import
+from recommendations import RecommendationLists
+from travel_time import TravelTimeTable
+
+# =========================================================
+# 앱 공용 코어 (카탈로그 서비스 / 이미지 / 시트 로그)
+# =========================================================
+# app_full / app_ai / app_ux / app_v2 / app 가 각자 복사해서 쓰던
+# load_data, get_local_image_html, get_google_sheet_connection, save_log_to_sheet, log_action 을 모았습니다.
+# st.cache_resource는 함수가 정의된 파일별로 캐시가 따로 생기므로, 여기 한 곳에서만 정의해야
+# 한 서버에서 여러 앱을 띄워도 카탈로그 / 인덱스 / 이미지 매니페스트 / 갱신 스레드가 프로세스당 1벌만 생깁니다.
+# - catalog_service(): 구글 시트 카탈로그 (app_full / app_ai / app_ux)
+# - workbook_service(): 로컬 엑셀 data.xlsx (app / app_v2)
+# - 두 서비스 모두 읽기 전용으로 모든 세션이 공유 -> df를 직접 수정하지 말 것
+#
+# 사용 예)
+#   service = app_core.catalog_service()
+#   df, facets = service.df, service.facets
+#   detail_maps = service.detail_maps()
+
+logger = logging.getLogger(__name__)
+
+# 시트 변경 확인 주기 (조건부 요청이라 바뀌지 않았으면 거의 비용 없음, 모든 앱이 같은 주기 사용)
+REFRESH_INTERVAL = 600
+WORKBOOK_PATH = "data.xlsx"
+
+# 구글 시트 라이브러리는 첫 로그를 보낼 때 import
+gspread = lazy_import("gspread")
+service_account = lazy_import("oauth2client.service_account")
+
+
+def _column(df, name):
+    return df[name].tolist() if name in df.columns else []
+
+
+def _log_manifest(manifest):
+    """이미지 매니페스트 요약 로그 (이미지가 없는 장소가 있으면 warning)"""
+    log = logger.warning if manifest.missing else logger.info
+    log(manifest.report())
+
+
+class _LazyMembers:
+    """처음 쓸 때 한 번만 만드는 멤버 (여러 세션이 동시에 불러도 1번)"""
+
+    def __init__(self):
+        self._members = {}
+        self._members_lock = threading.Lock()
+
+    def _member(self, key, build):
+        member = self._members.get(key)
+        if member is None:
+            with self._members_lock:
+                member = self._members.get(key)
+                if member is None:
+                    member = self._members[key] = build()
+        return member
+
+
+# =========================================================
+# 구글 시트 카탈로그 서비스
+# =========================================================
+class CatalogService(_LazyMembers):
+    """카탈로그 한 버전 + 그 버전으로 만든 인덱스 / 이미지 매니페스트 / 지도 캐시"""
+
+    def __init__(self, version, place_catalog):
+        super().__init__()
+        self.version = version
+        self.place_catalog = place_catalog
+        self.df = place_catalog.df
+        # 필터용 비트셋 인덱스, (설문 타입 x 지역) 추천 목록: 모든 화면이 바로 쓰므로 같이 만듦
+        self.facets = FacetIndex(self.df, place_catalog.multi_values)
+        self.place_ids = _column(self.df, 'Place_ID')
+        self.recommendations = RecommendationLists(self.facets, self.place_ids)
+
+    def place_cards(self, code):
+        """언어별 장소 카드 표시값 (장소 ID -> locales.PlaceCard, 언어 전환 = 다른 dict 참조)"""
+        return self._member(("place_cards", code), lambda: locales.build_place_cards(self.df, code))
+
+    def search_index(self):
+        """챗봇용 카탈로그 검색 인덱스 (BM25, 챗봇을 처음 쓸 때 버전당 1번 만듦)"""
+        return self._member("place_search", lambda: place_search.PlaceSearchIndex(self.df))
+
+    def related_places(self, query, region=None, k=place_search.TOP_K, code="ko"):
+        """질문과 관련된 장소 카드 top-k (region: 'osaka' / 'kyoto' / None=전체)"""
+        allowed = None
+        if region and self.facets.has("Region"):
+            allowed = self.facets.to_bool(self.facets.mask("Region", region))
+        positions = self.search_index().search(query, k, allowed)
+        cards = self.place_cards(code)
+        return [cards[self.place_ids[pos]] for pos in positions]
+
+    @property
+    def image_manifest(self):
+        """장소 ID -> 이미지/크기/변형본 (images/ 폴더는 버전당 1번만 확인, 없는 변형본은 백그라운드에서 생성)"""
+        def build():
+            manifest = image_assets.ImageManifest(self.place_ids, _column(self.df, 'Name_EN'))
+            _log_manifest(manifest)
+            manifest.warm()
+            return manifest
+        return self._member("image_manifest", build)
+
+    def detail_maps(self, here_suffix=""):
+        """상세 페이지 지도 캐시 (많이 본 장소는 백그라운드에서 미리 렌더링)"""
+        def build():
+            cache = map_cache.DetailMapCache(self.place_catalog, here_suffix=here_suffix)
+            cache.warm(map_cache.warm_place_ids(self.place_catalog))
+            return cache
+        return self._member(("detail_maps", here_suffix), build)
+
+    def overview_maps(self):
+        """전체 장소 지역 지도 (지역/언어별 GeoJSON을 정적 파일로 저장)"""
+        def build():
+            regions = {key: self.facets.positions(self.facets.mask("Region", key)) for key in map_cache.REGION_CENTERS}
+            return map_cache.OverviewMapCache(self.place_catalog, regions)
+        return self._member("overview_maps", build)
+
+
+@st.cache_resource
+def start_catalog_refresh():
+    """시트 변경 확인은 백그라운드 스레드에서만 수행 (프로세스당 1개, 사용자 요청은 대기하지 않음)"""
+    return catalog.start_background_refresh(interval=REFRESH_INTERVAL)
+
+
+@st.cache_resource(max_entries=2)
+def load_catalog_service(version):
+    # 시트 다운로드 X -> 로컬 스냅샷을 타입이 정해진 카탈로그로 컴파일 (갱신은 백그라운드 스레드 담당)
+    return CatalogService(version, catalog.load_catalog())
+
+
+def catalog_service():
+    """현재 카탈로그 버전의 서비스 (버전이 같으면 모든 앱/세션이 같은 객체)"""
+    start_catalog_refresh()
+    return load_catalog_service(catalog.catalog_version())
+
+
+# =========================================================
+# 로컬 엑셀 서비스 (data.xlsx)
+# =========================================================
+def read_workbook(path=WORKBOOK_PATH):
+    """엑셀을 읽어 이름 없는 행 제거 + Deep_Time 숫자 변환. 읽을 수 없으면 None"""
+    try:
+        df = pd.read_excel(path)
+    except Exception as e:
+        logger.warning(f"Workbook load failed ({path}): {e}")
+        return None
+
+    if 'Name_KR' in df.columns:
+        df = df.dropna(subset=['Name_KR'])
+
+    if 'Deep_Time' in df.columns:
+        df['Deep_Time'] = df['Deep_Time'].astype(str).str.replace('분', '').str.strip()
+        df['Deep_Time'] = pd.to_numeric(df['Deep_Time'], errors='coerce').fillna(0).astype(int)
+
+    return df.fillna("")
+
+
+class WorkbookService(_LazyMembers):
+    """엑셀 한 버전(수정 시각) + 그 버전으로 만든 인덱스 / 소요 시간표 / 이미지 매니페스트"""
+
+    def __init__(self, version, df):
+        super().__init__()
+        self.version = version
+        self.df = df
+        self.facets = FacetIndex(df)
+        # 모든 숙소(허브) 기준 총 소요 시간을 미리 계산 (숙소 변경 = 열 하나 조회)
+        self.travel_times = TravelTimeTable(_column(df, 'Hub_KR'), _column(df, 'Deep_Time'))
+
+    @property
+    def image_manifest(self):
+        """영문 이름 -> 이미지 (시트 카탈로그와 같은 파일명 규칙)"""
+        def build():
+            names = _column(self.df, 'Name_EN')
+            manifest = image_assets.ImageManifest(names, names)
+            _log_manifest(manifest)
+            manifest.warm()
+            return manifest
+        return self._member("image_manifest", build)
+
+
+@st.cache_resource(max_entries=2)
+def load_workbook_service(path, mtime):
+    df = read_workbook(path)
+    return None if df is None else WorkbookService(mtime, df)
+
+
+def workbook_service(path=WORKBOOK_PATH):
+    """엑셀 서비스 (파일이 바뀔 때만 다시 읽음). 파일이 없거나 읽을 수 없으면 None"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return load_workbook_service(path, mtime)
+
+
+# =========================================================
+# 이미지 HTML
+# =========================================================
+def image_tag(manifest, image_key, height="200px", radius="8px", hover=False):
+    """매니페스트에 미리 만들어 둔 썸네일 URL(<img> 속성)로 <img> 태그 (파일 존재 확인 X). 없으면 None"""
+    src_attrs = manifest.src_attrs(image_key, height)
+    if not src_attrs:
+        return None
+    if hover:
+        # 그림자 + 마우스 올리면 살짝 커지는 효과 (scale 1.02)
+        img_style = f'width: 100%; height: {height}; object-fit: cover; border-radius: {radius}; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.3s ease;'
+        return f'<img {src_attrs} style="{img_style}" onmouseover="this.style.transform=\'scale(1.02)\'" onmouseout="this.style.transform=\'scale(1.0)\'">'
+    img_style = f'width: 100%; height: {height}; object-fit: cover; border-radius: {radius}; box-shadow: 0 2px 4px rgba(0,0,0,0.1);'
+    return f'<img {src_attrs} style="{img_style}">'
+
+
+def get_local_image_html(manifest, image_key, height="200px", radius="8px", hover=False):
+    """<img> 태그, 이미지가 없으면 회색 'No Image' 박스"""
+    img = image_tag(manifest, image_key, height, radius, hover)
+    if img:
+        return img
+    return f'<div style="width:100%; height:{height}; background-color:#f8f9fa; border-radius:{radius}; display:flex; flex-direction:column; align-items:center; justify-content:center; color:#adb5bd; font-size:12px;"><span>No Image</span></div>'
+
+
+# =========================================================
+# 구글 시트 로그
+# =========================================================
+@st.cache_resource
+def get_google_sheet_connection():
+    try:
+        # st.secrets에 gcp_service_account 정보가 있어야 함
+        if "gcp_service_account" not in st.secrets: return None
+        secrets = st.secrets["gcp_service_account"]
+        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+        creds = service_account.ServiceAccountCredentials.from_json_keyfile_dict(secrets, scope)
+        return gspread.authorize(creds)
+    except Exception as e:
+        logger.warning(f"Sheet Connection Error: {e}")
+        return None
+
+
+@st.cache_resource
+def get_log_sink(worksheet):
+    """
+    워크시트별 시트 로그 전송기 (프로세스당 1개)
+    - 이벤트를 모아서 append_rows로 한 번에 기록, 실패 시 재시도
+    - 로컬 스풀 파일에 먼저 남기므로 시트 장애/재시작에도 유실 X
+    """
+    client = get_google_sheet_connection()
+
+    def open_worksheet():
+        if client is None:
+            return None
+        # 시트 ID로 파일 열기 -> 워크시트 탭 선택 (백그라운드 스레드에서 한 번만)
+        return client.open_by_key(catalog.SHEET_ID).worksheet(worksheet)
+
+    return event_sink.SheetEventSink(open_worksheet, name=worksheet)
+
+
+def save_log_to_sheet(log_data, worksheet):
+    """
+    구글 시트에 데이터를 한 줄 추가
+    log_data 리스트 형식: [시간, 사용자ID, 행동(Action), 상세내용(Details)]
+    - 로컬 스풀에 기록 후 바로 반환 (실제 시트 기록은 백그라운드에서 묶어서 전송)
+    """
+    try:
+        get_log_sink(worksheet).emit(log_data)
+    except Exception as e:
+        logger.warning(f"Save Log Error: {e}")
+
+
+def get_current_time():
+    try:
+        kst = pytz.timezone('Asia/Seoul')
+        return datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def log_action(action, details, worksheet):
+    """사용자 행동을 1) 서버 로그 2) 구글 시트에 동시에 남김"""
+    now = get_current_time()
+    visitor_id = st.session_state.get('visitor_id', 'unknown')
+    logger.info(f"[{now}] USER: [{visitor_id}] | ACTION: {action} | DETAILS: {details}")
+    save_log_to_sheet([now, visitor_id, action, details], worksheet)
@@ -1,18 +1,22 @@
 import streamlit as st
 import pandas as pd
-import base64
-import os
-import folium
-from streamlit_folium import st_folium
 import logging
-from datetime import datetime
-import pytz
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import random
-import csv
-from openai import OpenAI
-import streamlit.components.v1 as components 
+import app_core
+import log_store
+import answer_cache
+import chat_history
+import stream_render
+import place_search
+import result_window
+import locales
+import map_cache
+from spatial_index import format_distance
+from lazy_imports import lazy_import
+
+# 무거운 라이브러리는 모드별로 처음 쓸 때 import (챗봇 모드: openai만 / 장소 추천 모드: 지도만)
+openai = lazy_import("openai")
+components = lazy_import("streamlit.components.v1")
 
 # ==========================================
 # [0] 페이지 기본 설정 (가장 먼저 실행)
@@ -25,44 +29,12 @@ st.set_page_config(page_title="AI & Travel Curator", page_icon="🇯🇵", layou
 # 이 함수들을 맨 위로 올려서 AI봇과 장소추천 양쪽에서 다 쓰게 만듭니다.
 
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-@st.cache_resource
-def get_google_sheet_connection():
-    try:
-        # st.secrets에 gcp_service_account 정보가 있어야 함
-        if "gcp_service_account" not in st.secrets: return None
-        secrets = st.secrets["gcp_service_account"]
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(secrets, scope)
-        client = gspread.authorize(creds)
-        return client
-    except Exception as e: 
-        print(f"Sheet Connection Error: {e}")
-        return None
+
+# 시트 연결 / 로그 전송기는 app_core에서 모든 앱이 공유 (워크시트 'Logs_ai' 탭)
+LOG_WORKSHEET = "Logs_ai"
 
 def save_log_to_sheet(log_data):
-    """
-    구글 시트에 데이터를 한 줄 추가하는 함수
-    log_data 리스트 형식: [시간, 사용자ID, 행동(Action), 상세내용(Details)]
-    """
-    try:
-        client = get_google_sheet_connection()
-        if client:
-            # 🔴 사용하시는 시트 ID와 시트 이름이 맞는지 확인하세요
-            sheet_id = "1aEKUB0EBFApDKLVRd7cMbJ6vWlR7-yf62L5MHqMGvp4" 
-            spreadsheet = client.open_by_key(sheet_id)
-            worksheet = spreadsheet.worksheet("Logs_ai") # 워크시트 이름 확인
-            worksheet.append_row(log_data)
-    except Exception as e: 
-        print(f"Save Log Error: {e}")
-
-def get_current_time():
-    try:
-        kst = pytz.timezone('Asia/Seoul') 
-        return datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S")
-    except:
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    app_core.save_log_to_sheet(log_data, LOG_WORKSHEET)
 
 # ==========================================
 # [0-2] 모드 선택 (메인 화면 상단 배치)
@@ -99,7 +71,7 @@ if st.session_state.app_mode == "ai_bot":
         st.error("OpenAI API 키가 설정되지 않았습니다.")
         st.stop()
 
-    client = OpenAI(api_key=api_key)
+    client = openai.OpenAI(api_key=api_key)
 
     # 2. 화면 구성
     st.title("🇯🇵 일본 여행 비서")
@@ -114,72 +86,89 @@ if st.session_state.app_mode == "ai_bot":
     # 3. 프롬프트
     base_system_instruction = """
     너는 일본 여행을 도와주는 친절하고 유능한 AI 비서다.
-
     한국어로 자연스럽게 대화해라.
 
-
-
     [🚨 절대 금지 사항 (위반 시 시스템 오류 간주)]
-
     1. **카테고리/지역명 링크 금지**: '오사카 맛집', '나카노시마 카페', '추천 식당' 같은 **일반 명사나 제목**에는 절대로 구글맵 링크를 걸지 마라. 오직 **특정 가게 이름**에만 링크를 걸어야 한다.
-
     - 나쁜 예: 이번에는 [나카노시마 카페](...)를 소개할게. (절대 금지)
-
     - 좋은 예: 이번에는 나카노시마 주변의 카페를 소개할게.
-
     2. **검색 쿼리 왜곡 금지**: 구글맵 링크 생성 시, 유저가 말한 지역명을 억지로 상호명 뒤에 붙이지 마라.
-
     - 나쁜 예: query=브루클린 로스팅 컴퍼니 나카노시마 (지점명이 틀릴 수 있음)
-
     - 좋은 예: query=Brooklyn Roasting Company (상호명만 깔끔하게)
-
     - 좋은 예: query=Brooklyn Roasting Company Kitahama (정확한 지점명을 아는 경우)
 
-
-
     [요청사항]
-
     최우선 요청사항 : 할루시네이션은 절대 금물. 절대절대 하지마
-
     0. 항상 사용자가 해외에 있음을 유념해서 답변해줘
-
     **구글맵 링크 필수**: 장소를 언급할 때는 사용자가 바로 찾을 수 있게 아래의 '검색 링크' 형식을 무조건 따라라. 가짜 URL을 만들지 말고 검색 쿼리를 써라.
-
     - 형식: `[장소명 구글맵 검색](https://www.google.com/maps/search/?api=1&query=장소명+지역명)`
-
     - 예시: `[이치란 라멘 구글맵 검색](https://www.google.com/maps/search/?api=1&query=이치란라멘+오사카)`
-
     2. **제품 추천**: 아플 때나 필요한 물건이 있을 때는 제품명(한국어/일본어), 추천 이유, 파는 곳(돈키호테, 드럭스토어 등)을 명시해라.
-
     3. **위치 확인**: 식당 추천 요청 시 유저의 위치를 모르면 먼저 물어봐라.
-
     4. **말투**: 공감이나 서론/결론의 군더더기를 빼고, 친구처럼 담백하게 핵심 정보만 전달해라.
-
     5. **해외 상황 고려**: 사용자가 현재 데이터 로밍 중일 수 있으니 텍스트를 너무 길게 쓰지 말고 가독성 있게 끊어 써라.
-
     6. 존댓말 써
     """
 
-    # 4. 로그 저장 (CSV + 구글 시트 둘 다 저장)
+    # 카탈로그 장소를 참고로 넣을 때 덧붙이는 지침
+    catalog_instruction = """
+    [참고 장소 사용 규칙]
+    - 아래 [참고 장소]는 우리가 직접 검수한 장소다. 질문에 맞는 장소가 있으면 이 중에서 먼저 추천해라.
+    - 참고 장소를 추천할 때는 목록에 있는 구글맵 주소를 그대로 링크로 써라: `[장소명](구글맵 주소)`
+    - 목록에 없는 장소는 확실히 아는 곳만, 위의 '검색 링크' 형식으로 짧게 언급해라.
+    """
+
+    region_codes = {"오사카": "osaka", "교토": "kyoto"}
+
+    def find_related_places(query):
+        """질문과 관련된 카탈로그 장소 카드 (카탈로그를 불러올 수 없으면 빈 목록)"""
+        try:
+            return app_core.catalog_service().related_places(query, region_codes.get(selected_region))
+        except Exception as e:
+            logging.warning(f"Place search failed: {e}")
+            return []
+
+    # 4. 로그 저장 (로컬 로그 + 구글 시트 둘 다 저장)
     def save_chat_log(role, content):
-        timestamp = get_current_time()
+        timestamp = app_core.get_current_time()
         
-        # (1) 로컬 CSV 저장 (백업용)
-        file_name = 'chat_log.csv'
-        file_exists = os.path.isfile(file_name)
-        with open(file_name, mode='a', newline='', encoding='utf-8-sig') as file:
-            writer = csv.writer(file)
-            if not file_exists:
-                writer.writerow(["시간", "주체", "내용"])
-            writer.writerow([timestamp, role, content])
+        # (1) 로컬 로그 저장 (백업용) - logs/chat/ JSONL 세그먼트 (버퍼링, 크기/기간별 교체 & 압축)
+        log_store.get_store("chat").write({
+            "time": timestamp,
+            "visitor": st.session_state.visitor_id,
+            "role": role,
+            "content": content,
+        })
             
         # (2) 🔥 구글 시트 저장 (추가된 부분)
         # 형식: [시간, 사용자ID, 역할(Action), 내용(Details)]
         save_log_to_sheet([timestamp, st.session_state.visitor_id, f"AI_CHAT_{role}", content])
 
-    # 5. 채팅 UI
+    # 5. 대화 요약 (오래된 대화가 최근 대화 창 밖으로 밀려날 때만 호출)
+    def summarize_history(previous_summary, folded_messages, max_tokens):
+        summary_request = f"""
+    아래는 일본 여행 비서와 사용자의 이전 대화다. 이후 대화에 필요한 정보만 한국어로 짧게 요약해라.
+    (여행 지역/일정, 숙소 위치, 취향, 이미 추천한 장소, 사용자가 거절하거나 요청한 것)
+
+    [기존 요약]
+    {previous_summary or "없음"}
+
+    [새로 요약할 대화]
+    {chat_history.format_transcript(folded_messages)}
+    """
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": summary_request}],
+            temperature=0,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content
+
+    # 6. 채팅 UI
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = chat_history.ChatHistory()
 
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
@@ -192,37 +181,68 @@ if st.session_state.app_mode == "ai_bot":
         save_chat_log("User", prompt) # 로그 저장 함수 변경됨
 
         with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            full_response = ""
+            # 청크마다 전체 답변을 다시 그리지 않고 flush 간격(초)마다 / 문장 끝에서만 갱신
+            renderer = stream_render.StreamRenderer(
+                st.empty(), flush_interval=st.secrets.get("stream_flush_interval", stream_render.FLUSH_INTERVAL)
+            )
             
             final_system_instruction = base_system_instruction
             if selected_region == "오사카":
                 final_system_instruction += "\n\n[강제 지침] 질문에 지역명이 없어도 무조건 '오사카' 정보를 답변해라."
             elif selected_region == "교토":
                 final_system_instruction += "\n\n[강제 지침] 질문에 지역명이 없어도 무조건 '교토' 정보를 답변해라."
+
+            # 질문과 관련된 카탈로그 장소 top-k만 프롬프트에 추가 (못 찾으면 직전 질문으로 한 번 더)
+            related_places = find_related_places(prompt)
+            user_prompts = [m["content"] for m in st.session_state.messages if m["role"] == "user"]
+            if not related_places and len(user_prompts) > 1:
+                related_places = find_related_places(user_prompts[-2])
+            if related_places:
+                final_system_instruction += catalog_instruction + "\n    [참고 장소]\n" + place_search.format_places(related_places)
             
-            history = [{"role": "system", "content": final_system_instruction}] + st.session_state.messages
+            # 전체 대화 대신 [system + 이전 대화 요약] + 최근 대화 창만 전송 (턴당 프롬프트 크기 고정)
+            history = st.session_state.chat_history.prompt(
+                final_system_instruction, st.session_state.messages, summarize_history
+            )
+
+            # 첫 질문은 모든 세션이 공유하는 답변 캐시 확인 (같은 질문이 동시에 오면 API 호출은 1번)
+            cached_answer, cache_key = None, None
+            if len(st.session_state.messages) == 1:
+                key = answer_cache.cache_key(selected_region, prompt, final_system_instruction)
+                cached_answer, leader = answer_cache.get_cache("chat").acquire(key)
+                if leader:
+                    cache_key = key
 
             try:
-                stream = client.chat.completions.create(
-                    model="gpt-4o", 
-                    messages=history,
-                    stream=True,
-                    temperature=0, 
-                )
-                
-                for chunk in stream:
-                    if chunk.choices[0].delta.content is not None:
-                        full_response += chunk.choices[0].delta.content
-                        message_placeholder.markdown(full_response + "▌")
+                if cached_answer is not None:
+                    # 캐시된 답변은 바로 한 번에 표시
+                    renderer.write(cached_answer)
+                else:
+                    stream = client.chat.completions.create(
+                        model="gpt-4o", 
+                        messages=history,
+                        stream=True,
+                        temperature=0, 
+                    )
+                    
+                    for chunk in stream:
+                        if chunk.choices[0].delta.content is not None:
+                            renderer.write(chunk.choices[0].delta.content)
                 
-                message_placeholder.markdown(full_response)
+                full_response = renderer.close()
+                if cache_key is not None:
+                    answer_cache.get_cache("chat").complete(cache_key, full_response)
+                    cache_key = None
                 
                 st.session_state.messages.append({"role": "assistant", "content": full_response})
                 save_chat_log("AI", full_response) # 로그 저장 함수 변경됨
 
             except Exception as e:
                 st.error(f"에러가 발생했습니다: {e}")
+            finally:
+                # 호출 실패 / 중단(st.stop, 재실행) 시 기다리던 같은 질문 요청이 직접 호출하도록 풀어줌
+                if cache_key is not None:
+                    answer_cache.get_cache("chat").abandon(cache_key)
 
 
 # ==========================================
@@ -235,60 +255,27 @@ elif st.session_state.app_mode == "place_rec":
 
     # 장소 추천용 로그 래퍼 함수
     def log_action(action, details=""):
-        now = get_current_time()
-        visitor_id = st.session_state.visitor_id
-        
-        # 화면 출력용 로그
-        log_msg = f"[{now}] ACTION: {action} | DETAILS: {details}"
-        logger.info(log_msg) 
-        
-        # 구글 시트 저장 (전역 함수 호출)
-        save_log_to_sheet([now, visitor_id, action, details])
-
-    def clean_filename(name):
-        return "".join([c if c.isalnum() or c in (' ', '_', '-') else '' for c in name]).strip()
-
-    @st.cache_data 
-    def get_local_image_html(file_path, height="200px", radius="8px"):
-        if os.path.exists(file_path):
-            with open(file_path, "rb") as f:
-                encoded = base64.b64encode(f.read()).decode()
-            img_style = f'width: 100%; height: {height}; object-fit: cover; border-radius: {radius}; box-shadow: 0 2px 4px rgba(0,0,0,0.1);'
-            return f'<img src="data:image/jpeg;base64,{encoded}" style="{img_style}">'
-        else:
-            return f'<div style="width:100%; height:{height}; background-color:#f8f9fa; border-radius:{radius}; display:flex; flex-direction:column; align-items:center; justify-content:center; color:#adb5bd; font-size:12px;"><span>No Image</span></div>'
-
-    @st.cache_data(ttl=86400)
-    def load_data():
-        sheet_id = "1aEKUB0EBFApDKLVRd7cMbJ6vWlR7-yf62L5MHqMGvp4"
-        sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&gid=0"
-        try:
-            df = pd.read_csv(sheet_url)
-            df = df.fillna("")
-            
-            if 'Type' in df.columns:
-                df['Type'] = df['Type'].astype(str)
-                df['Type'] = df['Type'].str.replace(r'\.0$', '', regex=True)
-                df['Type'] = df['Type'].replace('nan', '')
-
-            if 'Deep_Time' in df.columns:
-                df['Deep_Time'] = df['Deep_Time'].astype(str).str.replace('분', '').str.strip()
-                df['Deep_Time'] = pd.to_numeric(df['Deep_Time'], errors='coerce').fillna(0).astype(int)
-            
-            if '위도' in df.columns: 
-                df = df.rename(columns={'위도': 'lat', '경도': 'lon'})
-                df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
-                df['lon'] = pd.to_numeric(df['lon'], errors='coerce')
-            return df
-        except: return pd.DataFrame()
-
-    df = load_data()
+        app_core.log_action(action, details, LOG_WORKSHEET)
+
+    def get_local_image_html(image_key, height="200px", radius="8px"):
+        return app_core.get_local_image_html(image_manifest, image_key, height, radius)
+
+    # 카탈로그 / 인덱스 / 추천 목록 / 이미지 / 지도 캐시는 app_core가 카탈로그 버전당 1벌만 만들어 모든 앱이 공유
+    catalog_service = app_core.catalog_service()
+    place_catalog = catalog_service.place_catalog
+    df = catalog_service.df
+    facets = catalog_service.facets
+    rec_lists = catalog_service.recommendations
+    image_manifest = catalog_service.image_manifest
+    detail_maps = catalog_service.detail_maps()
+    overview_maps = catalog_service.overview_maps()
+    RESULT_PAGE_SIZE = 10  # 결과 목록에서 한 번에 그리는 장소 수 (더 보기로 추가)
 
     # [3] 세션 상태 & 화면 이동
     if 'page' not in st.session_state: st.session_state.page = 'survey'
     if 'previous_page' not in st.session_state: st.session_state.previous_page = 'survey'
 
-    if 'current_place' not in st.session_state: st.session_state.current_place = None
+    if 'current_place_id' not in st.session_state: st.session_state.current_place_id = None
     if 'user_type' not in st.session_state: st.session_state.user_type = 0
     if 'current_region' not in st.session_state: st.session_state.current_region = "오사카"
 
@@ -310,15 +297,20 @@ elif st.session_state.app_mode == "place_rec":
         log_action("GO_ALL", "Viewed all places")
         st.rerun()
 
-    def go_detail(row):
-        st.session_state.previous_page = st.session_state.page
-        st.session_state.current_place = row
+    def go_detail(place_id):
+        # 세션에는 장소 ID만 저장 (행 데이터는 공유 카탈로그에서 매번 최신으로 조회)
+        # 상세 -> 주변 장소 상세로 이동할 때는 목록 화면을 이전 화면으로 유지 (이전 화면이 'detail'이 되면 뒤로가기가 돌지 않음)
+        if st.session_state.page != 'detail':
+            st.session_state.previous_page = st.session_state.page
+        st.session_state.current_place_id = place_id
         st.session_state.page = 'detail'
-        log_action("VIEW_DETAIL", f"Place: {row['Name_KR']}")
+        map_cache.record_view(place_id)
+        place = place_catalog.get(place_id)
+        log_action("VIEW_DETAIL", f"Place: {place['Name_KR'] if place is not None else place_id}")
 
     def go_back():
         st.session_state.page = st.session_state.previous_page
-        st.session_state.current_place = None
+        st.session_state.current_place_id = None
         log_action("NAV_BACK", "Back button clicked")
         st.rerun()
 
@@ -333,99 +325,16 @@ elif st.session_state.app_mode == "place_rec":
         st.rerun()
 
     # [4] 텍스트 설정 & DB 매핑
-    TYPE_MAPPING = {
-        "여행자 타입": "근랜드",
-        "낭만가 타입": "원랜드",
-        "탐험가 타입": "모험",
-        "사색가 타입": "조용"
-    }
-    REVERSE_TYPE_MAPPING = {v: k for k, v in TYPE_MAPPING.items()}
-
     col_h1, col_h2 = st.columns([8, 2])
     with col_h2:
         language = st.radio("Language", ["한국어", "English"], horizontal=True, label_visibility="collapsed")
 
-    if language == "한국어":
-        cols = {'name': 'Name_KR', 'desc': 'Description_KR', 'loc': 'Landmark_KR', 'cat': 'Category_KR', 'grp': 'Group_KR', 'tag': 'Tag_KR', 'area': 'Area_KR', 'map': 'Google_Map_KR'}
-        txt = {
-            'title': "오사카/교토 여행지 리스트", 
-            'survey_title': "여행에서 더 끌리는 곳",
-            'survey_sub': "", 
-            'q1_landmark': "사람은 많아도, 유명한 랜드마크", 
-            'q1_local': "숨겨진 한적한 로컬 스팟",
-            'q2b_title': "더 선호하는 랜드마크",
-            'q2b_crowded': "사람은 많아도, 가까운 곳", 
-            'q2b_far': "조금 멀어도, 덜 붐비는 곳",        
-            'q2a_title': "로컬 스팟을 원하는 이유",
-            'q2a_adventure': "남들이 가지 않는 장소를 가보고 싶어서", 
-            'q2a_quiet': "너무 많은 인파는 부담스러워서",        
-            'btn_select': "선택",
-            'region_label': "도시",
-            'regions': ["오사카", "교토"],
-            'type_label': "어디로 갈까요?",
-            'quick_type_label': "",
-            'cats': ["자연", "도시", "역사/전통", "휴식", "쇼핑"],
-            'grps': ["혼자", "연인", "친구", "부모님", "어린이"],
-            'btns': ["여행자 타입", "낭만가 타입", "탐험가 타입", "사색가 타입"],
-            'res': "검색 결과",
-            'no_res': "조건을 만족하는 장소를 찾기 어렵습니다.",
-            'dtl_btn': "상세보기",
-            'back': "뒤로가기",
-            'rec_title': "성향에 맞는 장소 추천",
-            'rec_reset': "다시 테스트",
-            'go_all': "전체 장소 보기",
-            'type_messages': {
-                "근랜드": "여행자 타입 : 상징적인 랜드마크",
-                "원랜드": "낭만가 타입 : 여유롭게 즐기는 랜드마크",
-                "모험": "탐험가 타입 : 낯선 곳에서 마주하는 로컬 분위기",
-                "조용": "사색가 타입 : 복잡한 인파에서 벗어난 차분한 분위기"
-            }
-        }
-    else:
-        cols = {'name': 'Name_EN', 'desc': 'Description_EN', 'loc': 'Landmark_EN', 'cat': 'Category_EN', 'grp': 'Group_EN', 'tag': 'Tag_EN', 'area': 'Area_EN', 'map': 'Google_Map_EN'}
-        txt = {
-            'title': "Osaka/Kyoto Travel List",
-            'survey_title': "Preferred Travel Destinations", 
-            'survey_sub': "",
-            'q1_landmark': "A Famous Landmark, Even If It’s Crowded",
-            'q1_local': "A Hidden Local Spot, Even If It’s Less Known", 
-            'q2b_title': "Preferred Landmark Type",
-            'q2b_crowded': "Accessible City Center",
-            'q2b_far': "Relaxed Outskirts",
-            'q2a_title': "Reason for Local Preference",
-            'q2a_adventure': "To Explore Undiscovered Places", 
-            'q2a_quiet': "To Avoid Crowds",
-            'btn_select': "Select",
-            'region_label': "City",
-            'regions': ["Osaka", "Kyoto"],
-            'type_label': "Where to go?",
-            'quick_type_label': "",
-            'cats': ["Nature", "City", "History", "Relax", "Shopping"],
-            'grps': ["Solo", "Couple", "Friends", "Parents", "Kids"],
-            'btns': ["The Traveler Type", "The Romantic Type", "The Explorer Type", "The Contemplative Type"], 
-            'res': "Results",
-            'no_res': "No places found matching your criteria.",
-            'dtl_btn': "View Details",
-            'back': "Back",
-            'rec_title': "Recommended Places",
-            'rec_reset': "Retest",
-            'go_all': "View All Places",
-            'type_messages': {
-                "근랜드": "The Traveler Type: Nearby Iconic Landmarks",
-                "원랜드": "The Romantic Type: Savoring Landmarks at a Leisurely Pace",
-                "모험": "The Explorer Type: Immersing in Local Atmospheres off the Map",
-                "조용": "The Contemplative Type: Calm Spaces Away from the Crowds"
-            }
-        }
-
-    if language != "한국어":
-        TYPE_MAPPING = {
-            "The Traveler Type": "근랜드",
-            "The Romantic Type": "원랜드",
-            "The Explorer Type": "모험",
-            "The Contemplative Type": "조용"
-        }
-        REVERSE_TYPE_MAPPING = {v: k for k, v in TYPE_MAPPING.items()}
+    # 언어별 텍스트 / 컬럼 / 타입 매핑은 locales에 미리 만들어 둔 불변 번들 (언어 전환 = 번들 참조만 바꿈)
+    locale = locales.SURVEY_LOCALES["ko" if language == "한국어" else "en"]
+    txt, cols = locale.txt, locale.cols
+    TYPE_MAPPING, REVERSE_TYPE_MAPPING = locale.type_mapping, locale.reverse_type_mapping
+    # 장소 ID -> 이 언어의 카드 표시값 (이름, 짧은 설명, 지역, 태그, 소요 시간) - 카탈로그 버전 x 언어당 1번 계산
+    place_cards = catalog_service.place_cards(locale.code)
 
 
     if st.session_state.page != 'detail':
@@ -462,8 +371,8 @@ elif st.session_state.app_mode == "place_rec":
         else:
             region_tag = "osaka"
 
-        def get_img_path(base_name):
-            return os.path.join("images", f"{base_name}_{region_tag}.jpg")
+        def get_img_key(base_name):
+            return f"{base_name}_{region_tag}"
 
         current_title = txt['survey_title']
         if st.session_state.survey_step == 2:
@@ -476,7 +385,7 @@ elif st.session_state.app_mode == "place_rec":
         IMG_HEIGHT = "250px"
 
         def render_option(img_key, txt_key, val):
-            st.markdown(get_local_image_html(get_img_path(img_key), height=IMG_HEIGHT), unsafe_allow_html=True)
+            st.markdown(get_local_image_html(get_img_key(img_key), height=IMG_HEIGHT), unsafe_allow_html=True)
             
             if st.button(txt[txt_key], key=f"btn_{img_key}", use_container_width=True):
                 log_action("SURVEY_CHOICE", f"Step:{st.session_state.survey_step} | Selected:{val}")
@@ -533,66 +442,55 @@ elif st.session_state.app_mode == "place_rec":
         
         st.divider()
 
-        with st.container():
-            st.write(f"**{txt['region_label']}**")
-            new_region = st.radio(
-                "Region_Rec", 
-                txt['regions'], 
-                index=txt['regions'].index(st.session_state.current_region), 
-                horizontal=True, 
-                label_visibility="collapsed"
-            )
-            if new_region != st.session_state.current_region:
-                st.session_state.current_region = new_region
-                log_action("REGION_CHANGE", f"Changed to {new_region}")
-                st.rerun()
-
-        filtered_df = df.copy()
+        # 지역 선택 + 추천 목록은 fragment로 분리: 여기 위젯을 누르면 이 부분만 다시 실행
+        # (상세보기처럼 화면이 바뀌는 버튼은 st.rerun()으로 전체 다시 실행)
+        @st.fragment
+        def render_recommendations():
+            with st.container():
+                st.write(f"**{txt['region_label']}**")
+                new_region = st.radio(
+                    "Region_Rec", 
+                    txt['regions'], 
+                    index=txt['regions'].index(st.session_state.current_region), 
+                    horizontal=True, 
+                    label_visibility="collapsed"
+                )
+                if new_region != st.session_state.current_region:
+                    st.session_state.current_region = new_region
+                    log_action("REGION_CHANGE", f"Changed to {new_region}")
 
-        if st.session_state.current_region == txt['regions'][1]: 
-            filtered_df = filtered_df[filtered_df['Hub_KR'].astype(str).str.contains('교토|기온', na=False)]
-        else: 
-            filtered_df = filtered_df[filtered_df['Hub_KR'].astype(str).str.contains('난바|우메다', na=False)]
+            region_key = "kyoto" if st.session_state.current_region == txt['regions'][1] else "osaka"
 
-        user_result_db = st.session_state.user_type 
-        custom_message = txt['type_messages'].get(user_result_db, "")
-        st.success(f"**{custom_message}**")
+            user_result_db = st.session_state.user_type 
+            custom_message = txt['type_messages'].get(user_result_db, "")
+            st.success(f"**{custom_message}**")
 
-        if 'Type' in filtered_df.columns and user_result_db:
-            target = str(user_result_db)
-            def is_main_tag(val):
-                tags = [t.strip() for t in str(val).split(',')]
-                if not tags: return False
-                return tags[0] == target
-            def is_any_tag(val):
-                tags = [t.strip() for t in str(val).split(',')]
-                return target in tags
+            # (타입, 지역)별로 미리 계산해 둔 추천 목록을 꺼내기만 함
+            filtered_df = rec_lists.take(df, user_result_db, region_key)
 
-            main_matches = filtered_df[filtered_df['Type'].apply(is_main_tag)]
-            if len(main_matches) >= 3: filtered_df = main_matches
-            else: filtered_df = filtered_df[filtered_df['Type'].apply(is_any_tag)]
+            st.subheader(f"{txt['res']}: {len(filtered_df)}")
+            st.write("")
 
-        st.subheader(f"{txt['res']}: {len(filtered_df)}")
-        st.write("")
+            if len(filtered_df) == 0: st.warning(txt['no_res'])
+            else:
+                # 결과가 많아도 보이는 만큼만 그림 (더 보기를 누르면 RESULT_PAGE_SIZE개씩 추가)
+                visible_df = result_window.visible_rows(filtered_df, "rec", reset_key=(st.session_state.current_region, user_result_db), page_size=RESULT_PAGE_SIZE)
+                for idx, place_id in zip(visible_df.index, visible_df['Place_ID']):
+                    card = place_cards[place_id]
+                    with st.container(border=True):
+                        c_img, c_txt = st.columns([1, 2])
+                        with c_img:
+                            st.markdown(get_local_image_html(image_manifest.asset_for(place_id), height="120px", radius="8px"), unsafe_allow_html=True)
+                        with c_txt:
+                            st.markdown(f"**{card.name}**")
+                            st.write(f"<span style='font-size:14px; color:#666;'>{card.snippet}</span>", unsafe_allow_html=True)
+                            st.caption(f"📍 {card.area} | ⏱️ {card.time_label}")
+                            if st.button(txt['dtl_btn'], key=f"btn_rec_{idx}", use_container_width=True):
+                                go_detail(place_id)
+                                st.rerun()
+                result_window.show_more_button(len(filtered_df), "rec", txt['more'], page_size=RESULT_PAGE_SIZE)
 
-        if len(filtered_df) == 0: st.warning(txt['no_res'])
-        else:
-            for idx, row in filtered_df.iterrows():
-                with st.container(border=True):
-                    c_img, c_txt = st.columns([1, 2])
-                    with c_img:
-                        name_en = clean_filename(str(row['Name_EN']))
-                        img_path = os.path.join("images", f"{name_en}.jpg")
-                        st.markdown(get_local_image_html(img_path, height="120px", radius="8px"), unsafe_allow_html=True)
-                    with c_txt:
-                        st.markdown(f"**{row[cols['name']]}**")
-                        desc_text = str(row[cols['desc']])
-                        if len(desc_text) > 40: desc_text = desc_text[:40] + "..."
-                        st.write(f"<span style='font-size:14px; color:#666;'>{desc_text}</span>", unsafe_allow_html=True)
-                        st.caption(f"📍 {row[cols['area']]} | ⏱️ {row['Deep_Time']} min")
-                        if st.button(txt['dtl_btn'], key=f"btn_rec_{idx}", use_container_width=True):
-                            go_detail(row)
-                            st.rerun()
+        render_recommendations()
 
         st.divider()
         if st.button(txt['rec_reset']): 
@@ -606,140 +504,139 @@ elif st.session_state.app_mode == "place_rec":
         
         st.divider()
 
-        with st.container():
-            st.write(f"**{txt['region_label']}**")
-            new_region = st.radio(
-                "Region_All", 
-                txt['regions'], 
-                index=txt['regions'].index(st.session_state.current_region), 
-                horizontal=True, 
-                label_visibility="collapsed"
-            )
-            if new_region != st.session_state.current_region:
-                st.session_state.current_region = new_region
-                log_action("REGION_CHANGE", f"Changed to {new_region}")
-                st.rerun()
-
-        filtered_df = df.copy()
+        # 필터 패널 + 결과 목록은 fragment로 분리: pill을 바꾸면 이 부분만 다시 실행
+        # (상세보기처럼 화면이 바뀌는 버튼은 st.rerun()으로 전체 다시 실행)
+        @st.fragment
+        def render_all_places():
+            with st.container():
+                st.write(f"**{txt['region_label']}**")
+                new_region = st.radio(
+                    "Region_All", 
+                    txt['regions'], 
+                    index=txt['regions'].index(st.session_state.current_region), 
+                    horizontal=True, 
+                    label_visibility="collapsed"
+                )
+                if new_region != st.session_state.current_region:
+                    st.session_state.current_region = new_region
+                    log_action("REGION_CHANGE", f"Changed to {new_region}")
 
-        if st.session_state.current_region == txt['regions'][1]:
-            filtered_df = filtered_df[filtered_df['Hub_KR'].astype(str).str.contains('교토|기온', na=False)]
-        else:
-            filtered_df = filtered_df[filtered_df['Hub_KR'].astype(str).str.contains('난바|우메다', na=False)]
+            region_key = "kyoto" if st.session_state.current_region == txt['regions'][1] else "osaka"
+            mask = facets.mask("Region", region_key)
 
-        st.markdown("---")
+            st.markdown("---")
         
-        st.write(f"**{txt['type_label']} (Filter)**")
-        selected_display_types = st.pills("Type", txt['btns'], selection_mode="multi", label_visibility="collapsed")
+            st.write(f"**{txt['type_label']} (Filter)**")
+            selected_display_types = st.pills("Type", txt['btns'], selection_mode="multi", label_visibility="collapsed")
         
-        st.write("")
-        st.write("🔎 **Category & Group Filter**")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.write("🏷️ **Category**")
-            sel_cats = st.pills("Cats", txt['cats'], selection_mode="multi", label_visibility="collapsed")
-        with c2:
-            st.write("👥 **Group**")
-            sel_grps = st.pills("Grps", txt['grps'], selection_mode="multi", label_visibility="collapsed")
-
-        # [로그] 필터 변경 상세 기록
-        current_filter_state = f"Region:{st.session_state.current_region} | Type:{selected_display_types} | Cats:{sel_cats} | Grps:{sel_grps}"
-        if 'last_filter_state' not in st.session_state:
-            st.session_state.last_filter_state = ""
-        if st.session_state.last_filter_state != current_filter_state:
-            log_action("FILTER_CHANGE", current_filter_state)
-            st.session_state.last_filter_state = current_filter_state
-
-        if selected_display_types:
-            selected_db_values = [TYPE_MAPPING[disp] for disp in selected_display_types]
-            def filter_type(val):
-                tags = [t.strip() for t in str(val).split(',')]
-                for sel in selected_db_values:
-                    if sel in tags: return True
-                return False
-            filtered_df = filtered_df[filtered_df['Type'].apply(filter_type)]
-
-        if sel_cats: filtered_df = filtered_df[filtered_df[cols['cat']].apply(lambda x: any(c in str(x) for c in sel_cats))]
-        if sel_grps: filtered_df = filtered_df[filtered_df[cols['grp']].apply(lambda x: any(g in str(x) for g in sel_grps))]
-
-        st.markdown("---")
-        st.subheader(f"{txt['res']}: {len(filtered_df)}")
+            st.write("")
+            st.write("🔎 **Category & Group Filter**")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.write("🏷️ **Category**")
+                sel_cats = st.pills("Cats", txt['cats'], selection_mode="multi", label_visibility="collapsed")
+            with c2:
+                st.write("👥 **Group**")
+                sel_grps = st.pills("Grps", txt['grps'], selection_mode="multi", label_visibility="collapsed")
+
+            # [로그] 필터 변경 상세 기록
+            current_filter_state = f"Region:{st.session_state.current_region} | Type:{selected_display_types} | Cats:{sel_cats} | Grps:{sel_grps}"
+            if 'last_filter_state' not in st.session_state:
+                st.session_state.last_filter_state = ""
+            if st.session_state.last_filter_state != current_filter_state:
+                log_action("FILTER_CHANGE", current_filter_state)
+                st.session_state.last_filter_state = current_filter_state
+
+            if selected_display_types:
+                selected_db_values = [TYPE_MAPPING[disp] for disp in selected_display_types]
+                mask &= facets.any_of("Type", selected_db_values)
+
+            if sel_cats: mask &= facets.any_of(cols['cat'], sel_cats, contains=True)
+            if sel_grps: mask &= facets.any_of(cols['grp'], sel_grps, contains=True)
+            filtered_df = facets.take(df, mask)
+
+            st.markdown("---")
+            st.subheader(f"{txt['res']}: {len(filtered_df)}")
         
-        if len(filtered_df) == 0: st.warning(txt['no_res'])
-        else:
-            for idx, row in filtered_df.iterrows():
-                with st.container(border=True):
-                    c_img, c_txt = st.columns([1, 2])
-                    with c_img:
-                        name_en = clean_filename(str(row['Name_EN']))
-                        img_path = os.path.join("images", f"{name_en}.jpg")
-                        st.markdown(get_local_image_html(img_path, height="120px", radius="8px"), unsafe_allow_html=True)
-                    with c_txt:
-                        st.markdown(f"**{row[cols['name']]}**")
-                        desc_text = str(row[cols['desc']])
-                        if len(desc_text) > 40: desc_text = desc_text[:40] + "..."
-                        st.write(f"<span style='font-size:14px; color:#666;'>{desc_text}</span>", unsafe_allow_html=True)
-                        st.caption(f"📍 {row[cols['area']]} | ⏱️ {row['Deep_Time']} min")
-                        if st.button(txt['dtl_btn'], key=f"btn_all_{idx}", use_container_width=True):
-                            go_detail(row)
+            if len(filtered_df) == 0: st.warning(txt['no_res'])
+            else:
+                # 지역 지도: 필터 결과 장소만 클러스터로 표시, 마커를 누르면 상세 페이지로
+                if st.toggle(txt['map_view'], key="all_map_view"):
+                    overview = overview_maps.get(region_key, cols['name'], filtered_df['Place_ID'])
+                    if overview:
+                        overview_out = map_cache.render(overview)
+                        clicked_id = overview_maps.clicked_place_id(overview, overview_out)
+                        if clicked_id is not None:
+                            go_detail(clicked_id)
                             st.rerun()
+                    else:
+                        st.caption(txt['no_map'])
+
+                # 결과가 많아도 보이는 만큼만 그림 (더 보기를 누르면 RESULT_PAGE_SIZE개씩 추가)
+                visible_df = result_window.visible_rows(filtered_df, "all", reset_key=current_filter_state, page_size=RESULT_PAGE_SIZE)
+                for idx, place_id in zip(visible_df.index, visible_df['Place_ID']):
+                    card = place_cards[place_id]
+                    with st.container(border=True):
+                        c_img, c_txt = st.columns([1, 2])
+                        with c_img:
+                            st.markdown(get_local_image_html(image_manifest.asset_for(place_id), height="120px", radius="8px"), unsafe_allow_html=True)
+                        with c_txt:
+                            st.markdown(f"**{card.name}**")
+                            st.write(f"<span style='font-size:14px; color:#666;'>{card.snippet}</span>", unsafe_allow_html=True)
+                            st.caption(f"📍 {card.area} | ⏱️ {card.time_label}")
+                            if st.button(txt['dtl_btn'], key=f"btn_all_{idx}", use_container_width=True):
+                                go_detail(place_id)
+                                st.rerun()
+                result_window.show_more_button(len(filtered_df), "all", txt['more'], page_size=RESULT_PAGE_SIZE)
+
+        render_all_places()
 
     # [PAGE 4] 상세 페이지
     elif st.session_state.page == 'detail':
-        row = st.session_state.current_place
+        row = place_catalog.get(st.session_state.current_place_id)
+        if row is None:
+            # 카탈로그 갱신으로 장소가 사라졌으면 목록 화면으로 (go_back/rerun 없이 이번 실행은 여기서 종료)
+            if st.session_state.previous_page != 'detail':
+                st.session_state.page = st.session_state.previous_page
+            else:
+                st.session_state.page = 'all_places'
+            st.session_state.current_place_id = None
+            st.warning(txt['no_res'])
+            st.button(txt['back'])
+            st.stop()
         
         if st.button(txt['back']):
             go_back()
         
-        zone_col = 'Zone'
-        if 'ZONE' in df.columns: zone_col = 'ZONE'
-        elif 'zone' in df.columns: zone_col = 'zone'
+        zone_col = place_catalog.zone_col
         current_zone = str(row.get(zone_col, ''))
         if pd.isna(current_zone) or current_zone == 'nan': current_zone = ""
+        card = place_cards[row['Place_ID']]
 
         # [지도]
         if 'lat' in row and 'lon' in row:
             try:
-                dest_lat, dest_lon = float(row['lat']), float(row['lon'])
-                if dest_lat != 0 and dest_lon != 0:
-                    m = folium.Map(location=[dest_lat, dest_lon], zoom_start=14)
-                    fixed_hubs = {"난바 (Namba)": [34.6655, 135.5006], "우메다 (Umeda)": [34.7025, 135.4959], "교토역 (Kyoto St.)": [34.9858, 135.7588]}
-                    for h_name, h_coords in fixed_hubs.items():
-                        folium.Marker(h_coords, popup=h_name, tooltip=h_name, icon=folium.Icon(color='green', icon='home')).add_to(m)
+                # 지도는 (장소 ID, 언어)별로 미리 렌더링된 것을 꺼내 그림 (folium 객체 생성/직렬화 X)
+                map_artifact = detail_maps.get(row['Place_ID'], cols['name'])
+                if map_artifact:
+                    st.markdown(f"### 📍 Location: {card.area} ({current_zone})")
                     
-                    if current_zone:
-                        nearby = df[(df[zone_col] == current_zone) & (df['Name_KR'] != row['Name_KR']) & (df['lat'] != 0)]
-                        for _, p in nearby.iterrows():
-                            folium.Marker([float(p['lat']), float(p['lon'])], popup=p[cols['name']], tooltip=p[cols['name']], icon=folium.Icon(color='blue', icon='info-sign')).add_to(m)
+                    map_out = map_cache.render(map_artifact)
                     
-                    folium.Marker([dest_lat, dest_lon], popup=f"📍 {row[cols['name']]}", tooltip=row[cols['name']], icon=folium.Icon(color='red', icon='star')).add_to(m)
-                    st.markdown(f"### 📍 Location: {row[cols['area']]} ({current_zone})")
-                    
-                    map_out = st_folium(
-                        m, 
-                        width=None, 
-                        height=400, 
-                        use_container_width=True,
-                        returned_objects=["last_object_clicked"] 
-                    )
-                    
-                    if map_out and map_out['last_object_clicked']:
-                        c_lat, c_lng = map_out['last_object_clicked']['lat'], map_out['last_object_clicked']['lng']
-                        found = df[(df['lat'].sub(c_lat).abs() < 0.0001) & (df['lon'].sub(c_lng).abs() < 0.0001)]
-                        if not found.empty:
-                            new_r = found.iloc[0]
-                            if new_r['Name_KR'] != row['Name_KR']:
-                                go_detail(new_r)
-                                st.rerun()
-            except: pass
+                    # 클릭한 마커 -> 장소 ID (마커 툴팁에 넣어 둔 ID, df 전체 비교 X)
+                    clicked_id = detail_maps.clicked_place_id(map_artifact, map_out)
+                    if clicked_id is not None and clicked_id != row['Place_ID']:
+                        go_detail(clicked_id)
+                        st.rerun()
+            except Exception as e:  # (bare except는 st.rerun()까지 삼킴)
+                logging.warning(f"Detail map failed ({row['Place_ID']}): {e}")
+                st.caption(txt['no_map'])
 
         st.divider()
         col_left, col_right = st.columns([6, 4], gap="large")
         
         with col_left:
-            name_en = clean_filename(str(row['Name_EN']))
-            img_path = os.path.join("images", f"{name_en}.jpg")
-            img_html = get_local_image_html(img_path, height="350px", radius="12px")
+            img_html = get_local_image_html(image_manifest.asset_for(row['Place_ID']), height="350px", radius="12px")
             
             g_img_col = 'Google_Image_KR' if language == "한국어" else 'Google_Image_EN'
             if str(row.get(g_img_col, '')).startswith('http'): 
@@ -751,7 +648,7 @@ elif st.session_state.app_mode == "place_rec":
             st.caption(f"<div style='text-align: center; margin-top: -10px;'>{guide_text}</div>", unsafe_allow_html=True)
             
             st.write("")
-            st.title(row[cols['name']])
+            st.title(card.name)
             
             if language == "한국어":
                 hub_name = str(row.get('Hub_KR', ''))
@@ -760,16 +657,15 @@ elif st.session_state.app_mode == "place_rec":
                 hub_name = str(row.get('Hub_EN', ''))
                 time_ref = f"From {hub_name}" if hub_name else "From City Center"
                 
-            st.caption(f"⏱️ {time_ref} {row['Deep_Time']} min")
+            st.caption(f"⏱️ {time_ref} {card.time_label}")
             
             st.markdown("#### 📝 Description")
-            st.write(row[cols['desc']])
+            st.write(card.desc)
             st.write("")
             
-            tags = str(row[cols['tag']]).split('#')
-            st.info("   ".join([f"#{t.strip()}" for t in tags if t.strip()]))
+            st.info(card.tags)
             
-            map_url = str(row.get(cols['map'], ''))
+            map_url = card.map_url
             
             if map_url.startswith('http'):
                 if st.button("🗺️ Open Google Map", key="btn_google_map", use_container_width=True):
@@ -779,20 +675,27 @@ elif st.session_state.app_mode == "place_rec":
                     
         with col_right:
             st.subheader("🔭 Nearby Places")
-            st.caption(f"Same Zone: {current_zone}")
-            if current_zone: recs = df[(df[zone_col] == current_zone) & (df['Name_KR'] != row['Name_KR'])]
-            else: recs = pd.DataFrame()
+            # 카탈로그 로드 시 미리 계산한 거리순 주변 장소 (구역 경계와 무관, 반경 안 최대 k곳)
+            recs, rec_meters = place_catalog.nearby(row['Place_ID'])
+            if len(recs):
+                st.caption(f"Within {format_distance(place_catalog.neighbors.radius_m)}")
+            else:
+                # 좌표가 없는 장소는 같은 구역으로 대신 표시
+                st.caption(f"Same Zone: {current_zone}")
+                if current_zone: recs = df[(df[zone_col] == current_zone) & (df['Name_KR'] != row['Name_KR'])]
+                else: recs = pd.DataFrame()
+                rec_meters = [None] * len(recs)
             if len(recs) == 0: st.write("No nearby places.")
             else:
-                for _, r_row in recs.iterrows():
+                for rec_id, meters in zip(recs['Place_ID'], rec_meters):
+                    rec_card = place_cards[rec_id]
                     with st.container(border=True):
                         rc1, rc2 = st.columns([1, 2.5])
                         with rc1:
-                            r_name_en = clean_filename(str(r_row['Name_EN']))
-                            st.markdown(get_local_image_html(os.path.join("images", f"{r_name_en}.jpg"), height="70px", radius="8px"), unsafe_allow_html=True)
+                            st.markdown(get_local_image_html(image_manifest.asset_for(rec_id), height="70px", radius="8px"), unsafe_allow_html=True)
                         with rc2:
-                            st.write(f"**{r_row[cols['name']]}**")
-                            st.caption(f"{r_row[cols['cat']]}")
-                            if st.button("View", key=f"rec_{r_name_en}", use_container_width=True):
-                                go_detail(r_row)
+                            st.write(f"**{rec_card.name}**")
+                            st.caption(f"{rec_card.category}" + (f" · 📏 {format_distance(meters)}" if meters is not None else ""))
+                            if st.button("View", key=f"rec_{rec_id}", use_container_width=True):
+                                go_detail(rec_id)
                                 st.rerun()
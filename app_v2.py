@@ -1,33 +1,24 @@
 import streamlit as st
 import pandas as pd
-import os
-import base64
-import csv  # [LOG] 로그 저장을 위한 라이브러리 추가
-from datetime import datetime # [LOG] 시간 기록을 위한 라이브러리 추가
+from datetime import datetime, timedelta # [LOG] 시간 기록을 위한 라이브러리 추가
+import app_core
+import log_store  # [LOG] 로그 저장소 (JSONL 세그먼트)
+from log_viewer import LogViewer
+import result_window
 
 # ---------------------------------------------------------
 # [LOG] 0. 로그 수집 함수 (여기에 데이터가 쌓입니다!)
 # ---------------------------------------------------------
 def log_user_action(action_type, detail):
     """
-    사용자의 행동을 user_logs.csv 파일에 기록합니다.
-    형식: [시간, 행동유형, 세부내용]
+    사용자의 행동을 로그 저장소(logs/user_actions/)에 기록합니다.
+    형식: {Time, Action, Detail}
+    - 열어둔 파일에 버퍼링해서 쓰고, 파일이 커지거나 하루가 지나면 새 파일로 교체 (지난 파일은 압축)
     """
-    file_name = "user_logs.csv"
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    # 데이터 리스트 생성
-    log_data = [current_time, action_type, detail]
-    
-    # 파일이 없으면 헤더 생성, 있으면 내용 추가 (append 모드)
-    file_exists = os.path.isfile(file_name)
-    
     try:
-        with open(file_name, "a", newline="", encoding="utf-8-sig") as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(["Time", "Action", "Detail"]) # 헤더
-            writer.writerow(log_data)
+        log_store.get_store("user_actions").write({"Time": current_time, "Action": action_type, "Detail": detail})
         # 개발자 확인용 (터미널 출력)
         print(f"📝 [LOG] {current_time} | {action_type} | {detail}")
     except Exception as e:
@@ -36,29 +27,13 @@ def log_user_action(action_type, detail):
 # ---------------------------------------------------------
 # [기존 기능] 클릭 가능한 로컬 이미지 HTML 생성
 # ---------------------------------------------------------
-def get_clickable_image_html(img_path, target_url=None, height="220px"):
-    if os.path.exists(img_path):
-        with open(img_path, "rb") as f:
-            data = f.read()
-            encoded = base64.b64encode(data).decode()
-        
-        img_style = f'''
-            width: 100%; 
-            height: {height}; 
-            object-fit: cover; 
-            border-radius: 12px; 
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            transition: transform 0.3s ease;
-        '''
-        
-        img_tag = f'<img src="data:image/jpeg;base64,{encoded}" style="{img_style}" onmouseover="this.style.transform=\'scale(1.02)\'" onmouseout="this.style.transform=\'scale(1.0)\'">'
-        
-        if target_url and str(target_url).startswith('http'):
-            return f'<a href="{target_url}" target="_blank" style="text-decoration: none;">{img_tag}</a>'
-        else:
-            return img_tag
-    else:
-        return None
+def get_clickable_image_html(image_key, target_url=None, height="220px"):
+    # 카드 높이에 맞게 줄인 썸네일(WebP)을 캐시 가능한 정적 URL(srcset 1x/2x)로 참조
+    # (image_key: 이미지 매니페스트 키 -> 파일 존재 확인 없이 dict 조회만)
+    img_tag = app_core.image_tag(image_manifest, image_key, height, radius="12px", hover=True)
+    if img_tag and target_url and str(target_url).startswith('http'):
+        return f'<a href="{target_url}" target="_blank" style="text-decoration: none;">{img_tag}</a>'
+    return img_tag
 
 # ---------------------------------------------------------
 # 0. 세션 상태 초기화 및 태그 함수 수정
@@ -81,30 +56,19 @@ def toggle_tag(tag):
 # ---------------------------------------------------------
 st.set_page_config(page_title="Osaka Travel Guide Project 2", layout="wide")
 
-# @st.cache_data 
-def load_data():
-    try:
-        df = pd.read_excel("data.xlsx")
-    except Exception as e:
-        st.error(f"데이터 로드 중 오류 발생: {e}")
-        return None
-    
-    if 'Name_KR' in df.columns:
-        df = df.dropna(subset=['Name_KR'])
-    
-    if 'Deep_Time' in df.columns:
-        df['Deep_Time'] = df['Deep_Time'].astype(str).str.replace('분', '').str.strip()
-        df['Deep_Time'] = pd.to_numeric(df['Deep_Time'], errors='coerce').fillna(0).astype(int)
-    
-    df = df.fillna("")
-    return df
-
-df = load_data()
+# 엑셀 읽기 / 필터 인덱스 / 소요 시간표 / 이미지 매니페스트는 app_core가 파일이 바뀔 때만 만들어 app과 공유
+workbook = app_core.workbook_service()
 
-if df is None:
+if workbook is None:
     st.error("🚨 'data.xlsx' 파일을 찾을 수 없거나 읽을 수 없습니다.")
     st.stop()
 
+df = workbook.df
+facets = workbook.facets
+travel_times = workbook.travel_times
+image_manifest = workbook.image_manifest
+RESULT_PAGE_SIZE = 12  # 한 번에 그리는 장소 수 (갤러리 3열 기준, 더 보기로 추가)
+
 # ---------------------------------------------------------
 # 2. 언어 설정 및 UI 텍스트
 # ---------------------------------------------------------
@@ -124,6 +88,7 @@ if language == "🇰🇷 한국어":
     ui_group_label, ui_group_opts = "👥 누구와? (Group)", ["혼자", "연인", "친구", "부모님", "어린이"]
     ui_msg_filter, ui_msg_result, ui_msg_no_result = "🎯 원하는 여행 스타일을 콕콕 찍어보세요!", "🔍 **검색 결과:** 총", "조건에 맞는 장소가 없거나, 시간을 선택하지 않으셨습니다. 😅"
     ui_expander_label, ui_btn_map, ui_tag_info, ui_btn_reset, ui_img_missing = "📝 상세정보 보기 (Click)", "🗺️ 지도 보기", "📢 **선택된 태그:**", "🔄 태그 초기화", "이미지 준비중"
+    ui_btn_more = "더 보기"
 else:
     col_name, col_desc, col_area, col_hub, col_cat, col_grp, col_tag, col_map, col_img = 'Name_EN', 'Description_EN', 'Area_EN', 'Hub_EN', 'Category_EN', 'Group_EN', 'Tag_EN', 'Google_Map_EN', 'Google_Image_EN'
     ui_title = "🐙 Osaka/Kyoto Travel Guide (Ver 2.0)"
@@ -133,23 +98,10 @@ else:
     ui_group_label, ui_group_opts = "👥 With whom? (Group)", ["Solo", "Couple", "Friends", "Parents", "Kids"]
     ui_msg_filter, ui_msg_result, ui_msg_no_result = "🎯 Select your travel style!", "🔍 **Results:** Total", "No places found matching your criteria. 😅"
     ui_expander_label, ui_btn_map, ui_tag_info, ui_btn_reset, ui_img_missing = "📝 View Details (Click)", "🗺️ Google Map", "📢 **Selected Tags:**", "🔄 Reset Tags", "Image coming soon"
+    ui_btn_more = "Load more"
 
 # ---------------------------------------------------------
-# 3. 로직 함수 (시간 계산)
-# ---------------------------------------------------------
-def calculate_total_time(user_hub, place_hub, deep_time):
-    hub_map = {"Namba": "난바", "Umeda": "우메다", "Kyoto Station": "교토역", "난바": "난바", "우메다": "우메다", "교토역": "교토역"}
-    u_hub = hub_map.get(user_hub, user_hub)
-    p_hub = hub_map.get(place_hub, place_hub)
-    transit_time = 0
-    if u_hub == p_hub: transit_time = 0
-    elif (u_hub == "난바" and p_hub == "우메다") or (u_hub == "우메다" and p_hub == "난바"): transit_time = 20
-    elif (u_hub == "우메다" and p_hub == "교토역") or (u_hub == "교토역" and p_hub == "우메다"): transit_time = 30
-    elif (u_hub == "난바" and p_hub == "교토역") or (u_hub == "교토역" and p_hub == "난바"): transit_time = 50
-    return transit_time + deep_time
-
-# ---------------------------------------------------------
-# 4. 화면 구성 (UI)
+# 3. 화면 구성 (UI)
 # ---------------------------------------------------------
 st.title(ui_title)
 
@@ -179,34 +131,28 @@ with col_f2:
 st.divider()
 
 # ---------------------------------------------------------
-# 5. 데이터 필터링 로직
+# 4. 데이터 필터링 로직
 # ---------------------------------------------------------
-df['Total_Time'] = df.apply(lambda row: calculate_total_time(user_hub, row[col_hub], row['Deep_Time']), axis=1)
+# (공유 df는 수정하지 않고, 소요 시간 컬럼을 붙인 이번 rerun용 df를 만듦)
+df = df.assign(Total_Time=travel_times.for_hub(user_hub))
+
+# 테마 / 그룹 / 태그 조건은 비트마스크로 합침 (rerun마다 문자열 검색 X)
+facet_mask = facets.all_rows
+if selected_categories:
+    facet_mask &= facets.any_of(col_cat, selected_categories, contains=True)
+if selected_groups:
+    facet_mask &= facets.any_of(col_grp, selected_groups, contains=True)
+if st.session_state.selected_tags:
+    facet_mask &= facets.any_of(col_tag, st.session_state.selected_tags, contains=True)
 
 if not selected_times:
     filtered_df = pd.DataFrame(columns=df.columns)
 else:
-    conditions = []
-    if ui_time_opts[0] in selected_times: conditions.append(df['Total_Time'] <= 30)
-    if ui_time_opts[1] in selected_times: conditions.append((df['Total_Time'] > 30) & (df['Total_Time'] <= 60))
-    if ui_time_opts[2] in selected_times: conditions.append((df['Total_Time'] > 60) & (df['Total_Time'] <= 120))
-    
-    if conditions:
-        final_condition = conditions[0]
-        for c in conditions[1:]: final_condition = final_condition | c
-        filtered_df = df[final_condition]
-    else:
-        filtered_df = df
-
-if selected_categories:
-    filtered_df = filtered_df[filtered_df[col_cat].apply(lambda x: any(cat in str(x) for cat in selected_categories))]
-if selected_groups:
-    filtered_df = filtered_df[filtered_df[col_grp].apply(lambda x: any(grp in str(x) for grp in selected_groups))]
+    bucket_ids = [i for i, opt in enumerate(ui_time_opts) if opt in selected_times]
+    filtered_df = df[travel_times.bucket_mask(user_hub, bucket_ids) & facets.to_bool(facet_mask)]
 
 if st.session_state.selected_tags:
     st.info(f"{ui_tag_info} {', '.join([f'#{t}' for t in st.session_state.selected_tags])}")
-    pattern = '|'.join(st.session_state.selected_tags)
-    filtered_df = filtered_df[filtered_df[col_tag].str.contains(pattern, na=False)]
 
     if st.button(ui_btn_reset):
         st.session_state.selected_tags = []
@@ -216,7 +162,7 @@ if st.session_state.selected_tags:
 filtered_df = filtered_df.sort_values('Total_Time')
 
 # ---------------------------------------------------------
-# 6. 결과 출력
+# 5. 결과 출력
 # ---------------------------------------------------------
 st.markdown(f"{ui_msg_result} **{len(filtered_df)}**")
 
@@ -232,7 +178,10 @@ else:
     else:
         num_columns = 1
 
-    rows = [filtered_df.iloc[i:i + num_columns] for i in range(0, len(filtered_df), num_columns)]
+    # 결과가 많아도 보이는 만큼만 그림 (필터가 바뀌면 다시 처음 RESULT_PAGE_SIZE개부터)
+    filter_state = (user_hub, tuple(selected_times), tuple(selected_categories), tuple(selected_groups), tuple(st.session_state.selected_tags))
+    visible_df = result_window.visible_rows(filtered_df, "results", reset_key=filter_state, page_size=RESULT_PAGE_SIZE)
+    rows = [visible_df.iloc[i:i + num_columns] for i in range(0, len(visible_df), num_columns)]
 
     for row_data in rows:
         cols = st.columns(num_columns)
@@ -240,11 +189,10 @@ else:
         for col, (index, row) in zip(cols, row_data.iterrows()):
             with col:
                 # --- [A] 이미지 ---
-                img_path = os.path.join("images", f"{row['Name_EN']}.jpg")
                 target_link = str(row.get(col_img, '')).strip()
                 img_height = "200px" if num_columns > 1 else "250px"
                 
-                html_code = get_clickable_image_html(img_path, target_link, height=img_height)
+                html_code = get_clickable_image_html(image_manifest.asset_for(row['Name_EN']), target_link, height=img_height)
                 
                 if html_code:
                     st.markdown(html_code, unsafe_allow_html=True)
@@ -296,11 +244,18 @@ else:
                         st.button(ui_btn_map, disabled=True, key=f"map_dis_{index}", use_container_width=True)
                 
                 st.write("---")
+
+    result_window.show_more_button(len(filtered_df), "results", ui_btn_more, page_size=RESULT_PAGE_SIZE)
                 
 # ---------------------------------------------------------
 # [관리자 기능] 사이드바 강제 노출 (Debugging)
 # ---------------------------------------------------------
 
+@st.cache_resource
+def get_log_viewer():
+    # 줄 위치 인덱스는 프로세스당 1개 (rerun마다 새로 추가된 줄만 이어서 인덱싱)
+    return LogViewer(log_store.get_store("user_actions"), time_field="Time")
+
 # 👇 이 코드는 들여쓰기 없이 '맨 왼쪽' 벽에 붙여야 합니다!
 with st.sidebar:
     st.divider()
@@ -313,19 +268,32 @@ with st.sidebar:
     if input_pw == "1234":
         st.success("접속 성공!")
         
-        if os.path.exists("user_logs.csv"):
-            log_df = pd.read_csv("user_logs.csv")
+        # 로그 뷰어: 줄 위치 인덱스로 보여줄 페이지만 읽음 (전체 로그를 매번 파싱하지 않음)
+        viewer = get_log_viewer()
+        total_logs = viewer.refresh()
+        log_columns = ["Time", "Action", "Detail"]
+        if total_logs:
             
-            # 3. 다운로드 버튼 (사이드바에 생성)
-            csv_data = log_df.to_csv(index=False).encode('utf-8-sig')
+            # 3. 다운로드 버튼 (사이드바에 생성) - CSV는 버튼을 눌렀을 때만 생성
             st.download_button(
                 label="📥 로그 다운로드",
-                data=csv_data,
+                data=lambda: viewer.export_csv(log_columns),
                 file_name="user_logs.csv",
                 mime="text/csv"
             )
-            # 4. 데이터 미리보기 (사이드바가 좁으니 3개만)
-            st.write("최신 로그 3개:")
-            st.dataframe(log_df.tail(3), use_container_width=True)
+            # 4. 데이터 미리보기 (사이드바가 좁으니 페이지 단위로)
+            st.caption(f"전체 로그 {total_logs}개")
+            page_size = st.selectbox("페이지 크기", [3, 10, 50], key="log_page_size")
+            log_range = st.date_input("기간 검색 (선택)", value=[], key="log_range")
+            if len(log_range) == 2:
+                # 기간 검색: 이진 탐색으로 시작 위치를 찾은 뒤 그 구간만 읽음
+                range_end = (log_range[1] + timedelta(days=1)).isoformat()
+                page_logs, range_count = viewer.time_range(log_range[0].isoformat(), range_end, page_size)
+                st.write(f"기간 내 로그 {range_count}개 (앞에서부터 {len(page_logs)}개):")
+            else:
+                page = st.number_input("페이지 (0 = 최신)", min_value=0, max_value=viewer.num_pages(page_size) - 1, step=1, key="log_page")
+                page_logs = viewer.page_from_tail(int(page), page_size)
+                st.write(f"최신 로그 {page_size}개:" if page == 0 else f"{page}페이지 전 로그:")
+            st.dataframe(pd.DataFrame(page_logs, columns=log_columns), use_container_width=True)
         else:
             st.warning("로그 파일 없음")
@@ -0,0 +1,211 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+from catalog_schema import Catalog, compile_catalog
+
+# =========================================================
+# 장소 카탈로그 (구글 시트) 로드 & 로컬 스냅샷 관리
+# =========================================================
+# - 앱 시작 시에는 디스크에 저장된 Parquet 스냅샷을 바로 엽니다. (네트워크 X)
+# - 시트 다운로드는 백그라운드 스레드에서만 일어나고,
+#   내용(해시)이 바뀌었을 때만 스냅샷을 교체합니다.
+# - 다운로드가 실패하면 마지막으로 정상 저장된 스냅샷을 계속 사용합니다.
+
+logger = logging.getLogger(__name__)
+
+SHEET_ID = "1aEKUB0EBFApDKLVRd7cMbJ6vWlR7-yf62L5MHqMGvp4"
+SHEET_CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:csv&gid=0"
+
+SNAPSHOT_DIR = ".catalog_cache"
+SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, "catalog.parquet")
+META_PATH = os.path.join(SNAPSHOT_DIR, "catalog_meta.json")
+
+FETCH_TIMEOUT = 10
+
+_lock = threading.Lock()
+_refresher = None
+_meta_cache = {"mtime": None, "meta": {}}
+
+
+# ---------------------------------------------------------
+# 스냅샷 메타데이터 (해시, ETag, 마지막 확인 시각)
+# ---------------------------------------------------------
+def read_meta():
+    try:
+        mtime = os.path.getmtime(META_PATH)
+    except OSError:
+        return {}
+    # 메타 파일이 바뀌지 않았다면 매 rerun마다 JSON을 다시 읽지 않음
+    if _meta_cache["mtime"] != mtime:
+        try:
+            with open(META_PATH, encoding="utf-8") as f:
+                _meta_cache["meta"] = json.load(f)
+        except (OSError, ValueError):
+            _meta_cache["meta"] = {}
+        _meta_cache["mtime"] = mtime
+    return _meta_cache["meta"]
+
+
+def _write_meta(meta):
+    tmp_path = META_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, META_PATH)
+
+
+def catalog_version():
+    """현재 스냅샷의 내용 해시 (캐시 키로 사용). 스냅샷이 없으면 빈 문자열"""
+    return read_meta().get("sha256", "")
+
+
+def has_snapshot():
+    return os.path.exists(SNAPSHOT_PATH)
+
+
+def read_snapshot():
+    """디스크 스냅샷을 원본 형태의 DataFrame으로 읽음. 없거나 깨졌으면 None"""
+    if not has_snapshot():
+        return None
+    try:
+        return pd.read_parquet(SNAPSHOT_PATH)
+    except Exception as e:
+        logger.warning(f"Catalog snapshot read failed: {e}")
+        return None
+
+
+def _write_snapshot(raw_df, meta):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    # 임시 파일에 쓰고 교체 -> 읽는 쪽이 반쯤 쓰인 파일을 보는 일이 없음
+    tmp_path = SNAPSHOT_PATH + ".tmp"
+    raw_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, SNAPSHOT_PATH)
+    _write_meta(meta)
+
+
+# ---------------------------------------------------------
+# 시트 다운로드 (조건부 요청 + 내용 해시 비교)
+# ---------------------------------------------------------
+def _fetch_sheet_csv(meta):
+    """변경이 없으면 None, 있으면 (csv bytes, 응답 헤더) 반환"""
+    request = urllib.request.Request(SHEET_CSV_URL)
+    if meta.get("etag"):
+        request.add_header("If-None-Match", meta["etag"])
+    if meta.get("last_modified"):
+        request.add_header("If-Modified-Since", meta["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            return response.read(), response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+
+def refresh_catalog():
+    """
+    시트를 확인해서 내용이 바뀌었을 때만 스냅샷을 교체
+    - 반환값: 스냅샷이 교체되었으면 True
+    - 다운로드/파싱 실패 시 기존 스냅샷을 그대로 두고 False
+    """
+    with _lock:
+        meta = dict(read_meta())
+        now = time.time()
+        try:
+            fetched = _fetch_sheet_csv(meta if has_snapshot() else {})
+        except Exception as e:
+            logger.warning(f"Catalog fetch failed, keeping last snapshot: {e}")
+            return False
+
+        if fetched is None:
+            meta["checked_at"] = now
+            _write_meta(meta)
+            return False
+
+        body, headers = fetched
+        digest = hashlib.sha256(body).hexdigest()
+        if digest == meta.get("sha256") and has_snapshot():
+            meta["checked_at"] = now
+            _write_meta(meta)
+            return False
+
+        try:
+            raw_df = pd.read_csv(io.BytesIO(body))
+        except Exception as e:
+            logger.warning(f"Catalog parse failed, keeping last snapshot: {e}")
+            return False
+        if raw_df.empty:
+            logger.warning("Catalog fetch returned no rows, keeping last snapshot")
+            return False
+
+        new_meta = {
+            "sha256": digest,
+            "etag": headers.get("ETag", ""),
+            "last_modified": headers.get("Last-Modified", ""),
+            "rows": len(raw_df),
+            "fetched_at": now,
+            "checked_at": now,
+        }
+        _write_snapshot(raw_df, new_meta)
+        logger.info(f"Catalog snapshot updated ({len(raw_df)} rows, {digest[:12]})")
+        return True
+
+
+def load_catalog():
+    """
+    앱에서 사용할 컴파일된 카탈로그 (catalog_schema.Catalog)
+    - 스냅샷이 있으면 네트워크 없이 바로 반환
+    - 최초 실행(스냅샷 없음)일 때만 시트를 직접 받아옴
+    """
+    raw_df = read_snapshot()
+    if raw_df is None:
+        refresh_catalog()
+        raw_df = read_snapshot()
+    if raw_df is None:
+        return Catalog(pd.DataFrame(), {}, ["no catalog snapshot and sheet unreachable"])
+
+    compiled = compile_catalog(raw_df, version=catalog_version())
+    if compiled.violations:
+        logger.warning(
+            f"Catalog schema: {len(compiled.violations)} violation(s), e.g. {compiled.violations[:3]}"
+        )
+    return compiled
+
+
+# ---------------------------------------------------------
+# 백그라운드 갱신 스레드 (프로세스당 1개)
+# ---------------------------------------------------------
+def _refresh_loop(interval):
+    while True:
+        checked_at = read_meta().get("checked_at", 0)
+        wait = checked_at + interval - time.time()
+        if wait > 0:
+            time.sleep(wait)
+            continue
+        try:
+            refresh_catalog()
+        except Exception as e:
+            logger.warning(f"Catalog refresh error: {e}")
+        # 실패해서 확인 시각이 그대로라면 잠시 쉬었다가 재시도 (바로 재시도 반복 방지)
+        if read_meta().get("checked_at", 0) == checked_at:
+            time.sleep(min(interval, 60))
+
+
+def start_background_refresh(interval=600):
+    """interval(초)마다 시트 변경 여부를 확인하는 데몬 스레드를 시작 (중복 시작 X)"""
+    global _refresher
+    with _lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(
+                target=_refresh_loop, args=(interval,), name="catalog-refresh", daemon=True
+            )
+            _refresher.start()
+    return _refresher
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+from spatial_index import NeighborGraph, SpatialIndex
+
+# =========================================================
+# 카탈로그 스키마 컴파일러
+# =========================================================
+# 시트 원본(문자열 위주)을 타입이 정해진 가벼운 카탈로그로 변환합니다.
+# - 반복되는 값(허브, 지역, 구역, 카테고리) -> category 타입 (문자열을 한 번만 저장)
+# - Deep_Time -> int16 / 위도·경도 -> float32
+# - 여러 값이 들어있는 칸(Type, Category, Group, Tag) -> 미리 잘라서 코드 배열로 보관
+# - 규칙에 맞지 않는 값은 violations 목록으로 보고
+
+REQUIRED_COLUMNS = ["Name_KR", "Name_EN"]
+
+# 컴파일 시 추가되는 장소 고유 ID 컬럼 (시트의 ID가 있으면 그대로, 없으면 영문 이름 기반)
+ID_COLUMN = "Place_ID"
+
+CATEGORICAL_COLUMNS = [
+    "Hub_KR", "Hub_EN",
+    "Area_KR", "Area_EN",
+    "Zone", "ZONE", "zone",
+    "Category_KR", "Category_EN",
+    "Landmark_KR", "Landmark_EN",
+]
+
+# 여러 값이 들어있는 컬럼 -> 구분자
+MULTI_VALUE_COLUMNS = {
+    "Type": ",",
+    "Category_KR": ",", "Category_EN": ",",
+    "Group_KR": ",", "Group_EN": ",",
+    "Tag": "#", "Tag_KR": "#", "Tag_EN": "#",
+}
+
+KNOWN_HUBS = {"난바", "우메다", "교토역", "Namba", "Umeda", "Kyoto Station"}
+
+# 오사카/교토 주변을 크게 감싸는 범위 (이 밖의 좌표는 입력 실수로 봄)
+LAT_RANGE = (33.0, 36.5)
+LON_RANGE = (134.0, 137.0)
+
+
+class MultiValueColumn:
+    """
+    'a, b, c' 형태의 칸을 미리 잘라둔 결과 (CSR 형식)
+    - vocab: 등장한 값 목록 (코드 = vocab의 인덱스)
+    - codes: 모든 행의 값 코드를 이어붙인 배열
+    - offsets: i번째 행의 코드는 codes[offsets[i]:offsets[i+1]]
+    """
+
+    def __init__(self, values, sep):
+        vocab = {}
+        codes = []
+        offsets = [0]
+        for value in values:
+            for token in str(value).split(sep):
+                token = token.strip()
+                if token:
+                    codes.append(vocab.setdefault(token, len(vocab)))
+            offsets.append(len(codes))
+        self.vocab = list(vocab)
+        self.codes = np.array(codes, dtype=np.int32)
+        self.offsets = np.array(offsets, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def row_codes(self, i):
+        return self.codes[self.offsets[i]:self.offsets[i + 1]]
+
+    def row_values(self, i):
+        return [self.vocab[c] for c in self.row_codes(i)]
+
+    def row_ids(self):
+        """codes와 같은 길이의 '행 번호' 배열 (벡터 연산용)"""
+        return np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+
+
+class Catalog:
+    """컴파일된 카탈로그: 타입이 정해진 DataFrame + 미리 자른 다중값 + 스키마 위반 목록"""
+
+    def __init__(self, df, multi_values, violations, version=""):
+        self.df = df
+        self.multi_values = multi_values
+        self.violations = violations
+        self.version = version
+        # 장소 ID -> 행 위치 (세션에는 ID만 저장하고, 화면에서는 이 인덱스로 바로 찾음)
+        ids = df[ID_COLUMN].tolist() if ID_COLUMN in df.columns else []
+        self.id_to_pos = {place_id: i for i, place_id in enumerate(ids)}
+        # 좌표 -> 장소 ID (지도 클릭 처리용 격자 인덱스) / 장소별 거리순 주변 장소
+        self.locations = SpatialIndex.from_df(df, ID_COLUMN)
+        self.neighbors = NeighborGraph.from_df(df)
+        self.zone_col = zone_column(df)
+
+    def get(self, place_id):
+        """장소 ID로 현재 카탈로그의 행(Series)을 찾음. 없으면 None (예: 시트에서 삭제됨)"""
+        pos = self.id_to_pos.get(place_id)
+        if pos is None:
+            return None
+        return self.df.iloc[pos]
+
+    def nearby(self, place_id):
+        """주변 장소 (행 DataFrame, 거리(m) 배열) - 가까운 순, 좌표가 없는 장소면 빈 결과"""
+        positions, meters = self.neighbors.nearby(self.id_to_pos.get(place_id))
+        return self.df.iloc[positions], meters
+
+    def memory_bytes(self):
+        return int(self.df.memory_usage(deep=True).sum())
+
+
+def zone_column(df):
+    """Zone 컬럼 이름 방어 (Zone / ZONE / zone)"""
+    for column in ('ZONE', 'zone'):
+        if column in df.columns:
+            return column
+    return 'Zone'
+
+
+def _clean_type(series):
+    # 숫자로 읽힌 Type(예: 1.0)을 문자열 '1'로 통일
+    series = series.astype(str).str.replace(r'\.0$', '', regex=True)
+    return series.replace('nan', '')
+
+
+def _place_ids(df, violations):
+    if 'ID' in df.columns:
+        ids = df['ID'].fillna("").astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+        if (ids != "").all() and ids.is_unique:
+            return ids.tolist()
+        violations.append("ID column has empty or duplicate values -> using Name_EN based IDs")
+
+    name_column = 'Name_EN' if 'Name_EN' in df.columns else 'Name_KR'
+    names = df[name_column].fillna("").astype(str).str.strip() if name_column in df.columns else pd.Series([""] * len(df))
+    ids, seen = [], {}
+    for i, name in enumerate(names):
+        base = name or f"row{i}"
+        seen[base] = seen.get(base, 0) + 1
+        ids.append(base if seen[base] == 1 else f"{base}~{seen[base]}")
+    return ids
+
+
+def compile_catalog(raw_df, version=""):
+    df = raw_df.copy()
+    violations = []
+
+    for column in REQUIRED_COLUMNS:
+        if column not in df.columns:
+            violations.append(f"missing column: {column}")
+        else:
+            empty_rows = df.index[df[column].isna() | (df[column].astype(str).str.strip() == "")]
+            for i in empty_rows:
+                violations.append(f"row {i}: empty {column}")
+
+    if '위도' in df.columns and '경도' in df.columns:
+        df = df.rename(columns={'위도': 'lat', '경도': 'lon'})
+
+    # --- 숫자 컬럼 ---
+    if 'Deep_Time' in df.columns:
+        text = df['Deep_Time'].fillna("").astype(str).str.replace('분', '').str.strip()
+        minutes = pd.to_numeric(text, errors='coerce')
+        for i in df.index[minutes.isna() & (text != "")]:
+            violations.append(f"row {i}: Deep_Time not a number ({df.at[i, 'Deep_Time']!r})")
+        df['Deep_Time'] = minutes.fillna(0).clip(0, np.iinfo(np.int16).max).astype(np.int16)
+
+    if 'lat' in df.columns and 'lon' in df.columns:
+        for column, (low, high) in (('lat', LAT_RANGE), ('lon', LON_RANGE)):
+            values = pd.to_numeric(df[column], errors='coerce')
+            out_of_range = values.notna() & (values != 0) & ((values < low) | (values > high))
+            for i in df.index[out_of_range]:
+                violations.append(f"row {i}: {column} out of range ({values[i]})")
+            df[column] = values.astype(np.float32)
+
+    if 'Type' in df.columns:
+        df['Type'] = _clean_type(df['Type'])
+
+    # --- 나머지 컬럼은 기존처럼 빈칸을 "" 로 ---
+    numeric_columns = {'Deep_Time', 'lat', 'lon'}
+    for column in df.columns:
+        if column not in numeric_columns:
+            df[column] = df[column].fillna("")
+
+    for column in ('Hub_KR', 'Hub_EN'):
+        if column in df.columns:
+            for i, hub in df[column].items():
+                if hub != "" and str(hub).strip() not in KNOWN_HUBS:
+                    violations.append(f"row {i}: unknown {column} ({hub!r})")
+
+    # --- 반복되는 문자열 -> category ---
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(str).str.strip().astype("category")
+
+    multi_values = {
+        column: MultiValueColumn(df[column].tolist(), sep)
+        for column, sep in MULTI_VALUE_COLUMNS.items()
+        if column in df.columns
+    }
+
+    df = df.reset_index(drop=True)
+    df[ID_COLUMN] = _place_ids(df, violations)
+    return Catalog(df, multi_values, violations, version)
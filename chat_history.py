@@ -0,0 +1,149 @@
+import logging
+import re
+
+from lazy_imports import lazy_import
+
+# =========================================================
+# 챗봇 대화 기록 (토큰 예산 + 최근 대화 창 + 누적 요약)
+# =========================================================
+# 매 턴마다 [system] + 전체 대화를 그대로 보내면, 며칠씩 열어두는 세션에서
+# 프롬프트 크기 / 첫 토큰까지 걸리는 시간 / 비용이 대화 길이에 비례해서 계속 늘어납니다.
+# - 최근 대화는 max_turns 턴, window_tokens 토큰 안에서 원문 그대로 보냄
+# - 창 밖으로 밀려난 오래된 대화는 요약 하나로 접어서 system 메시지 뒤에 붙임
+# - 요약은 창이 넘칠 때만 다시 계산: 넘치면 창을 절반(low watermark)까지 줄이면서 한꺼번에 접음
+#   -> 요약 호출은 몇 턴에 한 번, 매 턴 프롬프트 크기는 system + 요약 + 창 이하로 고정
+# - 토큰 수는 로컬에서 계산 (tiktoken이 있으면 사용, 없으면 글자 종류별 근사치)
+# - 화면에 그리는 전체 대화(st.session_state.messages)는 그대로 두고, 보낼 메시지만 고름
+#
+# 사용 예)
+#   history = ChatHistory()                       # 세션마다 1개 (st.session_state에 보관)
+#   messages = history.prompt(system_text, st.session_state.messages, summarize)
+#   client.chat.completions.create(model=..., messages=messages, ...)
+
+logger = logging.getLogger(__name__)
+
+# 원문 그대로 보내는 최근 대화 (user+assistant 1쌍 = 1턴)
+MAX_TURNS = 8
+WINDOW_TOKENS = 3000
+# 요약 길이 상한 (요약 모델 max_tokens + 요약이 넘치면 앞부분부터 잘라냄)
+SUMMARY_TOKENS = 500
+# 메시지 1개당 role / 구분자 토큰 (OpenAI chat 형식 근사치)
+MESSAGE_OVERHEAD = 4
+
+tiktoken = lazy_import("tiktoken")
+_encoding = None
+
+# 한글/한자/가나 1글자 ~ 1토큰, 그 외(영문/숫자/기호/공백) 4글자 ~ 1토큰
+_WIDE_CHARS = re.compile("[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def _tiktoken_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # tiktoken이 없거나 인코딩 파일을 받을 수 없는 환경 -> 근사치 사용
+            logger.info(f"tiktoken unavailable, using approximate token counts: {e}")
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """텍스트 토큰 수 (로컬 계산, API 호출 X)"""
+    text = str(text or "")
+    encoding = _tiktoken_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def truncate_tokens(text, limit):
+    """앞부분을 잘라 limit 토큰 이하로 (최근 내용이 남도록)"""
+    while text and count_tokens(text) > limit:
+        text = text[len(text) // 8 + 1:]
+    return text
+
+
+class ChatHistory:
+    def __init__(self, max_turns=MAX_TURNS, window_tokens=WINDOW_TOKENS, summary_tokens=SUMMARY_TOKENS):
+        self.max_turns = max_turns
+        self.window_tokens = window_tokens
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        # messages[:self.start] 는 요약에 접힌 대화, messages[self.start:] 가 원문으로 보내는 창
+        self.start = 0
+        self.summaries = 0
+        self._tokens = {}
+
+    def _message_tokens(self, messages, i):
+        # 메시지는 추가만 되므로 위치별로 한 번만 계산
+        tokens = self._tokens.get(i)
+        if tokens is None:
+            tokens = self._tokens[i] = count_tokens(messages[i]["content"]) + MESSAGE_OVERHEAD
+        return tokens
+
+    def _fits(self, messages, start, max_turns, max_tokens):
+        window = messages[start:]
+        turns = sum(1 for m in window if m["role"] == "user")
+        tokens = sum(self._message_tokens(messages, i) for i in range(start, len(messages)))
+        return turns <= max_turns and tokens <= max_tokens
+
+    def _low_watermark(self, messages):
+        """창을 절반 예산까지 줄였을 때의 시작 위치 (마지막 user 메시지는 항상 남김)"""
+        max_turns, max_tokens = max(1, self.max_turns // 2), self.window_tokens // 2
+        last_user = max((i for i, m in enumerate(messages) if m["role"] == "user"), default=len(messages) - 1)
+        start = self.start
+        while start < last_user and not self._fits(messages, start, max_turns, max_tokens):
+            start += 1
+        # 턴 중간(assistant 답변)에서 시작하지 않도록 다음 user 메시지까지 이동
+        while start < last_user and messages[start]["role"] != "user":
+            start += 1
+        return start
+
+    def _fold(self, messages, end, summarize):
+        folded = messages[self.start:end]
+        try:
+            summary = summarize(self.summary, folded, self.summary_tokens)
+        except Exception as e:
+            # 요약 실패 시 이전 요약 유지 (접힌 대화는 빠지지만 프롬프트 크기는 계속 제한됨)
+            logger.warning(f"Chat summary failed ({len(folded)} messages): {e}")
+            summary = self.summary
+        self.summary = truncate_tokens(str(summary or "").strip(), self.summary_tokens)
+        self.start = end
+        self.summaries += 1
+        logger.info(f"Chat history folded {len(folded)} messages into summary "
+                    f"({count_tokens(self.summary)} tokens, #{self.summaries})")
+
+    def prompt(self, system, messages, summarize):
+        """
+        이번 턴에 보낼 메시지 = [system (+ 이전 대화 요약)] + 최근 대화 창
+        - summarize(이전 요약, 접을 메시지 목록, 토큰 상한) -> 새 요약 텍스트 (창이 넘칠 때만 호출)
+        """
+        if self.start > len(messages):
+            # 대화가 초기화된 경우
+            self.__init__(self.max_turns, self.window_tokens, self.summary_tokens)
+        if not self._fits(messages, self.start, self.max_turns, self.window_tokens):
+            end = self._low_watermark(messages)
+            if end > self.start:
+                self._fold(messages, end, summarize)
+
+        if self.summary:
+            system = f"{system}\n\n[이전 대화 요약]\n{self.summary}"
+        return [{"role": "system", "content": system}] + [
+            {"role": m["role"], "content": m["content"]} for m in messages[self.start:]
+        ]
+
+    def stats(self):
+        return {
+            "folded_messages": self.start,
+            "summary_tokens": count_tokens(self.summary),
+            "summaries": self.summaries,
+        }
+
+
+def format_transcript(messages):
+    """요약 요청용 대화 텍스트"""
+    names = {"user": "사용자", "assistant": "비서"}
+    return "\n".join(f"{names.get(m['role'], m['role'])}: {m['content']}" for m in messages)
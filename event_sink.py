@@ -0,0 +1,298 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+# =========================================================
+# 구글 시트 로그 전송 (백그라운드 배치 + 로컬 스풀)
+# =========================================================
+# 클릭할 때마다 시트에 한 줄씩 쓰면 매번 수백 ms를 기다리고 API 할당량도 많이 씁니다.
+# - emit(): 로컬 스풀 파일(.jsonl)에 한 줄 추가 + 큐에 넣고 바로 반환 (구글 API 대기 X)
+# - 워커 스레드: batch_size개가 모이거나 flush_interval초가 지나면 append_rows로 한 번에 기록
+# - 실패하면 같은 배치를 지수 백오프로 재시도 (워크시트 핸들도 다시 엶)
+# - 시트에 기록된 위치(offset)를 따로 저장 -> 재시작하면 못 보낸 이벤트부터 다시 전송
+# - 메모리 큐는 스풀의 일부만 들고 있음 (스풀 파일이 원본)
+#   - 시트 설정이 없으면: 큐를 비우고 스풀에만 기록, recheck_interval초마다 워커가 시트를 다시 확인
+#   - 큐가 max_queued개를 넘으면: 스풀에만 기록, 큐를 다 보낸 뒤 워커가 스풀에서 이어서 다시 읽음
+#   - 스풀을 다시 읽는 일은 항상 워커 스레드에서 (emit()을 부른 화면 스레드는 한 줄 쓰고 바로 반환)
+# - 스풀 파일이 max_spool_bytes를 넘으면 새 이벤트는 스풀에 쓰지 않고 버림 (시트 없이 오래 실행돼도 디스크가 무한히 늘지 않도록)
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = ".event_spool"
+BATCH_SIZE = 20
+FLUSH_INTERVAL = 5.0
+MAX_BACKOFF = 300
+MAX_QUEUED = 10_000
+RECHECK_INTERVAL = 600
+MAX_SPOOL_BYTES = 50_000_000
+# 스풀을 다시 읽어도 따라잡지 못할 때 (파일이 밖에서 바뀐 경우) 포기하기 전 시도 횟수
+REFILL_ATTEMPTS = 3
+
+# 모두 전송된 스풀 파일이 이 크기를 넘으면 비움
+COMPACT_BYTES = 1_000_000
+
+
+class SheetEventSink:
+    def __init__(self, open_worksheet, name, spool_dir=SPOOL_DIR,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_queued=MAX_QUEUED, recheck_interval=RECHECK_INTERVAL,
+                 max_spool_bytes=MAX_SPOOL_BYTES):
+        """
+        open_worksheet: gspread 워크시트를 여는 함수 (시트 설정이 없으면 None 반환)
+        name: 스풀 파일 이름 (보통 워크시트 이름, 예: "Logs_ai")
+        """
+        self._open_worksheet = open_worksheet
+        self._worksheet = None
+        self.spool_path = os.path.join(spool_dir, f"{name}.jsonl")
+        self.offset_path = self.spool_path + ".offset"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.recheck_interval = recheck_interval
+        self.max_spool_bytes = max_spool_bytes
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # True면 emit()은 스풀에만 기록 (_dormant_since: 시트 설정이 없어 쉬기 시작한 시각, 큐가 넘친 경우 None)
+        self._spool_only = False
+        self._dormant_since = None
+        self._thread = None
+        self._spool_full = False
+        self.sent = 0
+        self.failures = 0
+        self.dropped = 0
+
+        os.makedirs(spool_dir, exist_ok=True)
+        self._spool_bytes = self._repair_spool()
+        if self._spool_bytes > self._read_offset():
+            # 못 보낸 이벤트가 남아 있음 -> 워커가 스풀에서 읽어서 전송
+            self._spool_only = True
+            self.start()
+
+    # ---------------------------------------------------------
+    # 스풀 파일 (append-only) + 전송 완료 위치
+    # ---------------------------------------------------------
+    def _read_offset(self):
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset):
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self.offset_path)
+
+    def _repair_spool(self):
+        """쓰다가 중단된 마지막 줄을 잘라내고 스풀 크기 반환 (다음 이벤트가 그 줄에 이어 붙지 않도록)"""
+        try:
+            with open(self.spool_path, "rb+") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - 65536))
+                tail = f.read()
+                cut = tail.rfind(b"\n") + 1
+                if not tail or tail.endswith(b"\n") or (cut == 0 and len(tail) < size):
+                    return size
+                end = size - len(tail) + cut
+                f.truncate(end)
+                logger.warning(f"Event spool: dropped {size - end} byte(s) of a partial line in {self.spool_path}")
+                return end
+        except OSError:
+            return 0
+
+    def _replay(self):
+        """전송 완료 위치 이후 스풀 이벤트를 큐에 넣고 읽은 끝 위치 반환 (워커 스레드, 최대 max_queued개)"""
+        start = offset = self._read_offset()
+        replayed = 0
+        try:
+            with open(self.spool_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # emit()이 아직 쓰는 중인 줄 (락 없이 읽으므로)
+                    if self._queue.qsize() >= self.max_queued:
+                        break  # 나머지는 큐를 다 보낸 뒤 _ack()에서 이어서 읽음
+                    offset += len(line)
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._queue.put((row, offset))
+                    replayed += 1
+        except OSError:
+            return start
+        if replayed:
+            logger.info(f"Event sink: {replayed} unsent event(s) replayed from {self.spool_path}")
+        return offset
+
+    def _refill(self):
+        """
+        스풀 전용 모드 해제 (워커 스레드에서 큐가 비었을 때 호출)
+        스풀은 락 없이 읽음 -> 그 사이 emit()은 계속 스풀에만 쓰고, 끝까지 따라잡았을 때만 큐로 받기 시작
+        """
+        for _ in range(REFILL_ATTEMPTS):
+            end = self._replay()
+            with self._lock:
+                if end >= self._spool_bytes:
+                    self._spool_only = False
+                    self._dormant_since = None
+                    return
+                if not self._queue.empty():
+                    return  # 읽은 것을 다 보내면 _ack()에서 이어서 읽음
+        logger.warning(f"Event sink: could not catch up with {self.spool_path}, sending new events only")
+        with self._lock:
+            self._spool_only = False
+            self._dormant_since = None
+
+    def _append(self, line):
+        """스풀에 한 줄 추가 -> 끝 위치 (쓰기 실패 / 용량 초과로 버리면 None). self._lock 안에서 호출"""
+        if self._spool_bytes + len(line) > self.max_spool_bytes:
+            self.dropped += 1
+            if not self._spool_full:
+                self._spool_full = True
+                logger.warning(f"Event spool full ({self.max_spool_bytes} bytes), dropping new events: {self.spool_path}")
+            return None
+        try:
+            with open(self.spool_path, "ab") as f:
+                f.write(line)
+                end = f.tell()
+        except OSError as e:
+            logger.warning(f"Event spool write failed: {e}")
+            return None
+        self._spool_bytes = end
+        return end
+
+    def emit(self, row):
+        """이벤트 한 줄(list)을 기록 예약. 디스크에 쓰고 바로 반환 (스풀을 다시 읽는 일은 워커가 함)"""
+        line = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            end = self._append(line)
+            if not self._spool_only:
+                if self._queue.qsize() >= self.max_queued:
+                    if end is not None:
+                        self._spool_only = True
+                        logger.warning(f"Event sink queue full ({self.max_queued}), keeping new events in {self.spool_path} only")
+                    return
+                self._queue.put((row, end))
+            elif self._dormant_since is None or time.monotonic() - self._dormant_since < self.recheck_interval:
+                return  # 스풀에만 보관
+            else:
+                # 시트 설정이 생겼는지 워커가 다시 확인 (다음 확인은 다시 recheck_interval초 뒤)
+                self._dormant_since = time.monotonic()
+        self.start()
+
+    # ---------------------------------------------------------
+    # 백그라운드 전송
+    # ---------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sheet-event-sink", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        if self._dormant_since is not None:
+            if not self._has_worksheet():
+                self._sleep()
+                return
+            self._dormant_since = None
+        if self._spool_only:
+            self._refill()
+
+        batch = []
+        backoff = 1
+        while True:
+            if not batch:
+                batch.append(self._queue.get())
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            sent = self._send([row for row, _ in batch])
+            if sent is None:
+                self._sleep()
+                return
+            if sent:
+                self._ack(batch)
+                batch = []
+                backoff = 1
+            else:
+                # 같은 배치를 유지한 채 잠시 후 재시도 (그 사이 들어온 이벤트는 큐에서 대기)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def _sleep(self):
+        """시트 설정 없음 -> 큐를 비우고 스풀에만 기록 (워커 종료, recheck_interval 후 emit()이 워커를 다시 깨움)"""
+        with self._lock:
+            was_dormant = self._dormant_since is not None
+            self._spool_only = True
+            self._dormant_since = time.monotonic()
+            while not self._queue.empty():
+                self._queue.get_nowait()
+        if not was_dormant:
+            logger.info(f"Event sink: no worksheet configured, keeping events in {self.spool_path} only")
+
+    def _has_worksheet(self):
+        """시트 설정이 없으면 False (열기 실패는 True -> 평소처럼 _send()가 백오프로 재시도)"""
+        try:
+            if self._worksheet is None:
+                self._worksheet = self._open_worksheet()
+        except Exception as e:
+            logger.warning(f"Event sink worksheet open failed: {e}")
+            return True
+        return self._worksheet is not None
+
+    def _send(self, rows):
+        """전송 성공 True / 실패(재시도) False / 시트 설정 없음 None"""
+        try:
+            if self._worksheet is None:
+                self._worksheet = self._open_worksheet()
+            if self._worksheet is None:
+                return None
+            self._worksheet.append_rows(rows)
+            self.sent += len(rows)
+            return True
+        except Exception as e:
+            self._worksheet = None
+            self.failures += 1
+            logger.warning(f"Event sink append failed ({len(rows)} rows): {e}")
+            return False
+
+    def _ack(self, batch):
+        ends = [end for _, end in batch if end is not None]
+        if not ends:
+            return
+        end = max(ends)
+        refill = False
+        with self._lock:
+            try:
+                fully_sent = self._queue.empty() and os.path.getsize(self.spool_path) == end
+            except OSError:
+                fully_sent = False
+            if fully_sent and end >= COMPACT_BYTES:
+                # 위치를 먼저 0으로 -> 비우기 전에 중단되면 중복 전송은 있어도 유실은 없음
+                self._write_offset(0)
+                open(self.spool_path, "wb").close()
+                self._spool_bytes = 0
+                self._spool_full = False
+            else:
+                self._write_offset(end)
+            # 큐가 넘쳐 스풀에만 기록한 이벤트 -> 이제 큐가 비었으니 스풀에서 이어서 읽음 (락 밖에서)
+            refill = self._spool_only and self._dormant_since is None and self._queue.empty()
+        if refill:
+            self._refill()
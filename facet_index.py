@@ -0,0 +1,149 @@
+import numpy as np
+
+# =========================================================
+# 필터용 비트셋 인덱스 (Type / Category / Group / Tag / Region)
+# =========================================================
+# 카탈로그를 불러올 때 한 번만 만들어 두고,
+# rerun마다 문자열을 다시 자르거나 검색하지 않고 비트 연산(&, |)으로 필터링합니다.
+# - 각 값(예: "자연", "Couple", "근랜드")마다 "그 값을 가진 행 번호"를 비트로 표시한 정수를 저장
+# - 여러 조건은 정수끼리 & (AND), | (OR) 로 합친 뒤 마지막에 한 번만 df.iloc으로 꺼냄
+
+# 지역 -> Hub_KR에 포함되어 있으면 해당 지역으로 보는 키워드 (기존 str.contains 패턴과 동일)
+REGION_HUB_KEYWORDS = {
+    "osaka": ("난바", "우메다"),
+    "kyoto": ("교토", "기온"),
+}
+
+
+def split_comma(value):
+    """'자연, 휴식' -> ['자연', '휴식']"""
+    return [t.strip() for t in str(value).split(',') if t.strip()]
+
+
+def split_hash(value):
+    """'#공원 #산책' -> ['공원', '산책']"""
+    return [t.strip() for t in str(value).split('#') if t.strip()]
+
+
+def first_comma(value):
+    """Type의 대표(첫 번째) 값만 사용 -> 추천 페이지의 '메인 타입' 매칭용"""
+    tokens = [t.strip() for t in str(value).split(',')]
+    return tokens[:1] if tokens and tokens[0] else []
+
+
+def whole_value(value):
+    value = str(value).strip()
+    return [value] if value else []
+
+
+def hub_region(value):
+    value = str(value)
+    return [region for region, keywords in REGION_HUB_KEYWORDS.items() if any(k in value for k in keywords)]
+
+
+# (인덱스 이름, 원본 컬럼, 값 분리 함수) - 컬럼이 없는 항목은 자동으로 건너뜀
+DEFAULT_FACETS = [
+    ("Region", "Hub_KR", hub_region),
+    ("Type", "Type", split_comma),
+    ("Type_main", "Type", first_comma),
+    ("Category_KR", "Category_KR", split_comma),
+    ("Category_EN", "Category_EN", split_comma),
+    ("Group_KR", "Group_KR", split_comma),
+    ("Group_EN", "Group_EN", split_comma),
+    ("Landmark_KR", "Landmark_KR", whole_value),
+    ("Landmark_EN", "Landmark_EN", whole_value),
+    ("Tag", "Tag", split_hash),
+    ("Tag_KR", "Tag_KR", split_hash),
+    ("Tag_EN", "Tag_EN", split_hash),
+]
+
+
+class FacetIndex:
+    def __init__(self, df, multi_values=None, facets=DEFAULT_FACETS):
+        """
+        multi_values: catalog_schema.compile_catalog가 미리 잘라둔 다중값 컬럼
+        (있으면 문자열을 다시 자르지 않고 코드 배열에서 바로 인덱스를 만듦)
+        """
+        self.n = len(df)
+        self._nbytes = (self.n + 7) // 8
+        self.all_rows = (1 << self.n) - 1
+        self._masks = {}
+        self._contains_cache = {}
+        multi_values = multi_values or {}
+
+        for name, column, tokenizer in facets:
+            if column not in df.columns:
+                continue
+            if column in multi_values and tokenizer in (split_comma, split_hash):
+                self._masks[name] = self._masks_from_codes(multi_values[column])
+                continue
+            positions = {}
+            for i, value in enumerate(df[column].tolist()):
+                for token in tokenizer(value):
+                    positions.setdefault(token, []).append(i)
+            self._masks[name] = {token: self._to_mask(pos) for token, pos in positions.items()}
+
+    def _masks_from_codes(self, column):
+        row_ids = column.row_ids()
+        order = np.argsort(column.codes, kind="stable")
+        sorted_codes = column.codes[order]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(column.vocab) + 1))
+        return {
+            token: self._to_mask(row_ids[order[bounds[code]:bounds[code + 1]]])
+            for code, token in enumerate(column.vocab)
+        }
+
+    def _to_mask(self, positions):
+        bits = np.zeros(self._nbytes * 8, dtype=bool)
+        bits[positions] = True
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    def has(self, facet):
+        return facet in self._masks
+
+    def values(self, facet):
+        return list(self._masks.get(facet, {}))
+
+    def mask(self, facet, value):
+        """facet에서 value 값을 가진 행들의 비트마스크 (정확히 일치)"""
+        return self._masks.get(facet, {}).get(value, 0)
+
+    def mask_contains(self, facet, text):
+        """
+        text를 포함하는 값을 가진 행들의 비트마스크
+        - 기존 `any(c in str(x) ...)` / `str.contains` 필터와 같은 부분 일치 동작
+        - 결과는 (facet, text)별로 기억해 두므로 두 번째부터는 바로 반환
+        """
+        key = (facet, text)
+        if key not in self._contains_cache:
+            result = 0
+            for token, token_mask in self._masks.get(facet, {}).items():
+                if text in token:
+                    result |= token_mask
+            self._contains_cache[key] = result
+        return self._contains_cache[key]
+
+    def any_of(self, facet, values, contains=False):
+        """values 중 하나라도 만족하는 행 (OR)"""
+        lookup = self.mask_contains if contains else self.mask
+        result = 0
+        for value in values:
+            result |= lookup(facet, value)
+        return result
+
+    def count(self, mask):
+        return mask.bit_count()
+
+    def to_bool(self, mask):
+        """비트마스크 -> 행 개수 길이의 bool 배열 (다른 조건과 & 로 합칠 때 사용)"""
+        raw = np.frombuffer(mask.to_bytes(self._nbytes, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little")[:self.n].astype(bool)
+
+    def positions(self, mask):
+        if not mask:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.to_bool(mask))
+
+    def take(self, df, mask):
+        """마스크에 해당하는 행만 원래 순서대로 꺼냄"""
+        return df.iloc[self.positions(mask)]
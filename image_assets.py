@@ -0,0 +1,418 @@
+import base64
+import functools
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from lazy_imports import lazy_import
+
+# PIL은 변형본을 실제로 만들거나 크기를 읽을 때 import
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# 장소 이미지 썸네일(크기별 변형본) 생성 & 선택
+# =========================================================
+# 카드 크기마다 원본 JPEG 전체를 보내지 않도록, 화면 크기에 맞춘 작은 WebP를 미리 만들어 둡니다.
+# - 빌드:  python image_assets.py   (images/ 안의 모든 jpg -> images/variants/)
+# - 화면:  pick_variant(원본 경로, "120px") -> 그 크기에 충분한 가장 작은 변형본
+# - 빌드를 안 했더라도 그 높이가 처음 요청될 때 한 번 만들어서 저장 (이후에는 파일만 읽음)
+#
+# [이미지 전송 방식] IMAGE_SERVING 환경변수
+# - "static" (기본): 내용 해시 파일명으로 static/img/에 복사 -> Streamlit 정적 파일 URL(app/static/...)
+#                    (.streamlit/config.toml 의 enableStaticServing = true 필요)
+#                    주의: Streamlit 정적 파일 응답에는 긴 Cache-Control 헤더가 없음
+#                    -> 파일명이 바뀌지 않는 한 같은 URL이라 재사용될 뿐, 브라우저가 매번 재검증할 수 있음
+# - "server": 별도 포트의 작은 정적 서버가 1년짜리 immutable 캐시 헤더로 제공
+#             기본은 127.0.0.1에만 열림 (같은 PC의 브라우저용)
+#             외부 브라우저에 제공하려면 IMAGE_SERVER_HOST=0.0.0.0 + IMAGE_BASE_URL(브라우저가 접속할 주소) 필수
+# - "inline": 예전처럼 base64 data URI (rerun마다 이미지 바이트가 다시 전송됨)
+#
+# [매니페스트] ImageManifest: 카탈로그를 불러올 때 한 번만 images/를 훑어서
+#   장소 ID -> 이미지 파일 / 크기 / 이미 있는 변형본을 정리 (인코딩 X -> 첫 요청을 막지 않음)
+#   없는 변형본은 백그라운드(warm)에서 만들고, 그 전에 요청된 높이만 화면에서 바로 만듦
+#   이미지별 정보는 (경로, 수정 시각)으로 프로세스 전체가 공유 -> 카탈로그 버전이나 앱이 달라도 1번만 만듦
+
+IMAGE_DIR = "images"
+VARIANT_DIR = os.path.join(IMAGE_DIR, "variants")
+
+# 카드 높이(px) -> 대략적인 최대 표시 너비(px)
+# 70: 주변 장소 / 120: 추천·전체 리스트 / 200: 갤러리 / 250: 설문 / 350: 상세
+DISPLAY_SIZES = {
+    70: 120,
+    120: 260,
+    200: 420,
+    220: 420,
+    250: 600,
+    350: 800,
+}
+
+SCALES = (1, 2)
+# data URI로 한 장만 보낼 때 사용할 배율 (휴대폰 화면 대부분이 2배율 이상)
+DEFAULT_SCALE = 2
+
+VARIANT_FORMAT = "WEBP"
+VARIANT_EXT = "webp"
+VARIANT_MIME = "image/webp"
+VARIANT_QUALITY = 78
+
+# (원본 경로, 수정 시각) -> 매니페스트 항목 (모든 ImageManifest가 공유)
+_entries = {}
+_entries_lock = threading.Lock()
+
+
+def parse_px(height):
+    """'120px' / 120 -> 120"""
+    return int(str(height).replace("px", "").strip())
+
+
+def _display_size(height_px):
+    # 등록되지 않은 높이는 그보다 큰 것 중 가장 작은 규격을 사용 (없으면 가장 큰 규격)
+    for h in sorted(DISPLAY_SIZES):
+        if h >= height_px:
+            return h, DISPLAY_SIZES[h]
+    h = max(DISPLAY_SIZES)
+    return h, DISPLAY_SIZES[h]
+
+
+def variant_path(src_path, height_px, scale=1):
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    return os.path.join(VARIANT_DIR, f"{stem}_h{height_px}@{scale}x.{VARIANT_EXT}")
+
+
+def existing_variant(src_path, height_px, scale=1):
+    """원본보다 최신인 변형본이 이미 있으면 그 경로, 없으면 None (파일 크기만 확인, 인코딩 X)"""
+    out_path = variant_path(src_path, height_px, scale)
+    try:
+        if os.path.getmtime(out_path) >= os.path.getmtime(src_path):
+            return out_path
+    except OSError:
+        pass
+    return None
+
+
+def build_variant(src_path, height_px, scale=1, force=False):
+    """
+    원본을 (표시 너비 x 높이) 박스를 덮는 크기로 줄여서 WebP로 저장
+    - 원본보다 크게 늘리지는 않음
+    - 이미 최신 변형본이 있으면 다시 만들지 않음
+    """
+    out_path = variant_path(src_path, height_px, scale)
+    if not force and existing_variant(src_path, height_px, scale):
+        return out_path
+
+    _, box_width = _display_size(height_px)
+    box_w, box_h = box_width * scale, height_px * scale
+
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        ratio = min(1.0, max(box_w / img.width, box_h / img.height))
+        if ratio < 1.0:
+            img = img.resize((max(1, round(img.width * ratio)), max(1, round(img.height * ratio))), Image.LANCZOS)
+        os.makedirs(VARIANT_DIR, exist_ok=True)
+        # 백그라운드 warm과 화면 요청이 같은 변형본을 동시에 만들 수 있으므로 임시 파일은 스레드별로
+        tmp_path = f"{out_path}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=6)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def pick_variant(src_path, height, scale=DEFAULT_SCALE):
+    """
+    화면 높이에 맞는 가장 작은 변형본의 (경로, MIME) 반환
+    - 원본이 없으면 (None, None)
+    - 변형본을 만들 수 없으면 원본 JPEG를 그대로 사용
+    """
+    if not os.path.exists(src_path):
+        return None, None
+    height_px, _ = _display_size(parse_px(height))
+    try:
+        return build_variant(src_path, height_px, scale), VARIANT_MIME
+    except Exception as e:
+        logger.warning(f"Thumbnail Error ({src_path}): {e}")
+        return src_path, "image/jpeg"
+
+
+# ---------------------------------------------------------
+# 정적 URL로 이미지 제공 (브라우저 캐시 사용)
+# ---------------------------------------------------------
+IMAGE_SERVING = os.environ.get("IMAGE_SERVING", "static")
+
+STATIC_IMG_DIR = os.path.join("static", "img")
+STATIC_URL_PREFIX = "app/static/img"
+
+STATIC_SERVER_HOST = os.environ.get("IMAGE_SERVER_HOST", "127.0.0.1")
+STATIC_SERVER_PORT = int(os.environ.get("IMAGE_SERVER_PORT", "8600"))
+IMAGE_BASE_URL = os.environ.get("IMAGE_BASE_URL", "").rstrip("/")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+_published = {}
+_server_lock = threading.Lock()
+_server = None
+
+
+def publish(path):
+    """
+    파일을 내용 해시 이름(예: 3f2a...c1.webp)으로 static/img에 복사하고 그 이름을 반환
+    - 내용이 바뀌면 이름도 바뀌므로 브라우저가 오래 캐시해도 안전
+    """
+    key = (path, os.path.getmtime(path))
+    if key not in _published:
+        with open(path, "rb") as f:
+            data = f.read()
+        _published[key] = publish_data(data, os.path.splitext(path)[1])
+    return _published[key]
+
+
+def publish_data(data, ext):
+    """메모리에 있는 내용(bytes)을 같은 방식(내용 해시 이름)으로 static/img에 저장 (예: 지도 GeoJSON)"""
+    name = f"{hashlib.sha256(data).hexdigest()[:20]}{ext}"
+    out_path = os.path.join(STATIC_IMG_DIR, name)
+    if not os.path.exists(out_path):
+        os.makedirs(STATIC_IMG_DIR, exist_ok=True)
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, out_path)
+    return name
+
+
+class _ImmutableFileHandler(SimpleHTTPRequestHandler):
+    """파일 이름이 내용 해시이므로 1년 동안 다시 묻지 않고 캐시하도록 헤더 추가"""
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def server_base_url(host=STATIC_SERVER_HOST, port=STATIC_SERVER_PORT, base_url=IMAGE_BASE_URL):
+    """
+    브라우저가 이미지 서버에 접속할 주소
+    - IMAGE_BASE_URL이 있으면 그대로 사용
+    - 없으면 127.0.0.1 등 로컬 주소에 열 때만 http://localhost:포트 (외부 주소에 열면서 주소를 안 주면 ValueError)
+    """
+    if base_url:
+        return base_url
+    if host in LOOPBACK_HOSTS:
+        return f"http://localhost:{port}"
+    raise ValueError(
+        f"IMAGE_SERVER_HOST={host} serves remote browsers; set IMAGE_BASE_URL to the address they can reach"
+    )
+
+
+def start_static_server(host=STATIC_SERVER_HOST, port=STATIC_SERVER_PORT):
+    """IMAGE_SERVING=server 일 때 사용하는 정적 이미지 서버 (프로세스당 1개)"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            server_base_url(host, port)  # 외부에 열면서 접속 주소가 없으면 서버를 띄우기 전에 실패
+            os.makedirs(STATIC_IMG_DIR, exist_ok=True)
+            handler = functools.partial(_ImmutableFileHandler, directory=STATIC_IMG_DIR)
+            _server = ThreadingHTTPServer((host, port), handler)
+            threading.Thread(target=_server.serve_forever, name="image-static", daemon=True).start()
+    return _server
+
+
+def asset_url(name):
+    if IMAGE_SERVING == "server":
+        start_static_server()
+        return f"{server_base_url()}/{name}"
+    return f"{STATIC_URL_PREFIX}/{name}"
+
+
+def root_asset_url(name, base_url_path=""):
+    """
+    페이지 주소와 상관없이 쓸 수 있는 URL (컴포넌트 iframe 안에서는 상대 경로 app/static/...이 깨짐)
+    - base_url_path: Streamlit server.baseUrlPath 설정값
+    """
+    if IMAGE_SERVING == "server":
+        return asset_url(name)
+    parts = [p for p in (base_url_path.strip("/"), STATIC_URL_PREFIX, name) if p]
+    return "/" + "/".join(parts)
+
+
+def img_src_attrs(src_path, height):
+    """
+    <img> 태그에 넣을 src(+srcset) 속성 문자열. 원본 이미지가 없으면 None
+    - URL 모드: 1x/2x 변형본을 srcset으로 제공 -> 브라우저가 화면 배율에 맞는 것만 받음
+    """
+    if IMAGE_SERVING == "inline":
+        path, mime = pick_variant(src_path, height)
+        if not path:
+            return None
+        with open(path, "rb") as f:
+            encoded = base64.b64encode(f.read()).decode()
+        return f'src="data:{mime};base64,{encoded}"'
+
+    if not os.path.exists(src_path):
+        return None
+    urls = {scale: asset_url(publish(pick_variant(src_path, height, scale)[0])) for scale in SCALES}
+    srcset = ", ".join(f"{url} {scale}x" for scale, url in urls.items())
+    return f'src="{urls[DEFAULT_SCALE]}" srcset="{srcset}"'
+
+
+# ---------------------------------------------------------
+# 이미지 매니페스트 (장소 ID -> 원본 / 크기 / 변형본)
+# ---------------------------------------------------------
+# 설문 화면용 이미지 (예: q1_landmark_osaka.jpg) - 장소와 연결되지 않아도 고아 파일로 보지 않음
+UI_IMAGE_PATTERN = re.compile(r"^q\d+[a-z]?_.+_(osaka|kyoto)$", re.IGNORECASE)
+
+
+def clean_filename(name):
+    """영문 이름 -> 이미지 파일명 (특수문자 제거)"""
+    return "".join([c if c.isalnum() or c in (' ', '_', '-') else '' for c in name]).strip()
+
+
+class ImageManifest:
+    """
+    카탈로그를 불러올 때 한 번 만드는 이미지 목록
+    - places: 장소 ID -> 이미지 키(파일 이름에서 확장자를 뺀 것)
+    - assets: 이미지 키 -> {"path", "size"(가로, 세로), "variants"{높이: [배율별 경로 / 아직 없으면 None]},
+                            "src_attrs"{높이: <img> 속성 (그 높이가 처음 쓰일 때 채움)}}
+    - missing: 이미지가 없는 장소 ID / orphans: 어떤 장소·설문에도 쓰이지 않는 파일
+    만들 때는 크기와 이미 있는 변형본만 확인 (WebP 인코딩은 warm() 또는 그 높이의 첫 화면 요청에서)
+    """
+
+    def __init__(self, place_ids, names, image_dir=IMAGE_DIR):
+        self.image_dir = image_dir
+        try:
+            listing = sorted(os.listdir(image_dir))
+        except OSError:
+            listing = []
+        files = {
+            os.path.splitext(name)[0]: name
+            for name in listing
+            if name.lower().endswith((".jpg", ".jpeg"))
+        }
+        # 대소문자만 다른 파일명도 찾을 수 있도록 (예: Q1_landmark_kyoto.jpg)
+        self._lower = {key.lower(): key for key in files}
+
+        self.places = {}
+        self.missing = []
+        for place_id, name in zip(place_ids, names):
+            key = self._resolve(clean_filename(str(name)), files)
+            if key is None:
+                self.missing.append(place_id)
+            else:
+                self.places[place_id] = key
+
+        used = set(self.places.values())
+        ui_keys = {key for key in files if UI_IMAGE_PATTERN.match(key)}
+        self.orphans = [files[key] for key in files if key not in used and key not in ui_keys]
+        self.assets = {key: self._build_entry(files[key]) for key in sorted(used | ui_keys)}
+
+    def _resolve(self, key, files):
+        if key in files:
+            return key
+        return self._lower.get(key.lower())
+
+    def _build_entry(self, filename):
+        path = os.path.join(self.image_dir, filename)
+        try:
+            key = (path, os.path.getmtime(path))
+        except OSError:
+            key = (path, None)
+        entry = _entries.get(key)
+        if entry is None:
+            entry = self._describe(path)
+            with _entries_lock:
+                entry = _entries.setdefault(key, entry)
+        return entry
+
+    @staticmethod
+    def _describe(path):
+        try:
+            with Image.open(path) as img:  # (헤더만 읽음, 디코딩 X)
+                size = img.size
+        except Exception as e:
+            logger.warning(f"Image Manifest Error ({path}): {e}")
+            size = (0, 0)
+        return {
+            "path": path,
+            "size": size,
+            "variants": {h: [existing_variant(path, h, scale) for scale in SCALES] for h in DISPLAY_SIZES},
+            "src_attrs": {},
+        }
+
+    @staticmethod
+    def _attrs(entry, height_px):
+        attrs = entry["src_attrs"].get(height_px)
+        if attrs is None:
+            # 이 높이가 처음 쓰일 때만 변형본 생성 (배율별 1장씩) -> 이후에는 dict 조회
+            attrs = img_src_attrs(entry["path"], height_px)
+            with _entries_lock:
+                entry["variants"][height_px] = [existing_variant(entry["path"], height_px, scale) for scale in SCALES]
+                attrs = entry["src_attrs"].setdefault(height_px, attrs)
+        return attrs
+
+    def warm(self):
+        """아직 없는 변형본을 백그라운드에서 미리 만들어 둠 (화면 요청 스레드에서 인코딩하지 않도록)"""
+        pending = [
+            entry for entry in self.assets.values()
+            if entry["size"] != (0, 0)  # (열 수 없는 파일은 만들 수 없음)
+            and any(path is None for paths in entry["variants"].values() for path in paths)
+        ]
+
+        def run():
+            for entry in pending:
+                for height_px in DISPLAY_SIZES:
+                    try:
+                        self._attrs(entry, height_px)
+                    except Exception as e:
+                        logger.warning(f"Image warm failed ({entry['path']}, {height_px}): {e}")
+
+        thread = threading.Thread(target=run, name="image-variant-warm", daemon=True)
+        if pending:
+            thread.start()
+        return thread
+
+    def asset_for(self, place_id):
+        """장소 ID -> 이미지 키 (없으면 None)"""
+        return self.places.get(place_id)
+
+    def src_attrs(self, key, height):
+        """이미지 키 + 화면 높이 -> <img> src(+srcset) 속성. 없으면 None"""
+        entry = self.assets.get(key) if key else None
+        if entry is None and key:
+            entry = self.assets.get(self._lower.get(key.lower()))
+        if entry is None:
+            return None
+        height_px, _ = _display_size(parse_px(height))
+        return self._attrs(entry, height_px)
+
+    def report(self):
+        lines = [f"Image manifest: {len(self.places)} places with images, {len(self.assets)} assets"]
+        if self.missing:
+            lines.append(f"- {len(self.missing)} place(s) without image: {', '.join(map(str, self.missing))}")
+        if self.orphans:
+            lines.append(f"- {len(self.orphans)} orphan file(s) in {self.image_dir}/: {', '.join(self.orphans)}")
+        return "\n".join(lines)
+
+
+def build_all(image_dir=IMAGE_DIR, force=False):
+    """images 폴더의 모든 jpg에 대해 모든 크기 x 배율 변형본 생성"""
+    count = 0
+    for name in sorted(os.listdir(image_dir)):
+        if not name.lower().endswith((".jpg", ".jpeg")):
+            continue
+        src_path = os.path.join(image_dir, name)
+        for height_px in DISPLAY_SIZES:
+            for scale in SCALES:
+                build_variant(src_path, height_px, scale, force=force)
+                count += 1
+    return count
+
+
+if __name__ == "__main__":
+    built = build_all(force="--force" in sys.argv)
+    print(f"{built} variants ready in {VARIANT_DIR}")
@@ -0,0 +1,116 @@
+import argparse
+import os
+import subprocess
+import sys
+
+from lazy_imports import HEAVY_MODULES
+
+# =========================================================
+# 모듈별 import 비용 리포트 (CI 확인용)
+# =========================================================
+# 모듈마다 새 파이썬 프로세스에서 `python -X importtime -c "import 모듈"`을 실행해
+# 누적 import 시간과, 그 모듈을 import 할 때 딸려 들어온 무거운 라이브러리(HEAVY_MODULES)를 표로 보여줍니다.
+# - 무거운 라이브러리: 실제로 import 하면 얼마나 걸리는지 (지연 import로 아끼는 시간)
+# - 앱 공용 모듈: 불러오기만 해도 무거운 라이브러리가 딸려오면 지연 import가 깨진 것
+#   (streamlit이 원래 불러오는 모듈은 제외)
+#
+# 사용 예)
+#   python import_report.py                    # 표 출력
+#   python import_report.py --check            # 공용 모듈이 무거운 라이브러리를 불러오면 실패 (exit 1)
+#   python import_report.py --check --budget-ms 1500   # 공용 모듈 누적 시간 상한도 함께 확인
+
+# 앱 파일들이 맨 위에서 import 하는 공용 모듈
+APP_MODULES = (
+    "lazy_imports",
+    "app_core",
+    "catalog",
+    "catalog_schema",
+    "facet_index",
+    "spatial_index",
+    "recommendations",
+    "locales",
+    "chat_history",
+    "stream_render",
+    "answer_cache",
+    "place_search",
+    "image_assets",
+    "map_cache",
+    "event_sink",
+    "log_store",
+    "result_window",
+)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module):
+    """모듈 하나를 새 프로세스에서 import -> (누적 ms, import 된 모듈 이름 set), 실패하면 (None, 오류 메시지)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit {result.returncode}"
+
+    cumulative_us, imported = None, set()
+    for line in result.stderr.splitlines():
+        # "import time:       430 |     774064 | folium" (이름 앞 공백 = 중첩 깊이)
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(parts[1])
+    return (cumulative_us or 0) / 1000, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈별 import 비용 리포트")
+    parser.add_argument("--check", action="store_true", help="공용 모듈이 무거운 라이브러리를 불러오면 실패")
+    parser.add_argument("--budget-ms", type=float, default=None, help="공용 모듈 하나의 누적 import 시간 상한")
+    args = parser.parse_args()
+
+    # streamlit이 원래 불러오는 모듈 (streamlit.components.v1 등)은 지연 import 대상에서 제외
+    _, baseline = measure("streamlit")
+    if not isinstance(baseline, set):
+        baseline = set()
+
+    failures = []
+    print(f"{'module':<32}{'cumulative':>12}  heavy imports")
+    print("-" * 72)
+    for module in HEAVY_MODULES:
+        ms, imported = measure(module)
+        if ms is None:
+            print(f"{module:<32}{'-':>12}  (import failed: {imported})")
+            continue
+        note = "loaded by streamlit" if module in baseline else ""
+        print(f"{module:<32}{ms:>9.0f} ms  {note}")
+
+    print("-" * 72)
+    for module in APP_MODULES:
+        ms, imported = measure(module)
+        if ms is None:
+            print(f"{module:<32}{'-':>12}  (import failed: {imported})")
+            failures.append(f"{module}: import failed")
+            continue
+        heavy = sorted(name for name in HEAVY_MODULES if name in imported and name not in baseline)
+        print(f"{module:<32}{ms:>9.0f} ms  {', '.join(heavy)}")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(heavy)} at module level")
+        if args.budget_ms is not None and ms > args.budget_ms:
+            failures.append(f"{module}: {ms:.0f} ms > budget {args.budget_ms:.0f} ms")
+
+    if args.check and failures:
+        print()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import importlib
+import logging
+import sys
+import time
+
+# =========================================================
+# 무거운 라이브러리 지연 import
+# =========================================================
+# folium / streamlit_folium / gspread / oauth2client / openai 는 import만 해도 수백 ms가 걸리는데,
+# 챗봇 모드는 지도가, 장소 추천 모드는 openai가 필요 없습니다.
+# - lazy_import(): 모듈 대신 접근자를 돌려주고, 처음 속성을 쓸 때 실제로 import
+#   (openai = lazy_import("openai") -> openai.OpenAI(...) 처럼 기존 코드 그대로 사용)
+# - 처음 불러올 때 걸린 시간을 기록 -> import_costs() / 로그로 확인
+# - 모듈별 import 비용 리포트(CI 확인용)는 import_report.py
+#
+# 사용 예)
+#   folium = lazy_import("folium")
+#   m = folium.Map(...)   # <- 이 시점에 folium import
+
+logger = logging.getLogger(__name__)
+
+# 앱에서 지연 import 하는 모듈 (import_report.py가 이 목록을 측정 / 확인)
+HEAVY_MODULES = (
+    "folium",
+    "folium.plugins",
+    "streamlit_folium",
+    "gspread",
+    "oauth2client.service_account",
+    "openai",
+    "streamlit.components.v1",
+    "PIL.Image",
+)
+
+_modules = {}
+_costs = {}
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def load(self):
+        """실제 모듈 (처음 한 번만 import, 이미 다른 곳에서 불러왔으면 비용 0)"""
+        module = self.__dict__["_module"]
+        if module is None:
+            name = self.__dict__["_name"]
+            already = name in sys.modules
+            started = time.perf_counter()
+            module = importlib.import_module(name)
+            if not already:
+                cost = time.perf_counter() - started
+                _costs.setdefault(name, cost)
+                logger.info(f"Lazy import {name}: {cost * 1000:.0f} ms")
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name):
+    """이름별 접근자 (프로세스당 1개, 여러 파일에서 불러도 import는 한 번)"""
+    if name not in _modules:
+        _modules[name] = LazyModule(name)
+    return _modules[name]
+
+
+def is_loaded(name):
+    return name in sys.modules
+
+
+def import_costs():
+    """지금까지 지연 import 한 모듈 -> 처음 불러올 때 걸린 시간(초)"""
+    return dict(_costs)
@@ -0,0 +1,236 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+# =========================================================
+# 언어별 화면 텍스트 (불변 번들) & 장소 카드 표시값
+# =========================================================
+# 예전에는 rerun마다 언어에 맞는 txt / cols / TYPE_MAPPING 딕셔너리를 새로 만들고,
+# 카드마다 row[cols['name']], str(row[cols['desc']])[:40] + "..." 같은 문자열 작업을 반복했습니다.
+# - LocaleBundle: 언어별 txt / cols / 타입 매핑을 모듈을 불러올 때 한 번만 만들어 읽기 전용으로 고정
+#   (언어 전환 = 번들 참조만 바꿈)
+# - build_place_cards(): 카탈로그 버전 x 언어마다 한 번, 장소 ID -> 카드에 그릴 값(이름, 짧은 설명,
+#   지역, 태그 문자열, 소요 시간 라벨...)을 미리 만들어 둠 (카드는 꺼내서 그리기만)
+#
+# 사용 예)
+#   locale = locales.SURVEY_LOCALES["ko"]
+#   txt, cols = locale.txt, locale.cols
+#   card = place_cards[place_id]   # app_core.CatalogService.place_cards(locale.code)
+#   st.markdown(f"**{card.name}**")
+
+LANGUAGES = ("ko", "en")
+SNIPPET_LEN = 40  # 카드의 짧은 설명 길이 (넘으면 "..." 붙임)
+
+# 언어별 카탈로그 컬럼
+COLUMNS = {
+    "ko": {'name': 'Name_KR', 'desc': 'Description_KR', 'loc': 'Landmark_KR', 'cat': 'Category_KR', 'grp': 'Group_KR', 'tag': 'Tag_KR', 'area': 'Area_KR', 'map': 'Google_Map_KR'},
+    "en": {'name': 'Name_EN', 'desc': 'Description_EN', 'loc': 'Landmark_EN', 'cat': 'Category_EN', 'grp': 'Group_EN', 'tag': 'Tag_EN', 'area': 'Area_EN', 'map': 'Google_Map_EN'},
+}
+
+
+def freeze(value):
+    """dict -> 읽기 전용 dict, list -> tuple (중첩까지)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class LocaleBundle:
+    """언어 하나의 화면 텍스트 / 컬럼 / 설문 타입 매핑 (읽기 전용)"""
+
+    __slots__ = ("code", "txt", "cols", "type_mapping", "reverse_type_mapping")
+
+    def __init__(self, code, txt, type_mapping=None):
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "txt", freeze(txt))
+        object.__setattr__(self, "cols", freeze(COLUMNS[code]))
+        # 화면 버튼 이름 -> DB 타입 값 / DB 타입 값 -> 화면 버튼 이름
+        type_mapping = type_mapping or {}
+        object.__setattr__(self, "type_mapping", freeze(type_mapping))
+        object.__setattr__(self, "reverse_type_mapping", freeze({v: k for k, v in type_mapping.items()}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LocaleBundle is read-only")
+
+
+# ---------------------------------------------------------
+# 설문 + 추천 화면 (app_ai / app_full)
+# ---------------------------------------------------------
+_SURVEY_TEXT = {
+    "ko": {
+        'title': "오사카/교토 여행지 리스트",
+        'survey_title': "여행에서 더 끌리는 곳",
+        'survey_sub': "",
+        'q1_landmark': "사람은 많아도, 유명한 랜드마크",
+        'q1_local': "숨겨진 한적한 로컬 스팟",
+        'q2b_title': "더 선호하는 랜드마크",
+        'q2b_crowded': "사람은 많아도, 가까운 곳",
+        'q2b_far': "조금 멀어도, 덜 붐비는 곳",
+        'q2a_title': "로컬 스팟을 원하는 이유",
+        'q2a_adventure': "남들이 가지 않는 장소를 가보고 싶어서",
+        'q2a_quiet': "너무 많은 인파는 부담스러워서",
+        'btn_select': "선택",
+        'region_label': "도시",
+        'regions': ["오사카", "교토"],
+        'type_label': "어디로 갈까요?",
+        'quick_type_label': "",
+        'cats': ["자연", "도시", "역사/전통", "휴식", "쇼핑"],
+        'grps': ["혼자", "연인", "친구", "부모님", "어린이"],
+        'btns': ["여행자 타입", "낭만가 타입", "탐험가 타입", "사색가 타입"],
+        'res': "검색 결과",
+        'no_res': "조건을 만족하는 장소를 찾기 어렵습니다.",
+        'more': "더 보기",
+        'map_view': "🗺️ 지도로 보기",
+        'no_map': "지도에 표시할 위치 정보가 없습니다.",
+        'dtl_btn': "상세보기",
+        'back': "뒤로가기",
+        'rec_title': "성향에 맞는 장소 추천",
+        'rec_reset': "다시 테스트",
+        'go_all': "전체 장소 보기",
+        'type_messages': {
+            "근랜드": "여행자 타입 : 상징적인 랜드마크",
+            "원랜드": "낭만가 타입 : 여유롭게 즐기는 랜드마크",
+            "모험": "탐험가 타입 : 낯선 곳에서 마주하는 로컬 분위기",
+            "조용": "사색가 타입 : 복잡한 인파에서 벗어난 차분한 분위기"
+        }
+    },
+    "en": {
+        'title': "Osaka/Kyoto Travel List",
+        'survey_title': "Preferred Travel Destinations",
+        'survey_sub': "",
+        'q1_landmark': "A Famous Landmark, Even If It’s Crowded",
+        'q1_local': "A Hidden Local Spot, Even If It’s Less Known",
+        'q2b_title': "Preferred Landmark Type",
+        'q2b_crowded': "Accessible City Center",
+        'q2b_far': "Relaxed Outskirts",
+        'q2a_title': "Reason for Local Preference",
+        'q2a_adventure': "To Explore Undiscovered Places",
+        'q2a_quiet': "To Avoid Crowds",
+        'btn_select': "Select",
+        'region_label': "City",
+        'regions': ["Osaka", "Kyoto"],
+        'type_label': "Where to go?",
+        'quick_type_label': "",
+        'cats': ["Nature", "City", "History", "Relax", "Shopping"],
+        'grps': ["Solo", "Couple", "Friends", "Parents", "Kids"],
+        'btns': ["The Traveler Type", "The Romantic Type", "The Explorer Type", "The Contemplative Type"],
+        'res': "Results",
+        'no_res': "No places found matching your criteria.",
+        'more': "Load more",
+        'map_view': "🗺️ Show on map",
+        'no_map': "No location data to show on the map.",
+        'dtl_btn': "View Details",
+        'back': "Back",
+        'rec_title': "Recommended Places",
+        'rec_reset': "Retest",
+        'go_all': "View All Places",
+        'type_messages': {
+            "근랜드": "The Traveler Type: Nearby Iconic Landmarks",
+            "원랜드": "The Romantic Type: Savoring Landmarks at a Leisurely Pace",
+            "모험": "The Explorer Type: Immersing in Local Atmospheres off the Map",
+            "조용": "The Contemplative Type: Calm Spaces Away from the Crowds"
+        }
+    },
+}
+
+_SURVEY_TYPES = {
+    "ko": {
+        "여행자 타입": "근랜드",
+        "낭만가 타입": "원랜드",
+        "탐험가 타입": "모험",
+        "사색가 타입": "조용"
+    },
+    "en": {
+        "The Traveler Type": "근랜드",
+        "The Romantic Type": "원랜드",
+        "The Explorer Type": "모험",
+        "The Contemplative Type": "조용"
+    },
+}
+
+SURVEY_LOCALES = MappingProxyType({
+    code: LocaleBundle(code, _SURVEY_TEXT[code], _SURVEY_TYPES[code]) for code in LANGUAGES
+})
+
+# ---------------------------------------------------------
+# 갤러리 화면 (app_ux)
+# ---------------------------------------------------------
+
+_CURATOR_TEXT = {
+    "ko": {
+        'title': "🐙 오사카/교토 여행 큐레이터",
+        'region_label': "🗺️ 지역 선택 (Region)",
+        'regions': ["오사카 (Osaka)", "교토 (Kyoto)"],
+        'type_label': "📍 어디로 갈까요? (Type)",
+        'cats': ["자연", "도시", "역사/전통", "휴식", "쇼핑"],
+        'grps': ["혼자", "연인", "친구", "부모님", "어린이"],
+        'btns': ["랜드마크", "시내", "시외", "근교"],
+        'res': "검색 결과",
+        'no_res': "조건에 맞는 장소가 없습니다.",
+        'more': "더 보기",
+        'no_map': "지도에 표시할 위치 정보가 없습니다.",
+        'dtl_btn': "📝 상세보기",
+        'back': "⬅️ 목록으로 돌아가기",
+        'guide': "👆 위에서 **여행 스타일**을 선택하면 장소를 추천해드려요!"
+    },
+    "en": {
+        'title': "🐙 Osaka/Kyoto Travel Curator",
+        'region_label': "🗺️ Region",
+        'regions': ["Osaka", "Kyoto"],
+        'type_label': "📍 Where do you want to go?",
+        'cats': ["Nature", "City", "History/Culture", "Relax", "Shopping"],
+        'grps': ["Solo", "Couple", "Friends", "Parents", "Kids"],
+        'btns': ["Landmark", "Downtown", "Outskirts", "Side Trips"],
+        'res': "Results",
+        'no_res': "No places found.",
+        'more': "Load more",
+        'no_map': "No location data to show on the map.",
+        'dtl_btn': "📝 View Details",
+        'back': "⬅️ Back to List",
+        'guide': "👆 Please select a **travel style** above to see recommendations!"
+    },
+}
+
+CURATOR_LOCALES = MappingProxyType({
+    code: LocaleBundle(code, _CURATOR_TEXT[code]) for code in LANGUAGES
+})
+
+
+# =========================================================
+# 장소 카드 표시값 (카탈로그 버전 x 언어)
+# =========================================================
+PlaceCard = namedtuple("PlaceCard", ["name", "snippet", "desc", "area", "category", "tags", "time_label", "map_url"])
+
+
+def _texts(df, column):
+    if column not in df.columns:
+        return [""] * len(df)
+    return [str(v) for v in df[column].tolist()]
+
+
+def snippet(text, length=SNIPPET_LEN):
+    return text[:length] + "..." if len(text) > length else text
+
+
+def format_tags(text):
+    """'#a #b' -> '#a   #b' (빈 태그 제외)"""
+    return "   ".join(f"#{t.strip()}" for t in text.split('#') if t.strip())
+
+
+def build_place_cards(df, code):
+    """장소 ID -> PlaceCard (읽기 전용). 카드/상세/주변 장소 화면은 여기서 꺼내 그리기만 함"""
+    cols = COLUMNS[code]
+    names = _texts(df, cols['name'])
+    descs = _texts(df, cols['desc'])
+    areas = _texts(df, cols['area'])
+    categories = _texts(df, cols['cat'])
+    tags = _texts(df, cols['tag'])
+    times = _texts(df, 'Deep_Time')
+    map_urls = _texts(df, cols['map'])
+    cards = {
+        place_id: PlaceCard(name, snippet(desc), desc, area, category, format_tags(tag), f"{time} min", map_url)
+        for place_id, name, desc, area, category, tag, time, map_url
+        in zip(df['Place_ID'].tolist() if 'Place_ID' in df.columns else [], names, descs, areas, categories, tags, times, map_urls)
+    }
+    return MappingProxyType(cards)
@@ -0,0 +1,202 @@
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+# =========================================================
+# 로컬 로그 저장소 (JSONL 세그먼트 + 교체 + 압축)
+# =========================================================
+# 채팅 로그 / 사용자 행동 로그를 CSV 하나에 계속 이어 쓰지 않고 세그먼트 파일로 나눠서 보관합니다.
+# - write(): 열어둔 파일 핸들에 버퍼링해서 한 줄 추가 (매번 파일 열기/존재 확인 X)
+# - 버퍼는 flush_interval초마다, 그리고 종료 시 디스크로 내보냄
+# - 현재 세그먼트가 max_bytes를 넘거나 max_age초가 지나면 새 세그먼트로 교체
+# - 교체된 세그먼트는 백그라운드에서 gzip 압축, max_segments개를 넘으면 오래된 것부터 삭제
+#
+# 파일 구조: logs/<이름>/<이름>-20250101-120000-000000.jsonl     (현재 세그먼트, 1개)
+#            logs/<이름>/<이름>-20241231-090000-000000.jsonl.gz  (지난 세그먼트)
+
+logger = logging.getLogger(__name__)
+
+LOG_DIR = "logs"
+MAX_BYTES = 5_000_000
+MAX_AGE = 86400
+MAX_SEGMENTS = 30
+FLUSH_INTERVAL = 2.0
+WRITE_BUFFER = 64 * 1024
+
+_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class LogStore:
+    def __init__(self, name, log_dir=LOG_DIR, max_bytes=MAX_BYTES, max_age=MAX_AGE,
+                 max_segments=MAX_SEGMENTS, flush_interval=FLUSH_INTERVAL):
+        self.name = name
+        self.dir = os.path.join(log_dir, name)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_segments = max_segments
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._dirty = False
+
+        os.makedirs(self.dir, exist_ok=True)
+        self._open_current()
+        # 지난 실행에서 압축하지 못하고 남은 세그먼트 정리
+        self._compact_async()
+        threading.Thread(target=self._flush_loop, name=f"log-flush-{name}", daemon=True).start()
+
+    # ---------------------------------------------------------
+    # 세그먼트 파일
+    # ---------------------------------------------------------
+    def _segment_path(self, started):
+        stamp = datetime.fromtimestamp(started).strftime(_TIME_FORMAT)
+        return os.path.join(self.dir, f"{self.name}-{stamp}.jsonl")
+
+    def _segment_started(self, path):
+        stamp = os.path.basename(path)[len(self.name) + 1:].split(".")[0]
+        try:
+            return datetime.strptime(stamp, _TIME_FORMAT).timestamp()
+        except ValueError:
+            return os.path.getmtime(path)
+
+    def segments(self):
+        """모든 세그먼트 경로 (오래된 것 -> 최신 순, 마지막이 현재 세그먼트)"""
+        segments = {}
+        for pattern in ("*.jsonl", "*.jsonl.gz"):
+            # 압축 직후 잠깐 원본과 .gz가 함께 있으면 완성된 .gz를 사용
+            for path in glob.glob(os.path.join(self.dir, f"{self.name}-{pattern}")):
+                segments[os.path.basename(path).split(".")[0]] = path
+        return [segments[key] for key in sorted(segments)]
+
+    def current_path(self):
+        return self._path
+
+    def _open_current(self):
+        # 압축되지 않은 가장 최근 세그먼트가 있으면 이어서 씀
+        plain = [p for p in self.segments() if p.endswith(".jsonl")]
+        if plain:
+            self._path = plain[-1]
+            self._opened_at = self._segment_started(self._path)
+        else:
+            self._opened_at = time.time()
+            self._path = self._segment_path(self._opened_at)
+        self._file = open(self._path, "ab", buffering=WRITE_BUFFER)
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        self._opened_at = time.time()
+        self._path = self._segment_path(self._opened_at)
+        self._file = open(self._path, "ab", buffering=WRITE_BUFFER)
+        self._size = 0
+        self._compact_async()
+
+    # ---------------------------------------------------------
+    # 쓰기
+    # ---------------------------------------------------------
+    def write(self, record):
+        """dict 한 건을 JSON 한 줄로 추가 (버퍼에만 쓰고 바로 반환)"""
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._size and (self._size + len(line) > self.max_bytes
+                               or time.time() - self._opened_at >= self.max_age):
+                self._rotate()
+            self._file.write(line)
+            self._size += len(line)
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if self._dirty and self._file and not self._file.closed:
+                self._file.flush()
+                self._dirty = False
+
+    def close(self):
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.close()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Log flush failed ({self.name}): {e}")
+
+    # ---------------------------------------------------------
+    # 압축 & 보관 개수 제한
+    # ---------------------------------------------------------
+    def _compact_async(self):
+        threading.Thread(target=self._compact, name=f"log-compact-{self.name}", daemon=True).start()
+
+    def _compact(self):
+        with self._compact_lock:
+            self._compact_segments()
+
+    def _compact_segments(self):
+        # 현재 세그먼트보다 먼저 만들어진 것만 압축 (압축 도중 교체로 생긴 새 세그먼트는 건드리지 않음)
+        with self._lock:
+            current = os.path.basename(self._path).split(".")[0]
+        for path in self.segments():
+            if path.endswith(".jsonl") and os.path.basename(path).split(".")[0] < current:
+                try:
+                    tmp_path = path + ".gz.tmp"
+                    with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.replace(tmp_path, path + ".gz")
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Log compaction failed ({path}): {e}")
+
+        old = [p for p in self.segments() if p.endswith(".gz")]
+        for path in old[:max(0, len(old) - self.max_segments)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ---------------------------------------------------------
+    # 읽기
+    # ---------------------------------------------------------
+    def read_records(self):
+        """모든 세그먼트의 기록을 오래된 순서로 (관리자 화면 / 내보내기용)"""
+        self.flush()
+        for path in self.segments():
+            opener = gzip.open if path.endswith(".gz") else open
+            try:
+                with opener(path, "rb") as f:
+                    for line in f:
+                        if line.endswith(b"\n"):
+                            yield json.loads(line)
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning(f"Log segment read failed ({path}): {e}")
+
+
+def get_store(name, **options):
+    """이름별 LogStore (프로세스당 1개)"""
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = LogStore(name, **options)
+        return _stores[name]
+
+
+@atexit.register
+def _close_all():
+    for store in list(_stores.values()):
+        store.close()
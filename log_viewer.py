@@ -0,0 +1,142 @@
+import bisect
+import csv
+import gzip
+import io
+import json
+import threading
+from array import array
+
+# =========================================================
+# 로그 뷰어 (줄 위치 인덱스 기반 페이지 읽기)
+# =========================================================
+# 관리자 화면에서 로그 전체를 읽지 않고, 보여줄 줄만 읽습니다.
+# - 세그먼트마다 "각 줄이 시작하는 바이트 위치" 배열을 만들어 둠
+#   (현재 세그먼트는 새로 추가된 부분만 이어서 인덱싱, 압축된 세그먼트는 내용이 바뀌지 않으므로 한 번만)
+# - 페이지 = 전체 줄 번호 구간 -> 해당 세그먼트 위치로 seek 후 그 줄들만 JSON 파싱
+# - 시간 검색 = 기록이 시간순으로 쌓이므로 이진 탐색 (몇 줄만 읽어서 위치를 찾음)
+
+
+class SegmentIndex:
+    """세그먼트 파일 하나의 줄 시작 위치 (offsets[i] ~ offsets[i+1] 이 i번째 줄)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.compressed = path.endswith(".gz")
+        self.offsets = array("q", [0])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _open(self):
+        return gzip.open(self.path, "rb") if self.compressed else open(self.path, "rb")
+
+    def refresh(self):
+        """아직 인덱싱하지 않은 부분(파일 끝에 새로 추가된 줄)만 스캔"""
+        if self.compressed and len(self):
+            return
+        position = self.offsets[-1]
+        with self._open() as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 아직 버퍼에서 다 내려오지 않은 줄
+                position += len(line)
+                self.offsets.append(position)
+
+    def read(self, start, stop):
+        """start ~ stop-1 번째 줄을 dict 목록으로"""
+        if start >= stop:
+            return []
+        with self._open() as f:
+            f.seek(self.offsets[start])
+            chunk = f.read(self.offsets[stop] - self.offsets[start])
+        records = []
+        for line in chunk.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                records.append({})
+        return records
+
+
+class LogViewer:
+    def __init__(self, store, time_field="Time"):
+        self.store = store
+        self.time_field = time_field
+        self._segments = []
+        self._starts = [0]  # 세그먼트별 전체 줄 번호 시작값 (누적 합)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """새 세그먼트 / 새로 추가된 줄 / 압축·삭제된 세그먼트 반영"""
+        with self._lock:
+            self.store.flush()
+            known = {segment.path: segment for segment in self._segments}
+            segments = []
+            for path in self.store.segments():
+                segment = known.get(path) or SegmentIndex(path)
+                try:
+                    segment.refresh()
+                except (OSError, EOFError):
+                    continue  # 압축 중 교체/삭제된 파일
+                segments.append(segment)
+            self._segments = segments
+            self._starts = [0]
+            for segment in segments:
+                self._starts.append(self._starts[-1] + len(segment))
+        return self.total()
+
+    def total(self):
+        return self._starts[-1]
+
+    def read(self, start, stop):
+        """전체 줄 번호 start ~ stop-1 (오래된 순)"""
+        start, stop = max(0, start), min(stop, self.total())
+        records = []
+        with self._lock:
+            i = bisect.bisect_right(self._starts, start) - 1
+            while start < stop and i < len(self._segments):
+                base = self._starts[i]
+                local_stop = min(stop, self._starts[i + 1]) - base
+                records.extend(self._segments[i].read(start - base, local_stop))
+                start = base + local_stop
+                i += 1
+        return records
+
+    def page_from_tail(self, page, page_size):
+        """page 0 = 가장 최근 page_size개 (각 페이지 안에서는 오래된 순)"""
+        stop = self.total() - page * page_size
+        return self.read(stop - page_size, stop)
+
+    def num_pages(self, page_size):
+        return max(1, -(-self.total() // page_size))
+
+    def _time_at(self, position):
+        record = self.read(position, position + 1)
+        return str(record[0].get(self.time_field, "")) if record else ""
+
+    def seek_time(self, timestamp):
+        """timestamp 이상인 첫 기록의 전체 줄 번호 (이진 탐색: 약 log2(N)줄만 읽음)"""
+        low, high = 0, self.total()
+        while low < high:
+            mid = (low + high) // 2
+            if self._time_at(mid) < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def time_range(self, start_time, end_time, limit):
+        """start_time <= 시간 < end_time 인 기록 중 앞에서부터 limit개 + 구간 전체 개수"""
+        start = self.seek_time(start_time)
+        stop = self.seek_time(end_time)
+        return self.read(start, min(stop, start + limit)), stop - start
+
+    def export_csv(self, columns):
+        """전체 로그 CSV (다운로드 버튼을 눌렀을 때만 호출)"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for record in self.store.read_records():
+            writer.writerow(record)
+        return buffer.getvalue().encode("utf-8-sig")
@@ -0,0 +1,429 @@
+import html
+import json
+import logging
+import threading
+from collections import Counter, OrderedDict
+
+import streamlit as st
+
+import image_assets
+from lazy_imports import lazy_import
+
+# folium/streamlit_folium은 지도를 처음 만들 때 import (챗봇 모드에서는 불러오지 않음)
+folium = lazy_import("folium")
+folium_plugins = lazy_import("folium.plugins")
+folium_utilities = lazy_import("folium.utilities")
+streamlit_folium = lazy_import("streamlit_folium")
+
+# =========================================================
+# 상세 페이지 지도 캐시 (미리 렌더링한 지도 HTML/JS)
+# =========================================================
+# 상세 페이지를 열 때마다 folium.Map을 새로 만들고(허브 3개 + 주변 장소 + 목적지),
+# st_folium이 rerun마다 그 지도를 다시 HTML/JS로 직렬화하던 작업을 미리 해 둡니다.
+# - 키: (장소 ID, 이름 컬럼=언어) / 카탈로그 버전이 바뀌면 캐시 객체 자체를 새로 만듦 (st.cache_resource)
+# - 값: st_folium 컴포넌트에 그대로 넘길 인자 (leaflet 스크립트, header, html, css/js 링크...)
+# - 화면에서는 render()가 저장된 인자로 컴포넌트만 호출 -> folium 객체 생성/직렬화 X
+# - 많이 본 장소는 새 카탈로그 버전에서 백그라운드로 미리 만들어 둠 (warm)
+#
+# 전체 장소 페이지의 지역 지도(OverviewMapCache)도 같은 방식:
+# - (지역, 언어)별 GeoJSON을 카탈로그 버전당 한 번만 만들어 내용 해시 이름의 정적 파일로 저장
+#   -> 브라우저는 한 번 받아서 캐시, 필터를 바꿔도 다시 받지 않음
+# - 지도에는 GeoJSON 주소 + 현재 필터 결과의 장소 ID 목록만 들어감 (장소 수천 개여도 ID 몇 KB)
+# - 마커는 클러스터 레이어 하나로 묶어서 표시 (화면에는 클러스터 몇 개)
+
+logger = logging.getLogger(__name__)
+
+# 주요 거점 3곳 (초록색 집)
+FIXED_HUBS = {
+    "난바 (Namba)": [34.6655, 135.5006],
+    "우메다 (Umeda)": [34.7025, 135.4959],
+    "교토역 (Kyoto St.)": [34.9858, 135.7588],
+}
+NAME_COLUMNS = ("Name_KR", "Name_EN")
+
+MAP_HEIGHT = 400
+CLICK_TOLERANCE_M = 15  # 마커 좌표가 정확히 일치하지 않을 때 같은 장소로 볼 거리 (툴팁이 안 넘어온 경우만)
+# 마커 툴팁에 장소 ID를 숨겨 넣을 때 이름과 ID 사이 구분자 (보이지 않는 문자)
+MARKER_ID_SEP = "\u2063"
+# 클릭 결과로 받는 값 (툴팁 = 장소 ID, 좌표 = 툴팁이 없을 때만 쓰는 예비 수단)
+RETURNED_OBJECTS = ("last_object_clicked", "last_object_clicked_tooltip")
+MAX_ENTRIES = 512
+WARM_TOP_N = 20
+
+# 프로세스 전체의 상세 페이지 조회 수 (장소 ID 기준, 카탈로그 버전이 바뀌어도 유지)
+_views = Counter()
+_views_lock = threading.Lock()
+
+
+def record_view(place_id):
+    with _views_lock:
+        _views[place_id] += 1
+
+
+def popular_places(n=WARM_TOP_N):
+    """많이 본 장소 ID (조회 수 순)"""
+    with _views_lock:
+        return [place_id for place_id, _ in _views.most_common(n)]
+
+
+def _valid_coords(lat, lon):
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if lat != lat or lon != lon or lat == 0 or lon == 0:  # NaN / 좌표 없음
+        return None
+    return lat, lon
+
+
+def marker_label(name, place_id):
+    """
+    툴팁 HTML: 이름 + 보이지 않는 장소 ID (글자 크기 0)
+    - 마커를 클릭하면 툴팁 텍스트가 last_object_clicked_tooltip으로 돌아옴 -> 좌표가 같은 장소도 구분
+    """
+    return f'{html.escape(str(name))}<span style="font-size:0">{MARKER_ID_SEP}{html.escape(str(place_id))}</span>'
+
+
+def label_place_id(text):
+    """툴팁 텍스트 -> 장소 ID (ID가 없는 툴팁, 예: 허브 마커면 None)"""
+    if not text or MARKER_ID_SEP not in str(text):
+        return None
+    return str(text).rsplit(MARKER_ID_SEP, 1)[1].strip()
+
+
+def build_detail_map(df, pos, name_col, nearby, here_suffix=""):
+    """
+    df의 pos번째 장소 상세 지도 + 마커 좌표 -> 장소 ID 표 (좌표가 없으면 None, None)
+    - nearby: 함께 표시할 주변 장소 행 (상세 페이지 Nearby 목록과 같은 것)
+    - 장소 마커 툴팁에 장소 ID를 넣어 두고 클릭 결과의 툴팁으로 찾음 (좌표 표는 예비용)
+    """
+    row = df.iloc[pos]
+    dest = _valid_coords(row.get('lat'), row.get('lon'))
+    if dest is None:
+        return None, None
+    markers = {}
+
+    m = folium.Map(location=list(dest), zoom_start=14)
+    for hub_name, hub_coords in FIXED_HUBS.items():
+        folium.Marker(hub_coords, popup=hub_name, tooltip=hub_name, icon=folium.Icon(color='green', icon='home')).add_to(m)
+
+    # 주변 장소 (파란색 i)
+    for _, place in nearby.iterrows():
+        coords = _valid_coords(place.get('lat'), place.get('lon'))
+        if coords is not None:
+            folium.Marker(list(coords), popup=place[name_col], tooltip=marker_label(place[name_col], place['Place_ID']), icon=folium.Icon(color='blue', icon='info-sign')).add_to(m)
+            markers.setdefault(coords, place['Place_ID'])
+
+    # 현재 장소 (빨간색 별)
+    folium.Marker(list(dest), popup=f"📍 {row[name_col]}{here_suffix}", tooltip=marker_label(row[name_col], row['Place_ID']), icon=folium.Icon(color='red', icon='star')).add_to(m)
+    markers[dest] = row['Place_ID']
+    return m, markers
+
+
+def _walk(element):
+    # st_folium과 같은 순서 (부모 먼저) -> leaflet.js가 플러그인보다 먼저 로드됨
+    yield element
+    for child in getattr(element, "_children", {}).values():
+        yield from _walk(child)
+
+
+def prerender(m, returned_objects, height=MAP_HEIGHT):
+    """st_folium이 매번 하던 렌더링(HTML/header/leaflet JS 생성)을 한 번만 해서 컴포넌트 인자로 저장"""
+    m.get_root().render()
+    m.render()
+    html = streamlit_folium._get_html(m)
+    header = streamlit_folium._get_header(m)
+    script = streamlit_folium._get_map_string(m)
+
+    css_links, js_links = [], []
+    for element in _walk(m):
+        css_links.extend(href for _, href in getattr(element, "default_css", []))
+        js_links.extend(src for _, src in getattr(element, "default_js", []))
+
+    (south, west), (north, east) = m.get_bounds()
+    defaults = {
+        "last_clicked": None,
+        "last_object_clicked": None,
+        "last_object_clicked_tooltip": None,
+        "last_object_clicked_popup": None,
+        "bounds": {"_southWest": {"lat": south, "lng": west}, "_northEast": {"lat": north, "lng": east}},
+        "zoom": m.options.get("zoom"),
+    }
+    return {
+        "script": script,
+        "header": header,
+        "html": html,
+        "id": streamlit_folium.get_full_id(m),
+        "key": streamlit_folium.generate_js_hash(script, None, False),
+        "height": height,
+        "width": None,
+        "returned_objects": list(returned_objects),
+        "default": {k: v for k, v in defaults.items() if k in returned_objects},
+        "zoom": None,
+        "center": None,
+        "feature_group": None,
+        "return_on_hover": False,
+        "layer_control": None,
+        "pixelated": False,
+        "css_links": list(dict.fromkeys(css_links)),
+        "js_links": list(dict.fromkeys(js_links)),
+        "wrap_longitude": False,
+    }
+
+
+class _ArtifactCache:
+    """미리 렌더링한 지도 LRU 캐시 (상세 지도 / 지역 전체 지도 공통)"""
+
+    def __init__(self, place_catalog, returned_objects, max_entries):
+        self.catalog = place_catalog
+        self.returned_objects = tuple(returned_objects)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        artifact = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = artifact
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return artifact
+
+    def _artifact(self, m, markers, label, rebuild):
+        """rebuild: 지도 객체를 다시 만드는 함수 (미리 렌더링한 인자로 그리기에 실패하면 st_folium으로 그릴 때 사용)"""
+        try:
+            return {"component": prerender(m, self.returned_objects), "markers": markers,
+                    "rebuild": rebuild, "returned_objects": list(self.returned_objects)}
+        except Exception as e:
+            # streamlit_folium 내부 함수가 바뀐 경우 -> 지도 객체만 보관하고 st_folium으로 그림
+            logger.warning(f"Map prerender failed ({label}), falling back to st_folium: {e}")
+            return {"map": m, "returned_objects": list(self.returned_objects), "markers": markers}
+
+    def clicked_place_id(self, artifact, map_output):
+        """
+        지도 클릭 결과 -> 장소 ID (장소가 아닌 곳/허브 마커를 눌렀으면 None)
+        - 클릭한 마커 툴팁에 들어 있는 장소 ID (좌표가 같은 장소끼리도 정확히 구분)
+        - 툴팁이 넘어오지 않은 경우만 마커 좌표 표 -> 공간 인덱스(CLICK_TOLERANCE_M 이내) 순으로 찾음
+        """
+        map_output = map_output or {}
+        tooltip = map_output.get('last_object_clicked_tooltip')
+        if tooltip:
+            place_id = label_place_id(tooltip)
+            return place_id if place_id in self.catalog.id_to_pos else None
+        clicked = map_output.get('last_object_clicked')
+        if not clicked:
+            return None
+        lat, lng = float(clicked['lat']), float(clicked['lng'])
+        place_id = artifact["markers"].get((lat, lng))
+        if place_id is None:
+            place_id = self.catalog.locations.nearest(lat, lng, max_meters=CLICK_TOLERANCE_M)
+        return place_id
+
+
+class DetailMapCache(_ArtifactCache):
+    def __init__(self, place_catalog, returned_objects=RETURNED_OBJECTS,
+                 here_suffix="", max_entries=MAX_ENTRIES):
+        super().__init__(place_catalog, returned_objects, max_entries)
+        self.here_suffix = here_suffix
+
+    def _nearby(self, place_id, pos):
+        """상세 페이지 Nearby 목록과 같은 장소: 거리순 주변 장소, 반경 안에 없으면 같은 구역 장소"""
+        nearby, _ = self.catalog.nearby(place_id)
+        if len(nearby):
+            return nearby
+        df, zone_col = self.catalog.df, self.catalog.zone_col
+        row = df.iloc[pos]
+        zone = str(row.get(zone_col, '')) if zone_col in df.columns else ''
+        if not zone or zone == 'nan':
+            return df.iloc[:0]
+        return df[(df[zone_col] == zone) & (df['Name_KR'] != row['Name_KR'])]
+
+    def _build(self, place_id, name_col):
+        pos = self.catalog.id_to_pos.get(place_id)
+        if pos is None:
+            return None
+        nearby = self._nearby(place_id, pos)
+
+        def build():
+            return build_detail_map(self.catalog.df, pos, name_col, nearby, self.here_suffix)
+
+        m, markers = build()
+        if m is None:
+            return None
+        return self._artifact(m, markers, place_id, lambda: build()[0])
+
+    def get(self, place_id, name_col):
+        """(장소 ID, 이름 컬럼) 지도. 좌표가 없으면 None"""
+        return self._lookup((place_id, name_col), lambda: self._build(place_id, name_col))
+
+    def warm(self, place_ids, name_cols=NAME_COLUMNS):
+        """백그라운드에서 미리 만들어 둠 (첫 상세 페이지 진입도 바로 그려지도록)"""
+        def run():
+            for place_id in place_ids:
+                for name_col in name_cols:
+                    try:
+                        self.get(place_id, name_col)
+                    except Exception as e:
+                        logger.warning(f"Map warm failed ({place_id}, {name_col}): {e}")
+
+        thread = threading.Thread(target=run, name="detail-map-warm", daemon=True)
+        thread.start()
+        return thread
+
+
+# ---------------------------------------------------------
+# 지역 전체 지도 (전체 장소 페이지)
+# ---------------------------------------------------------
+REGION_CENTERS = {"osaka": [34.6937, 135.5023], "kyoto": [35.0116, 135.7681]}
+OVERVIEW_ZOOM = 12
+OVERVIEW_MAX_ENTRIES = 64
+COORD_DIGITS = 5  # GeoJSON 좌표 소수점 자릿수 (약 1m)
+
+
+def region_features(df, positions, name_col):
+    """지역 장소들의 GeoJSON Point feature (장소 ID -> feature, 좌표 없는 장소 제외)"""
+    if 'lat' not in df.columns or 'lon' not in df.columns:
+        return {}
+    ids, names = df['Place_ID'].to_numpy(), df[name_col].to_numpy()
+    lats, lons = df['lat'].to_numpy(), df['lon'].to_numpy()
+    features = {}
+    for pos in positions:
+        coords = _valid_coords(lats[pos], lons[pos])
+        if coords is None:
+            continue
+        lat, lon = round(coords[0], COORD_DIGITS), round(coords[1], COORD_DIGITS)
+        features[ids[pos]] = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            # label: 툴팁 (이름 + 보이지 않는 장소 ID, 클릭한 장소를 ID로 찾는 데 사용)
+            "properties": {"id": ids[pos], "name": str(names[pos]), "label": marker_label(names[pos], ids[pos])},
+        }
+    return features
+
+
+def publish_layer(features):
+    """GeoJSON을 정적 파일로 저장하고 URL 반환 (inline 모드거나 저장에 실패하면 None -> 지도에 직접 넣음)"""
+    if image_assets.IMAGE_SERVING == "inline":
+        return None
+    data = json.dumps(
+        {"type": "FeatureCollection", "features": list(features.values())},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    try:
+        name = image_assets.publish_data(data, ".json")
+    except OSError as e:
+        logger.warning(f"GeoJSON publish failed: {e}")
+        return None
+    return image_assets.root_asset_url(name, st.get_option("server.baseUrlPath") or "")
+
+
+def _id_filter(place_ids):
+    """GeoJSON feature 중 place_ids에 있는 것만 표시하는 Leaflet filter 함수"""
+    ids = json.dumps(list(place_ids), ensure_ascii=False, separators=(",", ":"))
+    return folium_utilities.JsCode(
+        f"(function () {{ var ids = new Set({ids}); "
+        "return function (feature) { return ids.has(feature.properties.id); }; })()"
+    )
+
+
+class OverviewMapCache(_ArtifactCache):
+    def __init__(self, place_catalog, region_positions, returned_objects=RETURNED_OBJECTS,
+                 max_entries=OVERVIEW_MAX_ENTRIES):
+        """region_positions: 지역 키("osaka"/"kyoto") -> 그 지역 장소의 행 위치 배열"""
+        super().__init__(place_catalog, returned_objects, max_entries)
+        self.layers = {
+            (region, name_col): region_features(place_catalog.df, positions, name_col)
+            for region, positions in region_positions.items()
+            for name_col in NAME_COLUMNS
+            if name_col in place_catalog.df.columns
+        }
+        self.layer_urls = {key: publish_layer(features) for key, features in self.layers.items() if features}
+
+    def _build(self, region, name_col, place_ids):
+        m, markers = self._build_map(region, name_col, place_ids)
+        if m is None:
+            return None
+        return self._artifact(m, markers, f"{region}/{name_col}",
+                              lambda: self._build_map(region, name_col, place_ids)[0])
+
+    def _build_map(self, region, name_col, place_ids):
+        """(지도, 마커 좌표 -> 장소 ID 표), 표시할 장소가 없으면 (None, None)"""
+        layer = self.layers.get((region, name_col), {})
+        selected, markers = [], {}
+        for place_id in place_ids:
+            feature = layer.get(place_id)
+            if feature is not None:
+                selected.append(place_id)
+                lon, lat = feature["geometry"]["coordinates"]
+                markers.setdefault((lat, lon), place_id)
+        if not selected:
+            return None, None
+
+        m = folium.Map(location=REGION_CENTERS.get(region, list(FIXED_HUBS.values())[0]), zoom_start=OVERVIEW_ZOOM)
+        cluster = folium_plugins.MarkerCluster(options={"showCoverageOnHover": False, "chunkedLoading": True}).add_to(m)
+        tooltip = folium.GeoJsonTooltip(fields=["label"], labels=False)
+        # (선택된 feature는 범위 계산/툴팁 확인용, 지도에 넣는 것은 URL 또는 아래 embed 데이터)
+        data = {"type": "FeatureCollection", "features": [layer[place_id] for place_id in selected]}
+        url = self.layer_urls.get((region, name_col))
+        if url:
+            geojson = folium.GeoJson(data, tooltip=tooltip, filter=_id_filter(selected))
+            geojson.embed, geojson.embed_link = False, url
+        else:
+            geojson = folium.GeoJson(data, tooltip=tooltip)
+        geojson.add_to(cluster)
+
+        lats = [lat for lat, _ in markers]
+        lons = [lon for _, lon in markers]
+        m.fit_bounds([[min(lats), min(lons)], [max(lats), max(lons)]], max_zoom=15)
+        return m, markers
+
+    def get(self, region, name_col, place_ids):
+        """(지역, 이름 컬럼, 필터 결과 장소 ID 목록) 지도. 표시할 장소가 없으면 None"""
+        place_ids = tuple(place_ids)
+        return self._lookup((region, name_col, place_ids), lambda: self._build(region, name_col, place_ids))
+
+
+def warm_place_ids(place_catalog, n=WARM_TOP_N):
+    """미리 만들 장소: 많이 본 장소 우선, 조회 기록이 부족하면 카탈로그 앞쪽 장소로 채움"""
+    place_ids = [p for p in popular_places(n) if p in place_catalog.id_to_pos]
+    for place_id in place_catalog.id_to_pos:
+        if len(place_ids) >= n:
+            break
+        if place_id not in place_ids:
+            place_ids.append(place_id)
+    return place_ids
+
+
+_component_failed = False
+
+
+def render(artifact):
+    """
+    캐시된 지도 표시 + 클릭 정보 반환 (st_folium과 같은 dict)
+    - 미리 렌더링한 인자는 streamlit_folium 내부 함수(_component_func)로 그림 (requirements.txt에서 버전 고정)
+    - 내부 함수가 바뀌어 실패하면 경고를 남기고 공개 API st_folium으로 그림 (이후 호출도 바로 st_folium)
+    - st_folium까지 실패하면 오류를 로그로 남기고 None (지도 없이 페이지 계속 표시)
+    """
+    global _component_failed
+    if "component" in artifact and not _component_failed:
+        try:
+            return streamlit_folium._component_func(**artifact["component"])
+        except Exception as e:
+            _component_failed = True
+            logger.warning(f"Prerendered map component failed, falling back to st_folium: {e}")
+
+    try:
+        m = artifact["map"] if "map" in artifact else artifact["rebuild"]()
+        return streamlit_folium.st_folium(m, height=MAP_HEIGHT, use_container_width=True,
+                                          returned_objects=artifact["returned_objects"])
+    except Exception:
+        logger.exception("Map render failed")
+        return None
@@ -0,0 +1,139 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from locales import snippet
+
+# =========================================================
+# 챗봇용 카탈로그 검색 인덱스 (BM25 + 한국어 2-gram)
+# =========================================================
+# 챗봇은 긴 system 프롬프트만 보고 답해서, 카탈로그에 있는 장소 대신 없는 장소를 지어내곤 했습니다.
+# 질문마다 카탈로그에서 관련 장소 top-k개만 골라 프롬프트에 넣습니다.
+# - 이름 / 태그 / 지역 / 카테고리 / 랜드마크 / 설명 (KR + EN)을 필드 가중치를 두고 색인
+# - 한글/한자/가나는 2글자 단위(2-gram)로 잘라 조사가 붙어도 매칭 ("도톤보리에서" -> 도톤 톤보 보리 리에 에서)
+# - 영문/숫자는 단어 단위
+# - 점수는 BM25, 단어별 (장소, 가중치) 목록을 카탈로그 버전당 한 번만 계산 -> 검색은 질문 단어 수만큼 배열 더하기
+#
+# 사용 예)
+#   index = PlaceSearchIndex(df)                      # app_core.CatalogService.search_index()
+#   positions = index.search("도톤보리 근처 라멘", k=5, allowed=region_bool_mask)
+
+K1 = 1.5
+B = 0.75
+TOP_K = 5
+# 1등 점수의 이 비율보다 낮은 장소는 제외 ("근처", "추천" 같은 흔한 2-gram만 겹친 장소)
+MIN_SCORE_RATIO = 0.25
+# 프롬프트에 넣는 장소 설명 길이
+DESC_LEN = 120
+
+# (컬럼, 가중치) - 가중치만큼 단어 빈도를 곱해서 색인
+FIELDS = (
+    ("Name_KR", 3), ("Name_EN", 3),
+    ("Tag_KR", 2), ("Tag_EN", 2), ("Tag", 2),
+    ("Area_KR", 2), ("Area_EN", 2),
+    ("Category_KR", 1), ("Category_EN", 1),
+    ("Landmark_KR", 1), ("Landmark_EN", 1),
+    ("Description_KR", 1), ("Description_EN", 1),
+)
+
+_WORDS = re.compile(r"\w+")
+_WIDE_CHARS = re.compile("[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def tokenize(text):
+    """검색 단어 목록 (한글/한자/가나 단어 -> 2-gram, 그 외 -> 단어 그대로)"""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    tokens = []
+    for word in _WORDS.findall(text):
+        if _WIDE_CHARS.match(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1 or word.isdigit():
+            tokens.append(word)
+    return tokens
+
+
+def _texts(df, column):
+    if column not in df.columns:
+        return []
+    return ["" if v is None else str(v) for v in df[column].tolist()]
+
+
+class PlaceSearchIndex:
+    def __init__(self, df, fields=FIELDS, k1=K1, b=B):
+        self.size = len(df)
+        doc_terms = [Counter() for _ in range(self.size)]
+        for column, weight in fields:
+            for terms, text in zip(doc_terms, _texts(df, column)):
+                for token in tokenize(text):
+                    terms[token] += weight
+
+        lengths = np.array([sum(terms.values()) for terms in doc_terms], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+
+        postings = {}
+        for doc, terms in enumerate(doc_terms):
+            for token, tf in terms.items():
+                postings.setdefault(token, []).append((doc, tf))
+
+        # 단어 -> (장소 위치, BM25 가중치) 를 CSR 형식으로 (단어 i의 목록 = offsets[i]:offsets[i+1])
+        self.vocab = {}
+        offsets, docs, weights = [0], [], []
+        for token, entries in postings.items():
+            idf = math.log(1 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            entry_docs = np.array([d for d, _ in entries], dtype=np.int32)
+            tf = np.array([t for _, t in entries], dtype=np.float32)
+            norm = k1 * (1 - b + b * lengths[entry_docs] / avg_length)
+            self.vocab[token] = len(self.vocab)
+            docs.append(entry_docs)
+            weights.append((idf * tf * (k1 + 1) / (tf + norm)).astype(np.float32))
+            offsets.append(offsets[-1] + len(entries))
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.docs = np.concatenate(docs) if docs else np.zeros(0, dtype=np.int32)
+        self.weights = np.concatenate(weights) if weights else np.zeros(0, dtype=np.float32)
+
+    def scores(self, query):
+        """모든 장소의 BM25 점수 (질문에 같은 단어가 여러 번 나오면 그만큼 가중)"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token, count in Counter(tokenize(query)).items():
+            term = self.vocab.get(token)
+            if term is None:
+                continue
+            start, end = self.offsets[term], self.offsets[term + 1]
+            # 한 단어의 목록 안에서 장소 위치는 중복이 없으므로 바로 더해도 됨
+            scores[self.docs[start:end]] += count * self.weights[start:end]
+        return scores
+
+    def search(self, query, k=TOP_K, allowed=None):
+        """점수 높은 순 장소 위치 top-k (점수가 낮은 장소 제외). allowed: 검색 대상 bool 배열 (지역 필터 등)"""
+        scores = self.scores(query)
+        if allowed is not None:
+            scores[~np.asarray(allowed, dtype=bool)] = 0
+        best = scores.max() if self.size else 0
+        if best <= 0:
+            return []
+        candidates = np.flatnonzero(scores >= best * MIN_SCORE_RATIO)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        return candidates[np.argsort(-scores[candidates], kind="stable")].tolist()
+
+
+def format_places(cards):
+    """프롬프트에 넣을 장소 목록 텍스트 (locales.PlaceCard 목록)"""
+    lines = []
+    for card in cards:
+        details = " / ".join(v for v in (card.area, card.category) if v)
+        line = f"- {card.name}" + (f" ({details})" if details else "")
+        if card.desc:
+            line += f": {snippet(card.desc, DESC_LEN)}"
+        if card.tags:
+            line += f" {card.tags}"
+        if card.map_url:
+            line += f"\n  구글맵: {card.map_url}"
+        lines.append(line)
+    return "\n".join(lines)
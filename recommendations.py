@@ -0,0 +1,64 @@
+import threading
+
+import numpy as np
+
+# =========================================================
+# 추천 결과 목록 (설문 타입 x 지역) 미리 계산
+# =========================================================
+# 설문은 항상 4가지 DB 타입 중 하나로 끝나고 지역은 2곳뿐이라,
+# 추천 페이지에 나올 수 있는 결과는 카탈로그 버전당 8가지뿐입니다.
+# - 카탈로그를 불러올 때 8개 목록을 장소 ID 순서 배열(+ 행 위치)로 한 번에 만들어 둠
+# - 추천 페이지는 (타입, 지역)으로 목록을 꺼내 그리기만 함 (지역/타입 필터, 대체 규칙 계산 X)
+# - 언어는 결과 장소에 영향을 주지 않으므로(표시 컬럼만 다름) 키에 넣지 않음
+
+SURVEY_TYPES = ("근랜드", "원랜드", "모험", "조용")
+REGIONS = ("osaka", "kyoto")
+
+# 메인 타입(Type의 첫 번째 값)이 일치하는 장소가 이보다 적으면 타입이 포함된 장소까지 보여줌
+MIN_MAIN_MATCHES = 3
+
+
+def recommend_mask(facets, region, db_type):
+    """(지역, 설문 타입) 추천 결과 비트마스크 (기존 추천 페이지 규칙과 동일)"""
+    mask = facets.mask("Region", region)
+    if facets.has("Type") and db_type:
+        target = str(db_type)
+        main_matches = mask & facets.mask("Type_main", target)
+        if facets.count(main_matches) >= MIN_MAIN_MATCHES:
+            mask = main_matches
+        else:
+            mask &= facets.mask("Type", target)
+    return mask
+
+
+class RecommendationLists:
+    def __init__(self, facets, place_ids, types=SURVEY_TYPES, regions=REGIONS):
+        self.facets = facets
+        self.place_ids = np.asarray(place_ids, dtype=object)
+        self._lists = {}
+        self._lock = threading.Lock()
+        # 설문을 건너뛴 경우(타입 없음)도 지역별로 함께 만들어 둠
+        for region in regions:
+            for db_type in (None,) + tuple(types):
+                self._lists[(db_type, region)] = self._build(db_type, region)
+
+    def _build(self, db_type, region):
+        positions = self.facets.positions(recommend_mask(self.facets, region, db_type)).astype(np.int32)
+        return positions, self.place_ids[positions]
+
+    def _entry(self, db_type, region):
+        key = (str(db_type) if db_type else None, region)
+        entry = self._lists.get(key)
+        if entry is None:
+            # 목록에 없는 타입 (시트에 새 타입이 생긴 경우 등) -> 한 번 계산해서 추가
+            with self._lock:
+                entry = self._lists.setdefault(key, self._build(*key))
+        return entry
+
+    def ids(self, db_type, region):
+        """추천 장소 ID (카탈로그 순서)"""
+        return self._entry(db_type, region)[1]
+
+    def take(self, df, db_type, region):
+        """추천 결과 행 (df는 이 목록을 만든 카탈로그 버전의 df)"""
+        return df.iloc[self._entry(db_type, region)[0]]
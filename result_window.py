@@ -0,0 +1,46 @@
+import streamlit as st
+
+# =========================================================
+# 결과 목록 윈도우 (보이는 만큼만 그리기)
+# =========================================================
+# 결과가 아무리 많아도 한 번에 page_size개만 그리고, "더 보기"를 누르면 page_size개씩 늘립니다.
+# - 필터 조건(reset_key)이 바뀌면 다시 처음 page_size개부터
+# - 전체 개수 표시는 그대로 (len(filtered_df))
+#
+# 사용 예)
+#   visible_df = result_window.visible_rows(filtered_df, "all", reset_key=필터상태)
+#   for idx, row in visible_df.iterrows(): ...
+#   result_window.show_more_button(len(filtered_df), "all", "더 보기")
+
+DEFAULT_PAGE_SIZE = 10
+
+
+def _limit_key(key):
+    return f"window_{key}"
+
+
+def visible_rows(df, key, reset_key=None, page_size=DEFAULT_PAGE_SIZE):
+    """df 중 지금 화면에 그릴 앞부분 (세션마다 '몇 개까지 펼쳤는지' 기억)"""
+    limit_key = _limit_key(key)
+    reset_state_key = f"{limit_key}_reset"
+    if limit_key not in st.session_state or st.session_state.get(reset_state_key) != reset_key:
+        st.session_state[reset_state_key] = reset_key
+        st.session_state[limit_key] = page_size
+    return df.iloc[:st.session_state[limit_key]]
+
+
+def _show_more(key, page_size):
+    st.session_state[_limit_key(key)] += page_size
+
+
+def show_more_button(total, key, label, page_size=DEFAULT_PAGE_SIZE):
+    """아직 그리지 않은 결과가 있으면 '더 보기 (보이는 개수/전체)' 버튼 표시"""
+    shown = min(st.session_state.get(_limit_key(key), page_size), total)
+    if shown < total:
+        st.button(
+            f"{label} ({shown}/{total})",
+            key=f"{_limit_key(key)}_more",
+            on_click=_show_more,
+            args=(key, page_size),
+            use_container_width=True,
+        )
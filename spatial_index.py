@@ -0,0 +1,171 @@
+import numpy as np
+
+# =========================================================
+# 좌표 -> 장소 검색용 공간 인덱스 (격자 버킷)
+# =========================================================
+# 지도 클릭 좌표로 장소를 찾을 때 df 전체의 lat/lon을 매번 비교하지 않도록,
+# 카탈로그를 불러올 때 한 번만 좌표를 격자 칸(cell)별로 나눠 둡니다.
+# - exact(): 마커 좌표 그대로 (lat, lon) -> 장소 ID (dict, O(1))
+# - nearest(): 클릭 좌표가 들어있는 칸부터 바깥쪽으로 한 겹씩 넓혀 가며 가장 가까운 장소 (거리는 하버사인)
+#   칸 크기가 일정하므로 보통 주변 몇 칸(수십 곳)만 계산 -> 장소 수와 거의 무관
+# - NeighborGraph: 장소마다 반경 안의 가까운 장소 top-k를 거리순으로 미리 계산 ("주변 장소" 목록)
+
+EARTH_RADIUS_M = 6_371_000
+CELL_DEG = 0.01  # 칸 한 변 (위도 약 1.1km)
+MAX_RINGS = 16   # 이만큼 넓혀도 못 찾으면 전체를 한 번에 계산
+NEIGHBOR_K = 8
+NEARBY_RADIUS_M = 3000
+BLOCK_ROWS = 512  # 거리 행렬을 이 행 수씩 나눠 계산 (장소가 많아도 메모리 일정)
+_METERS_PER_DEG = np.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat, lon, lats, lons):
+    """(lat, lon) 한 점에서 lats/lons 배열 각 점까지의 거리 (미터, 벡터 연산 / 열 벡터를 넣으면 거리 행렬)"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def format_distance(meters):
+    """850 -> '850 m', 1234 -> '1.2 km'"""
+    return f"{meters / 1000:.1f} km" if meters >= 1000 else f"{int(round(meters))} m"
+
+
+def _valid_mask(lats, lons):
+    # 좌표가 없거나(NaN) 0인 장소는 지도에 표시되지 않으므로 제외
+    return np.isfinite(lats) & np.isfinite(lons) & (lats != 0) & (lons != 0)
+
+
+class SpatialIndex:
+    def __init__(self, place_ids, lats, lons, cell_deg=CELL_DEG):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = _valid_mask(lats, lons)
+        self.ids = np.asarray(place_ids, dtype=object)[valid]
+        self.lats = lats[valid]
+        self.lons = lons[valid]
+        self.cell_deg = cell_deg
+
+        # 같은 좌표에 장소가 여러 개면 먼저 나온 장소 (카탈로그 순서)
+        self._exact = {}
+        for place_id, lat, lon in zip(self.ids, self.lats.tolist(), self.lons.tolist()):
+            self._exact.setdefault((lat, lon), place_id)
+
+        # 칸 번호 (행, 열) -> 그 칸에 들어있는 장소 위치 배열
+        rows = np.floor(self.lats / cell_deg).astype(np.int64)
+        cols = np.floor(self.lons / cell_deg).astype(np.int64)
+        buckets = {}
+        for i, cell in enumerate(zip(rows.tolist(), cols.tolist())):
+            buckets.setdefault(cell, []).append(i)
+        self._cells = {cell: np.array(positions, dtype=np.int64) for cell, positions in buckets.items()}
+        self._bounds = (int(rows.min()), int(rows.max()), int(cols.min()), int(cols.max())) if len(rows) else None
+
+    @classmethod
+    def from_df(cls, df, id_column):
+        if 'lat' not in df.columns or 'lon' not in df.columns or id_column not in df.columns:
+            return cls([], [], [])
+        return cls(df[id_column].tolist(), df['lat'].to_numpy(), df['lon'].to_numpy())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def exact(self, lat, lon):
+        """좌표가 정확히 일치하는 장소 ID (마커를 클릭하면 마커 좌표가 그대로 돌아옴)"""
+        return self._exact.get((float(lat), float(lon)))
+
+    def _ring(self, row, col, r):
+        """(row, col)에서 r칸 떨어진 테두리 칸들의 장소 위치"""
+        if r == 0:
+            cells = [(row, col)]
+        else:
+            cells = [(row + dr, col + dc) for dr in range(-r, r + 1) for dc in (-r, r)]
+            cells += [(row + dr, col + dc) for dr in (-r, r) for dc in range(-r + 1, r)]
+        found = [self._cells[cell] for cell in cells if cell in self._cells]
+        return np.concatenate(found) if found else None
+
+    def nearest(self, lat, lon, max_meters=None):
+        """가장 가까운 장소 ID (max_meters보다 멀면 None)"""
+        if not len(self):
+            return None
+        lat, lon = float(lat), float(lon)
+        row, col = int(np.floor(lat / self.cell_deg)), int(np.floor(lon / self.cell_deg))
+        # 한 칸의 가장 짧은 변 길이 (경도 방향은 위도에 따라 줄어듦)
+        # (주변 칸은 위도가 조금 다를 수 있어 1도 여유를 둔 보수적인 값)
+        cell_m = self.cell_deg * _METERS_PER_DEG * np.cos(np.radians(min(89.0, abs(lat) + 1.0)))
+        # 이 테두리를 넘어가면 더 이상 장소가 있는 칸이 없음
+        min_row, max_row, min_col, max_col = self._bounds
+        last_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+
+        best_id, best_m = None, np.inf
+        for r in range(last_ring + 1):
+            # r번째 테두리의 점은 최소 (r-1)칸 떨어져 있음 -> 이미 찾은 거리보다 멀면 중단
+            ring_min_m = max(0, r - 1) * cell_m
+            if ring_min_m > best_m or (max_meters is not None and ring_min_m > max_meters):
+                break
+            if r > MAX_RINGS and best_id is None:
+                # 주변 칸이 모두 비어 있음 (장소들과 멀리 떨어진 좌표) -> 전체를 한 번에 계산
+                distances = haversine_m(lat, lon, self.lats, self.lons)
+                k = int(np.argmin(distances))
+                best_id, best_m = self.ids[k], float(distances[k])
+                break
+            positions = self._ring(row, col, r)
+            if positions is None:
+                continue
+            distances = haversine_m(lat, lon, self.lats[positions], self.lons[positions])
+            k = int(np.argmin(distances))
+            if distances[k] < best_m:
+                best_id, best_m = self.ids[positions[k]], float(distances[k])
+
+        if max_meters is not None and best_m > max_meters:
+            return None
+        return best_id
+
+
+class NeighborGraph:
+    """장소(행 위치)별 반경 radius_m 안의 가까운 장소 최대 k개 (거리순, 카탈로그 로드 시 한 번 계산)"""
+
+    def __init__(self, lats, lons, k=NEIGHBOR_K, radius_m=NEARBY_RADIUS_M):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        self.radius_m = radius_m
+        valid_pos = np.flatnonzero(_valid_mask(lats, lons))
+        k = max(0, min(k, len(valid_pos) - 1))
+
+        # positions[i] = i번째 장소의 이웃 행 위치 (없는 칸은 -1), meters[i] = 그 거리
+        self.positions = np.full((len(lats), k), -1, dtype=np.int32)
+        self.meters = np.full((len(lats), k), np.inf, dtype=np.float32)
+        if k == 0:
+            return
+
+        v_lats, v_lons = lats[valid_pos], lons[valid_pos]
+        for start in range(0, len(valid_pos), BLOCK_ROWS):
+            block = valid_pos[start:start + BLOCK_ROWS]
+            # (블록 행 수 x 좌표 있는 장소 수) 거리 행렬을 한 번에 계산
+            dist = haversine_m(lats[block, None], lons[block, None], v_lats[None, :], v_lons[None, :])
+            dist[np.arange(len(block)), np.arange(start, start + len(block))] = np.inf  # 자기 자신 제외
+            dist[dist > radius_m] = np.inf
+
+            nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            nearest_m = np.take_along_axis(dist, nearest, axis=1)
+            order = np.argsort(nearest_m, axis=1, kind="stable")
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            nearest_m = np.take_along_axis(nearest_m, order, axis=1)
+
+            found = np.isfinite(nearest_m)
+            self.positions[block] = np.where(found, valid_pos[nearest], -1)
+            self.meters[block] = nearest_m
+
+    @classmethod
+    def from_df(cls, df, **options):
+        if 'lat' not in df.columns or 'lon' not in df.columns:
+            return cls([], [], **options)
+        return cls(df['lat'].to_numpy(), df['lon'].to_numpy(), **options)
+
+    def nearby(self, pos):
+        """pos번째 장소의 이웃 (행 위치 배열, 거리(m) 배열) - 가까운 순"""
+        if pos is None or pos >= len(self.positions):
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        row = self.positions[pos]
+        count = int((row >= 0).sum())
+        return row[:count], self.meters[pos][:count]
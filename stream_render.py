@@ -0,0 +1,76 @@
+import logging
+import time
+
+# =========================================================
+# 스트리밍 답변 화면 갱신 (묶어서 그리기)
+# =========================================================
+# 토큰(청크)이 올 때마다 placeholder.markdown(전체 답변 + "▌")을 부르면
+# 매번 지금까지의 답변 전체를 웹소켓으로 다시 보내고 브라우저가 다시 파싱합니다 (긴 답변에서 제곱 비례 트래픽).
+# - 청크는 리스트 버퍼에 모으고 (문자열 += 반복 X), 화면에는 묶어서 반영
+# - flush_interval초에 한 번 (초당 최대 1/flush_interval 번), 또는 문장이 끝났을 때 반영
+#   (문장 끝 반영도 flush_interval/2 이상 간격을 두어 전체 갱신 횟수는 계속 제한됨)
+# - 끝나면 커서 없이 최종 답변을 한 번 그리고, 청크 수 / 화면 갱신 수를 로그로 남김
+#
+# 사용 예)
+#   renderer = StreamRenderer(st.empty(), flush_interval=0.1)
+#   for chunk in stream:
+#       renderer.write(chunk.choices[0].delta.content)
+#   full_response = renderer.close()
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.1
+CURSOR = "▌"
+# 이 글자로 끝나는 청크가 오면 문장이 끝난 것으로 봄
+SENTENCE_ENDS = (".", "!", "?", "\n", "。", "！", "？")
+
+
+class StreamRenderer:
+    def __init__(self, placeholder, flush_interval=FLUSH_INTERVAL, cursor=CURSOR):
+        self.placeholder = placeholder
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.cursor = cursor
+        self.chunks = 0
+        self.flushes = 0
+        self._parts = []
+        self._pending = False
+        self._started = time.perf_counter()
+        self._last_flush = self._started
+
+    def text(self):
+        """지금까지 받은 답변 전체"""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def write(self, chunk):
+        """청크 하나 추가 (필요할 때만 화면 갱신)"""
+        if not chunk:
+            return
+        self._parts.append(chunk)
+        self.chunks += 1
+        self._pending = True
+
+        elapsed = time.perf_counter() - self._last_flush
+        if elapsed >= self.flush_interval or (
+            chunk.rstrip(" ").endswith(SENTENCE_ENDS) and elapsed >= self.flush_interval / 2
+        ):
+            self.flush()
+
+    def flush(self, final=False):
+        if not self._pending and not final:
+            return
+        self.placeholder.markdown(self.text() if final else self.text() + self.cursor)
+        self.flushes += 1
+        self._pending = False
+        self._last_flush = time.perf_counter()
+
+    def close(self):
+        """최종 답변을 커서 없이 그리고 전체 텍스트 반환"""
+        self.flush(final=True)
+        logger.info(f"Stream rendered: {self.chunks} chunks, {self.flushes} flushes, "
+                    f"{len(self.text())} chars in {time.perf_counter() - self._started:.1f}s")
+        return self.text()
+
+    def stats(self):
+        return {"chunks": self.chunks, "flushes": self.flushes, "chars": len(self.text())}
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import answer_cache
+from answer_cache import AnswerCache, cache_key, normalize_prompt
+
+
+class Clock:
+    """time.monotonic 대신 쓰는 수동 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_prompts_share_a_key():
+    assert normalize_prompt("  도톤보리   맛집!! ") == "도톤보리 맛집"
+    assert normalize_prompt("ＯＳＡＫＡ Food?") == "osaka food"
+    assert cache_key("osaka", "도톤보리 맛집!!", "SYS") == cache_key("osaka", "도톤보리  맛집", "SYS")
+    # 지역이나 system 프롬프트가 다르면 다른 키
+    assert cache_key("kyoto", "도톤보리 맛집", "SYS") != cache_key("osaka", "도톤보리 맛집", "SYS")
+    assert cache_key("osaka", "도톤보리 맛집", "SYS v2") != cache_key("osaka", "도톤보리 맛집", "SYS")
+
+
+def test_leader_stores_answer_and_next_request_hits():
+    cache = AnswerCache()
+    key = cache_key("osaka", "감기약 추천", "SYS")
+
+    assert cache.acquire(key) == (None, True)
+    cache.complete(key, "답변")
+
+    assert cache.acquire(key) == ("답변", False)
+    assert cache.stats() == {"entries": 1, "in_flight": 0, "hits": 1, "misses": 1, "coalesced": 0}
+
+
+def test_expired_answers_are_dropped(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", clock)
+    cache = AnswerCache(ttl=60)
+    cache.acquire("k")
+    cache.complete("k", "답변")
+
+    clock.now += 60
+    assert cache.get("k") == "답변"
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.acquire("k") == (None, True)
+
+
+def test_least_recently_used_answer_is_evicted():
+    cache = AnswerCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.acquire(key)
+        cache.complete(key, key.upper())
+
+    # a를 읽어서 최근 사용으로 -> c가 들어오면 b가 밀려남
+    assert cache.get("a") == "A"
+    cache.acquire("c")
+    cache.complete("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+
+def test_empty_answer_is_not_cached():
+    cache = AnswerCache()
+    cache.acquire("k")
+    cache.complete("k", "")
+
+    assert cache.stats()["in_flight"] == 0
+    assert cache.acquire("k") == (None, True)
+
+
+def test_concurrent_requests_share_one_upstream_call():
+    cache = AnswerCache(wait_timeout=5)
+    assert cache.acquire("k") == (None, True)
+
+    results = []
+    waiters = [threading.Thread(target=lambda: results.append(cache.acquire("k"))) for _ in range(4)]
+    for t in waiters:
+        t.start()
+    time.sleep(0.2)
+    assert results == []
+
+    cache.complete("k", "답변")
+    for t in waiters:
+        t.join(5)
+
+    assert results == [("답변", False)] * 4
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 4
+
+
+def test_abandon_promotes_one_waiter_to_leader():
+    cache = AnswerCache(wait_timeout=5)
+    assert cache.acquire("k") == (None, True)
+
+    results = []
+    lock = threading.Lock()
+
+    def waiter():
+        answer, leader = cache.acquire("k")
+        with lock:
+            results.append((answer, leader))
+        if leader:
+            cache.complete("k", "재시도 답변")
+
+    threads = [threading.Thread(target=waiter) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+
+    cache.abandon("k")
+    for t in threads:
+        t.join(5)
+
+    assert sorted(results, key=str) == sorted([(None, True)] + [("재시도 답변", False)] * 2, key=str)
+    assert cache.stats()["misses"] == 2
+
+
+def test_waiter_gives_up_after_timeout():
+    cache = AnswerCache(wait_timeout=0.05)
+    key = cache_key("osaka", "도톤보리 맛집", "SYS")
+    assert cache.acquire(key) == (None, True)
+
+    assert cache.acquire(key) == (None, False)
+    # leader는 여전히 진행 중
+    assert cache.stats()["in_flight"] == 1
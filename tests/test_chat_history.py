@@ -0,0 +1,130 @@
+import pytest
+
+import chat_history
+from chat_history import ChatHistory, count_tokens
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokens(monkeypatch):
+    # tiktoken 설치 여부와 무관하게 같은 토큰 수가 나오도록 근사치 사용
+    monkeypatch.setattr(chat_history, "_encoding", False)
+
+
+def conversation(turns, answer="답변 " * 20):
+    messages = []
+    for t in range(turns):
+        messages.append({"role": "user", "content": f"질문 {t}"})
+        messages.append({"role": "assistant", "content": answer})
+    return messages
+
+
+class Summarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous, folded, max_tokens):
+        self.calls.append((previous, list(folded), max_tokens))
+        return f"{previous} +{len(folded)}".strip()
+
+
+def test_count_tokens_approximation():
+    assert count_tokens("") == 0
+    assert count_tokens("안녕하세요") == 5
+    assert count_tokens("abcdefgh") == 2
+    assert count_tokens(None) == 0
+
+
+def test_short_conversation_is_sent_verbatim():
+    history = ChatHistory(max_turns=4, window_tokens=1000)
+    summarize = Summarizer()
+    messages = conversation(2) + [{"role": "user", "content": "지금 질문", "extra": 1}]
+
+    prompt = history.prompt("SYS", messages, summarize)
+
+    assert summarize.calls == []
+    assert prompt[0] == {"role": "system", "content": "SYS"}
+    assert prompt[1:] == [{"role": m["role"], "content": m["content"]} for m in messages]
+
+
+def test_overflow_folds_to_low_watermark_at_turn_boundary():
+    history = ChatHistory(max_turns=4, window_tokens=10_000)
+    summarize = Summarizer()
+    messages = conversation(4) + [{"role": "user", "content": "지금 질문"}]
+
+    prompt = history.prompt("SYS", messages, summarize)
+
+    # 5턴 > 4턴 -> 절반(2턴)까지 줄이면서 앞의 3턴(6개 메시지)을 한 번에 요약
+    assert len(summarize.calls) == 1
+    previous, folded, max_tokens = summarize.calls[0]
+    assert previous == "" and folded == messages[:6] and max_tokens == history.summary_tokens
+    assert history.start == 6
+    assert prompt[1]["role"] == "user"
+    assert prompt[-1]["content"] == "지금 질문"
+    assert prompt[0]["content"] == "SYS\n\n[이전 대화 요약]\n+6"
+
+
+def test_summary_recomputed_only_on_overflow_and_prompt_stays_bounded():
+    history = ChatHistory(max_turns=6, window_tokens=300)
+    summarize = Summarizer()
+    messages, sizes = [], []
+    for t in range(60):
+        messages.append({"role": "user", "content": f"질문 {t} " * 5})
+        prompt = history.prompt("SYS", messages, summarize)
+        sizes.append(sum(count_tokens(m["content"]) for m in prompt[1:]))
+        assert prompt[-1]["content"] == messages[-1]["content"]
+        messages.append({"role": "assistant", "content": "답변 " * 30})
+
+    assert 0 < len(summarize.calls) < 60 // 2
+    assert max(sizes) <= history.window_tokens
+    # 요약은 이전 요약을 이어받아 누적
+    assert summarize.calls[1][0] == f"+{len(summarize.calls[0][1])}"
+    assert history.stats()["summaries"] == len(summarize.calls)
+
+
+def test_single_long_message_is_never_dropped():
+    history = ChatHistory(max_turns=4, window_tokens=50)
+    messages = [{"role": "user", "content": "아주 긴 질문 " * 100}]
+
+    prompt = history.prompt("SYS", messages, Summarizer())
+
+    assert prompt[1:] == messages
+    assert history.start == 0
+
+
+def test_reset_when_conversation_is_cleared():
+    history = ChatHistory(max_turns=2, window_tokens=10_000)
+    summarize = Summarizer()
+    history.prompt("SYS", conversation(5) + [{"role": "user", "content": "q"}], summarize)
+    assert history.start > 0 and history.summary
+
+    prompt = history.prompt("SYS", [{"role": "user", "content": "새 대화"}], summarize)
+
+    assert history.start == 0 and history.summary == ""
+    assert prompt == [{"role": "system", "content": "SYS"}, {"role": "user", "content": "새 대화"}]
+
+
+def test_failed_summary_keeps_previous_summary_and_still_folds():
+    history = ChatHistory(max_turns=2, window_tokens=10_000)
+    history.summary = "이전 요약"
+
+    def failing(previous, folded, max_tokens):
+        raise RuntimeError("api down")
+
+    messages = conversation(4) + [{"role": "user", "content": "q"}]
+    prompt = history.prompt("SYS", messages, failing)
+
+    assert history.summary == "이전 요약"
+    assert history.start > 0
+    assert len(prompt) - 1 == len(messages) - history.start
+
+
+def test_summary_truncated_to_budget_keeping_the_end():
+    history = ChatHistory(max_turns=1, window_tokens=10_000, summary_tokens=20)
+
+    def long_summary(previous, folded, max_tokens):
+        return "가" * 100 + "끝"
+
+    history.prompt("SYS", conversation(3) + [{"role": "user", "content": "q"}], long_summary)
+
+    assert count_tokens(history.summary) <= 20
+    assert history.summary.endswith("끝")
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+
+import event_sink
+from event_sink import SheetEventSink
+
+
+class FakeWorksheet:
+    def __init__(self):
+        self.rows = []
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def write_spool(tmp_path, name, rows, partial=None):
+    path = tmp_path / f"{name}.jsonl"
+    with open(path, "wb") as f:
+        for row in rows:
+            f.write((json.dumps(row) + "\n").encode("utf-8"))
+        if partial is not None:
+            f.write(partial.encode("utf-8"))
+    return path
+
+
+def make_sink(tmp_path, open_worksheet, **options):
+    options.setdefault("batch_size", 10)
+    options.setdefault("flush_interval", 0.05)
+    return SheetEventSink(open_worksheet, name="Logs", spool_dir=str(tmp_path), **options)
+
+
+def read_offset(sink):
+    with open(sink.offset_path, encoding="utf-8") as f:
+        return int(f.read())
+
+
+def test_replay_sends_only_events_after_offset(tmp_path):
+    path = write_spool(tmp_path, "Logs", [["t1", "a"], ["t2", "b"], ["t3", "c"]], partial='["t4", "d')
+    first_line = len((json.dumps(["t1", "a"]) + "\n").encode("utf-8"))
+    (tmp_path / "Logs.jsonl.offset").write_text(str(first_line))
+
+    sheet = FakeWorksheet()
+    sink = make_sink(tmp_path, lambda: sheet)
+
+    assert wait_until(lambda: sink.sent == 2)
+    assert sheet.rows == [["t2", "b"], ["t3", "c"]]
+    # 쓰다가 끊긴 마지막 줄은 시작할 때 잘라내고 보내지 않음 -> 위치는 마지막 완전한 줄 끝
+    assert wait_until(lambda: read_offset(sink) == os.path.getsize(path))
+    assert path.read_bytes().endswith(b'["t3", "c"]\n')
+
+    # 잘라낸 뒤 들어온 이벤트는 앞줄에 붙지 않고 온전히 전송
+    sink.emit(["t5", "e"])
+    assert wait_until(lambda: sink.sent == 3)
+    assert sheet.rows[-1] == ["t5", "e"]
+
+
+def test_ack_compacts_fully_sent_spool(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_sink, "COMPACT_BYTES", 1)
+    sheet = FakeWorksheet()
+    sink = make_sink(tmp_path, lambda: sheet)
+
+    sink.emit(["t1", "a"])
+    sink.emit(["t2", "b"])
+
+    assert wait_until(lambda: sink.sent == 2)
+    assert wait_until(lambda: os.path.getsize(sink.spool_path) == 0)
+    assert read_offset(sink) == 0
+    assert sheet.rows == [["t1", "a"], ["t2", "b"]]
+
+
+def test_ack_keeps_spool_below_compact_size(tmp_path):
+    sheet = FakeWorksheet()
+    sink = make_sink(tmp_path, lambda: sheet)
+
+    sink.emit(["t1", "a"])
+
+    assert wait_until(lambda: sink.sent == 1)
+    assert wait_until(lambda: os.path.exists(sink.offset_path) and read_offset(sink) == os.path.getsize(sink.spool_path))
+    assert os.path.getsize(sink.spool_path) > 0
+
+
+def test_no_worksheet_keeps_events_in_spool_only(tmp_path):
+    sheet = None
+    sink = make_sink(tmp_path, lambda: sheet, recheck_interval=3600)
+
+    sink.emit(["t1", "a"])
+    assert wait_until(lambda: sink._spool_only and sink.pending() == 0)
+
+    for i in range(50):
+        sink.emit([f"t{i + 2}", "b"])
+    # 메모리 큐에는 쌓이지 않고 스풀 파일에만 기록
+    assert sink.pending() == 0
+    with open(sink.spool_path, "rb") as f:
+        assert len(f.readlines()) == 51
+
+    # 시트가 생긴 뒤 다시 확인하면 스풀에 쌓인 이벤트부터 모두 전송
+    sheet = FakeWorksheet()
+    sink.recheck_interval = 0
+    sink.emit(["t52", "c"])
+    assert wait_until(lambda: sink.sent == 52)
+    assert sheet.rows[0] == ["t1", "a"] and sheet.rows[-1] == ["t52", "c"]
+
+
+def test_queue_limit_spills_to_spool_and_resumes(tmp_path):
+    release = threading.Event()
+    sheet = FakeWorksheet()
+
+    def open_worksheet():
+        release.wait(5)
+        return sheet
+
+    sink = make_sink(tmp_path, open_worksheet, batch_size=1, max_queued=3)
+    rows = [[f"t{i}", "x"] for i in range(20)]
+    for row in rows:
+        sink.emit(row)
+
+    # 워커가 첫 배치를 들고 기다리는 동안 큐는 max_queued개를 넘지 않음
+    assert sink.pending() <= 3
+    release.set()
+
+    assert wait_until(lambda: sink.sent == 20)
+    assert sheet.rows == rows
+    assert not sink._spool_only
+
+
+def test_recheck_and_replay_run_on_worker_thread(tmp_path, monkeypatch):
+    sheet = None
+    sink = make_sink(tmp_path, lambda: sheet, recheck_interval=3600)
+    sink.emit(["t1", "a"])
+    assert wait_until(lambda: sink._spool_only and not sink._thread.is_alive())
+
+    replay_threads = []
+    replay = sink._replay
+
+    def recording_replay():
+        replay_threads.append(threading.current_thread().name)
+        return replay()
+
+    monkeypatch.setattr(sink, "_replay", recording_replay)
+    sheet = FakeWorksheet()
+    sink.recheck_interval = 0
+    sink.emit(["t2", "b"])
+
+    assert wait_until(lambda: sink.sent == 2)
+    assert replay_threads and set(replay_threads) == {"sheet-event-sink"}
+    assert not sink._spool_only
+
+
+def test_spool_stops_growing_at_max_bytes(tmp_path):
+    sink = make_sink(tmp_path, lambda: None, recheck_interval=3600, max_spool_bytes=200)
+    sink.emit(["t0", "a"])
+    assert wait_until(lambda: sink._spool_only)
+
+    for i in range(50):
+        sink.emit([f"t{i + 1}", "x" * 10])
+
+    assert os.path.getsize(sink.spool_path) <= 200
+    assert sink.dropped > 0
+    assert sink.pending() == 0
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from catalog_schema import MultiValueColumn
+from facet_index import FacetIndex, first_comma, hub_region, split_comma, split_hash
+
+
+def make_df():
+    return pd.DataFrame({
+        "Hub_KR": ["난바", "우메다", "교토역", "기온", ""],
+        "Type": ["근랜드, 조용", "원랜드", "조용", "모험, 근랜드", ""],
+        "Tag_KR": ["#공원 #산책", "#쇼핑", "#산책", "", "#야경 #공원"],
+    })
+
+
+def rows(index, mask):
+    return index.positions(mask).tolist()
+
+
+def test_tokenizers():
+    assert split_comma(" 자연 , 휴식,, ") == ["자연", "휴식"]
+    assert split_hash("#공원 #산책 #") == ["공원", "산책"]
+    assert first_comma("근랜드, 조용") == ["근랜드"]
+    assert first_comma("") == []
+    assert hub_region("오사카 난바") == ["osaka"]
+    assert hub_region("교토역") == ["kyoto"]
+
+
+def test_exact_masks_and_set_operations():
+    index = FacetIndex(make_df())
+
+    assert rows(index, index.mask("Region", "osaka")) == [0, 1]
+    assert rows(index, index.mask("Region", "kyoto")) == [2, 3]
+    assert rows(index, index.mask("Type", "근랜드")) == [0, 3]
+    assert rows(index, index.mask("Type_main", "근랜드")) == [0]
+    assert rows(index, index.mask("Tag_KR", "공원") & index.mask("Tag_KR", "산책")) == [0]
+    assert rows(index, index.any_of("Tag_KR", ["쇼핑", "야경"])) == [1, 4]
+    # 없는 값 / 없는 facet은 빈 마스크
+    assert index.mask("Type", "없음") == 0
+    assert index.mask("Group_KR", "x") == 0
+    assert not index.has("Group_KR")
+
+
+def test_contains_matches_substrings_and_is_cached():
+    index = FacetIndex(make_df())
+
+    first = index.mask_contains("Tag_KR", "산")
+    assert rows(index, first) == [0, 2]
+    assert index.mask_contains("Tag_KR", "산") is first
+
+
+def test_bool_and_positions_round_trip():
+    index = FacetIndex(make_df())
+    mask = index.mask("Region", "kyoto")
+
+    assert index.to_bool(mask).tolist() == [False, False, True, True, False]
+    assert index.count(mask) == 2
+    assert index.count(index.all_rows) == 5
+    assert index.positions(0).size == 0
+    assert index.take(make_df(), mask)["Hub_KR"].tolist() == ["교토역", "기온"]
+
+
+def test_precompiled_multi_values_match_string_split():
+    df = make_df()
+    multi_values = {
+        "Type": MultiValueColumn(df["Type"].tolist(), ","),
+        "Tag_KR": MultiValueColumn(df["Tag_KR"].tolist(), "#"),
+    }
+    from_strings = FacetIndex(df)
+    from_codes = FacetIndex(df, multi_values)
+
+    for facet in ("Type", "Tag_KR"):
+        assert sorted(from_codes.values(facet)) == sorted(from_strings.values(facet))
+        for value in from_strings.values(facet):
+            assert from_codes.mask(facet, value) == from_strings.mask(facet, value)
+
+
+def test_large_index_bit_positions():
+    # 8의 배수가 아닌 행 수에서도 마지막 비트까지 정확히
+    n = 1003
+    df = pd.DataFrame({"Type": ["a" if i % 7 == 0 else "b" for i in range(n)]})
+    index = FacetIndex(df)
+
+    expected = np.flatnonzero(np.arange(n) % 7 == 0)
+    assert np.array_equal(index.positions(index.mask("Type", "a")), expected)
+    assert index.count(index.mask("Type", "a") | index.mask("Type", "b")) == n
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+from PIL import Image
+
+import image_assets
+from image_assets import ImageManifest
+
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    # images/, static/ 는 현재 폴더 기준 상대 경로
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(image_assets, "IMAGE_SERVING", "static")
+    # 이미지별 항목은 (상대 경로, 수정 시각)으로 프로세스 전체가 공유 -> 테스트마다 비움
+    monkeypatch.setattr(image_assets, "_entries", {})
+    os.makedirs("images")
+    for name in ("Gion", "Namba"):
+        Image.new("RGB", (1600, 1200), (100, 150, 200)).save(f"images/{name}.jpg")
+    with open("images/Broken.jpg", "w") as f:
+        f.write("not an image")
+    return tmp_path
+
+
+def variant_files():
+    if not os.path.isdir(image_assets.VARIANT_DIR):
+        return []
+    return sorted(os.listdir(image_assets.VARIANT_DIR))
+
+
+def test_manifest_reads_metadata_without_encoding(image_dir):
+    manifest = ImageManifest(["1", "2", "3", "4"], ["Gion", "Namba", "Broken", "Nara"])
+
+    assert manifest.places == {"1": "Gion", "2": "Namba", "3": "Broken"}
+    assert manifest.missing == ["4"]
+    assert manifest.assets["Gion"]["size"] == (1600, 1200)
+    assert manifest.assets["Broken"]["size"] == (0, 0)
+    assert variant_files() == []
+    assert manifest.assets["Gion"]["variants"][120] == [None, None]
+
+
+def test_src_attrs_builds_only_the_requested_height(image_dir):
+    manifest = ImageManifest(["1"], ["Gion"])
+
+    attrs = manifest.src_attrs("Gion", "120px")
+
+    assert attrs.startswith('src="app/static/img/') and " 2x" in attrs
+    assert variant_files() == ["Gion_h120@1x.webp", "Gion_h120@2x.webp"]
+    assert manifest.src_attrs("Gion", "120px") is attrs
+    assert manifest.src_attrs(None, "120px") is None
+
+
+def test_warm_builds_missing_variants_in_background(image_dir):
+    manifest = ImageManifest(["1", "2", "3"], ["Gion", "Namba", "Broken"])
+
+    thread = manifest.warm()
+    assert thread.name == "image-variant-warm"
+    thread.join(30)
+
+    # 열 수 없는 파일은 건너뜀
+    sizes = len(image_assets.DISPLAY_SIZES) * len(image_assets.SCALES)
+    assert len(variant_files()) == 2 * sizes
+    assert all(all(paths) for paths in manifest.assets["Gion"]["variants"].values())
+
+    # 새 매니페스트는 이미 있는 변형본을 그대로 사용 -> warm할 것이 없음
+    image_assets._entries.clear()  # (fixture가 바꿔 둔 dict)
+    again = ImageManifest(["1", "2"], ["Gion", "Namba"])
+    assert not again.warm().is_alive()
+    assert again.assets["Gion"]["variants"][350][0].endswith("Gion_h350@1x.webp")
+
+
+def test_server_base_url_requires_address_for_remote_binding():
+    assert image_assets.server_base_url("127.0.0.1", 8600, "") == "http://localhost:8600"
+    assert image_assets.server_base_url("0.0.0.0", 8600, "https://img.example.com") == "https://img.example.com"
+    # 외부 주소에 열면서 브라우저용 주소가 없으면 깨진 localhost URL 대신 바로 실패
+    with pytest.raises(ValueError):
+        image_assets.server_base_url("0.0.0.0", 8600, "")
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import time
+
+from log_store import LogStore
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def make_store(tmp_path, **options):
+    options.setdefault("flush_interval", 3600)
+    return LogStore("chat", log_dir=str(tmp_path), **options)
+
+
+def test_records_round_trip_in_order(tmp_path):
+    store = make_store(tmp_path)
+    for i in range(5):
+        store.write({"i": i, "text": "안녕"})
+
+    records = list(store.read_records())
+    assert [r["i"] for r in records] == [0, 1, 2, 3, 4]
+    assert records[0]["text"] == "안녕"
+    store.close()
+
+
+def test_rotates_by_size_and_compresses_old_segments(tmp_path):
+    store = make_store(tmp_path, max_bytes=200)
+    for i in range(20):
+        store.write({"i": i, "pad": "x" * 40})
+    store.flush()
+
+    def compacted():
+        segments = store.segments()
+        return len(segments) > 1 and all(p.endswith(".gz") for p in segments[:-1])
+
+    assert wait_until(compacted)
+    segments = store.segments()
+    assert segments[-1] == store.current_path() and segments[-1].endswith(".jsonl")
+    for path in segments[:-1]:
+        with gzip.open(path, "rb") as f:
+            assert all(line.endswith(b"\n") for line in f)
+    # 교체 / 압축을 거쳐도 기록 순서와 개수는 그대로
+    assert [r["i"] for r in store.read_records()] == list(range(20))
+    store.close()
+
+
+def test_keeps_at_most_max_segments_compressed(tmp_path):
+    store = make_store(tmp_path, max_bytes=60, max_segments=2)
+    for i in range(10):
+        store.write({"i": i, "pad": "x" * 40})
+    store.flush()
+
+    def trimmed():
+        segments = store.segments()
+        compressed = [p for p in segments if p.endswith(".gz")]
+        plain = [p for p in segments if p.endswith(".jsonl")]
+        return len(compressed) <= 2 and plain == [store.current_path()]
+
+    assert wait_until(trimmed)
+    # 가장 최근 기록은 남아 있음
+    assert [r["i"] for r in store.read_records()][-1] == 9
+    store.close()
+
+
+def test_reopens_current_segment_after_restart(tmp_path):
+    store = make_store(tmp_path)
+    store.write({"i": 0})
+    store.close()
+    path = store.current_path()
+
+    reopened = make_store(tmp_path)
+    reopened.write({"i": 1})
+    assert reopened.current_path() == path
+    assert [r["i"] for r in reopened.read_records()] == [0, 1]
+    reopened.close()
+    with open(path, "rb") as f:
+        assert [json.loads(line)["i"] for line in f] == [0, 1]
+    assert os.path.getsize(path) > 0
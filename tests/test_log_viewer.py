@@ -0,0 +1,114 @@
+import gzip
+import json
+import os
+
+from log_viewer import LogViewer, SegmentIndex
+
+
+def write_lines(path, records, partial=None, compress=False):
+    data = b"".join((json.dumps(r) + "\n").encode("utf-8") for r in records)
+    if partial is not None:
+        data += partial.encode("utf-8")
+    opener = gzip.open if compress else open
+    with opener(path, "wb") as f:
+        f.write(data)
+
+
+class FakeStore:
+    """LogStore 대신 세그먼트 경로 목록만 돌려주는 저장소"""
+
+    def __init__(self, paths):
+        self.paths = paths
+
+    def flush(self):
+        pass
+
+    def segments(self):
+        return [p for p in self.paths if os.path.exists(p)]
+
+    def read_records(self):
+        for path in self.segments():
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rb") as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def records(start, stop):
+    return [{"Time": f"2025-01-01 00:{i:02d}:00", "i": i} for i in range(start, stop)]
+
+
+def test_segment_index_offsets_skip_partial_line(tmp_path):
+    path = str(tmp_path / "a.jsonl")
+    write_lines(path, records(0, 3), partial='{"i": 3')
+    index = SegmentIndex(path)
+    index.refresh()
+
+    assert len(index) == 3
+    assert index.offsets[-1] == os.path.getsize(path) - len('{"i": 3')
+    assert [r["i"] for r in index.read(1, 3)] == [1, 2]
+
+    # 끝에 새 줄이 붙으면 그 부분만 이어서 인덱싱
+    with open(path, "ab") as f:
+        f.write(b', "Time": "x"}\n')
+    index.refresh()
+    assert len(index) == 4
+    assert index.read(3, 4) == [{"i": 3, "Time": "x"}]
+
+
+def test_pages_span_compressed_and_plain_segments(tmp_path):
+    old = str(tmp_path / "chat-1.jsonl.gz")
+    current = str(tmp_path / "chat-2.jsonl")
+    write_lines(old, records(0, 7), compress=True)
+    write_lines(current, records(7, 12))
+    viewer = LogViewer(FakeStore([old, current]))
+
+    assert viewer.refresh() == 12
+    assert [r["i"] for r in viewer.read(5, 9)] == [5, 6, 7, 8]
+    assert [r["i"] for r in viewer.page_from_tail(0, 5)] == [7, 8, 9, 10, 11]
+    assert [r["i"] for r in viewer.page_from_tail(2, 5)] == [0, 1]
+    assert viewer.num_pages(5) == 3
+    assert viewer.read(-3, 2) == records(0, 2)
+    assert viewer.read(10, 100) == records(10, 12)
+
+
+def test_refresh_picks_up_appended_lines_and_removed_segments(tmp_path):
+    old = str(tmp_path / "chat-1.jsonl")
+    current = str(tmp_path / "chat-2.jsonl")
+    write_lines(old, records(0, 3))
+    write_lines(current, records(3, 5))
+    viewer = LogViewer(FakeStore([old, current]))
+    assert viewer.refresh() == 5
+
+    with open(current, "ab") as f:
+        f.write((json.dumps(records(5, 6)[0]) + "\n").encode("utf-8"))
+    os.remove(old)
+
+    assert viewer.refresh() == 3
+    assert [r["i"] for r in viewer.read(0, 3)] == [3, 4, 5]
+
+
+def test_seek_time_and_time_range(tmp_path):
+    path = str(tmp_path / "chat-1.jsonl")
+    write_lines(path, records(0, 20))
+    viewer = LogViewer(FakeStore([path]))
+    viewer.refresh()
+
+    assert viewer.seek_time("2025-01-01 00:05:00") == 5
+    assert viewer.seek_time("2025-01-01 00:05:30") == 6
+    assert viewer.seek_time("2000") == 0
+    assert viewer.seek_time("2999") == 20
+
+    rows, total = viewer.time_range("2025-01-01 00:03:00", "2025-01-01 00:10:00", limit=4)
+    assert total == 7
+    assert [r["i"] for r in rows] == [3, 4, 5, 6]
+
+
+def test_export_csv_reads_all_records(tmp_path):
+    path = str(tmp_path / "chat-1.jsonl")
+    write_lines(path, records(0, 2))
+    viewer = LogViewer(FakeStore([path]))
+
+    csv_bytes = viewer.export_csv(["Time", "i"])
+    lines = csv_bytes.decode("utf-8-sig").splitlines()
+    assert lines == ["Time,i", "2025-01-01 00:00:00,0", "2025-01-01 00:01:00,1"]
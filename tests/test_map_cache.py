@@ -0,0 +1,42 @@
+import pandas as pd
+
+from catalog_schema import Catalog
+from map_cache import DetailMapCache, build_detail_map
+
+
+def make_catalog():
+    # 난바 주변 3곳 (같은 구역 1곳은 반경 밖) + 교토 1곳
+    df = pd.DataFrame({
+        "Place_ID": ["namba", "dotonbori", "shinsaibashi", "far_zone", "gion"],
+        "Name_KR": ["난바", "도톤보리", "신사이바시", "먼 곳", "기온"],
+        "Name_EN": ["Namba", "Dotonbori", "Shinsaibashi", "Far", "Gion"],
+        "Zone": ["미나미", "미나미", "신사이바시", "미나미", "기온"],
+        "lat": [34.6655, 34.6687, 34.6750, 34.80, 35.0037],
+        "lon": [135.5006, 135.5013, 135.5010, 135.50, 135.7788],
+    })
+    return Catalog(df, {}, [])
+
+
+def marker_ids(cache, place_id):
+    pos = cache.catalog.id_to_pos[place_id]
+    _, markers = build_detail_map(cache.catalog.df, pos, "Name_EN", cache._nearby(place_id, pos))
+    return set(markers.values()) - {place_id}
+
+
+def test_detail_map_plots_the_same_places_as_the_nearby_list():
+    catalog = make_catalog()
+    cache = DetailMapCache(catalog)
+
+    nearby, _ = catalog.nearby("namba")
+    assert set(nearby["Place_ID"]) == {"dotonbori", "shinsaibashi"}
+    # 같은 구역이라도 반경 밖 장소는 지도에도 없고, 구역이 달라도 가까운 장소는 지도에 있음
+    assert marker_ids(cache, "namba") == {"dotonbori", "shinsaibashi"}
+
+
+def test_detail_map_falls_back_to_same_zone_without_neighbors():
+    catalog = make_catalog()
+    cache = DetailMapCache(catalog)
+
+    assert len(catalog.nearby("gion")[0]) == 0
+    assert marker_ids(cache, "gion") == set()
+    assert marker_ids(cache, "far_zone") == {"namba", "dotonbori"}
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+import place_search
+from locales import PlaceCard
+from place_search import PlaceSearchIndex, format_places, tokenize
+
+
+def make_df():
+    return pd.DataFrame({
+        "Name_KR": ["도톤보리 라멘", "우메다 공중정원", "기온 거리", "난바 스시", "교토 라멘 골목"],
+        "Name_EN": ["Dotonbori Ramen", "Umeda Sky Building", "Gion Street", "Namba Sushi", "Kyoto Ramen Alley"],
+        "Tag_KR": ["#라멘 #야식", "#전망대 #야경", "#산책 #전통", "#스시", "#라멘"],
+        "Area_KR": ["오사카", "오사카", "교토", "오사카", "교토"],
+        "Description_KR": ["도톤보리 근처 인기 라멘집", "우메다 근처 전망대", "기온 근처 전통 거리", "난바 근처 스시", "교토역 근처 라멘 골목"],
+    })
+
+
+def test_tokenize_bigrams_and_words():
+    assert tokenize("도톤보리에서") == ["도톤", "톤보", "보리", "리에", "에서"]
+    assert tokenize("Ramen, 2 days!") == ["ramen", "2", "days"]
+    # 한 글자 한글은 그대로, 한 글자 영문은 제외
+    assert tokenize("역 a") == ["역"]
+    assert tokenize("ＵＳＪ") == ["usj"]
+
+
+def test_search_ranks_best_match_first():
+    index = PlaceSearchIndex(make_df())
+
+    results = index.search("도톤보리 라멘")
+    assert results[0] == 0
+    assert set(results) <= {0, 4}
+    assert index.search("umeda sky") == [1]
+    # 조사가 붙어도 2-gram으로 매칭
+    assert index.search("기온에서 산책")[0] == 2
+
+
+def test_allowed_mask_limits_results():
+    df = make_df()
+    index = PlaceSearchIndex(df)
+    kyoto = (df["Area_KR"] == "교토").to_numpy()
+
+    assert index.search("라멘", allowed=kyoto) == [4]
+    # 허용된 장소 중에 맞는 곳이 없으면 빈 목록
+    assert index.search("스시", allowed=kyoto) == []
+
+
+def test_low_scores_are_cut_by_min_score_ratio(monkeypatch):
+    index = PlaceSearchIndex(make_df())
+    query = "도톤보리 라멘 근처"
+    scores = index.scores(query)
+
+    results = index.search(query, k=5)
+    assert results == sorted(results, key=lambda p: -scores[p])
+    assert all(scores[p] >= scores.max() * place_search.MIN_SCORE_RATIO for p in results)
+    # "근처"만 겹친 장소는 1등 점수에 한참 못 미쳐서 제외
+    assert 1 not in results and 3 not in results
+
+    # 비율을 0으로 낮추면 점수가 있는 장소는 모두 포함
+    monkeypatch.setattr(place_search, "MIN_SCORE_RATIO", 0)
+    assert sorted(index.search(query, k=5)) == np.flatnonzero(scores > 0).tolist()
+
+
+def test_top_k_and_no_match():
+    index = PlaceSearchIndex(make_df())
+
+    assert len(index.search("근처", k=2)) == 2
+    assert index.search("없는장소xyz") == []
+    assert index.search("") == []
+    assert PlaceSearchIndex(make_df().iloc[:0]).search("라멘") == []
+
+
+def test_format_places():
+    cards = [
+        PlaceCard("도톤보리 라멘", "", "인기 라멘집", "오사카", "식당", "#라멘", "30 min", "https://maps.example/1"),
+        PlaceCard("기온 거리", "", "", "", "", "", "", ""),
+    ]
+
+    assert format_places(cards) == (
+        "- 도톤보리 라멘 (오사카 / 식당): 인기 라멘집 #라멘\n"
+        "  구글맵: https://maps.example/1\n"
+        "- 기온 거리"
+    )
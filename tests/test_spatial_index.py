@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+import spatial_index
+from spatial_index import NeighborGraph, SpatialIndex, format_distance, haversine_m
+
+# 오사카 / 교토 주변 실제 좌표 몇 곳
+PLACES = {
+    "namba": (34.6655, 135.5006),
+    "dotonbori": (34.6687, 135.5013),
+    "umeda": (34.7025, 135.4959),
+    "kyoto_st": (34.9858, 135.7588),
+    "gion": (35.0037, 135.7788),
+}
+
+
+def make_index(places=PLACES):
+    ids = list(places)
+    lats = [places[i][0] for i in ids]
+    lons = [places[i][1] for i in ids]
+    return SpatialIndex(ids, lats, lons)
+
+
+def brute_force_nearest(lat, lon, places=PLACES):
+    return min(places, key=lambda i: float(haversine_m(lat, lon, places[i][0], places[i][1])))
+
+
+def test_haversine_and_format_distance():
+    # 난바 -> 우메다 약 4 km
+    meters = float(haversine_m(*PLACES["namba"], *PLACES["umeda"]))
+    assert 3900 < meters < 4300
+    assert format_distance(850) == "850 m"
+    assert format_distance(1234) == "1.2 km"
+
+
+def test_exact_lookup_and_invalid_coordinates_skipped():
+    index = SpatialIndex(["a", "b", "c", "d"], [34.6655, 0, np.nan, 34.6655], [135.5006, 135.5, 135.5, 135.5006])
+
+    assert len(index) == 2
+    # 좌표가 같으면 카탈로그 순서상 먼저 나온 장소
+    assert index.exact(34.6655, 135.5006) == "a"
+    assert index.exact(0, 135.5) is None
+
+
+@pytest.mark.parametrize("name", list(PLACES))
+def test_nearest_returns_marker_itself(name):
+    index = make_index()
+    assert index.nearest(*PLACES[name]) == name
+
+
+def test_nearest_matches_brute_force_on_random_points():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(34.6, 35.1, 300)
+    lons = rng.uniform(135.4, 135.9, 300)
+    places = {f"p{i}": (lat, lon) for i, (lat, lon) in enumerate(zip(lats, lons))}
+    index = make_index(places)
+
+    for lat, lon in zip(rng.uniform(34.5, 35.2, 50), rng.uniform(135.3, 136.0, 50)):
+        assert index.nearest(lat, lon) == brute_force_nearest(lat, lon, places)
+
+
+def test_nearest_respects_max_meters_and_far_queries():
+    index = make_index()
+    namba_lat, namba_lon = PLACES["namba"]
+
+    # 약 11 m 떨어진 클릭은 15 m 안, 100 m 떨어진 클릭은 밖
+    assert index.nearest(namba_lat + 0.0001, namba_lon, max_meters=15) == "namba"
+    assert index.nearest(namba_lat - 0.0009, namba_lon, max_meters=15) is None
+    # 격자 칸이 모두 빈 먼 좌표도 전체 계산으로 찾음
+    assert index.nearest(33.0, 134.0) == brute_force_nearest(33.0, 134.0)
+    assert SpatialIndex([], [], []).nearest(34.0, 135.0) is None
+
+
+def test_neighbor_graph_sorted_within_radius_excluding_self():
+    ids = list(PLACES)
+    lats = np.array([PLACES[i][0] for i in ids] + [np.nan])
+    lons = np.array([PLACES[i][1] for i in ids] + [np.nan])
+    graph = NeighborGraph(lats, lons, k=3, radius_m=5000)
+
+    positions, meters = graph.nearby(ids.index("namba"))
+    # 5 km 안: 도톤보리(~360 m), 우메다(~4 km) / 교토는 반경 밖
+    assert [ids[p] for p in positions] == ["dotonbori", "umeda"]
+    assert np.all(np.diff(meters) >= 0)
+    assert np.allclose(meters, [haversine_m(*PLACES["namba"], *PLACES[ids[p]]) for p in positions], rtol=1e-5)
+
+    # 좌표가 없는 장소 / 범위 밖 위치 / None 은 빈 결과
+    for pos in (len(ids), 99, None):
+        positions, meters = graph.nearby(pos)
+        assert len(positions) == 0 and len(meters) == 0
+
+
+def test_neighbor_graph_matches_brute_force_across_blocks(monkeypatch):
+    # 블록 경계를 여러 번 넘도록 블록 크기를 줄임
+    monkeypatch.setattr(spatial_index, "BLOCK_ROWS", 7)
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(34.6, 34.75, 40)
+    lons = rng.uniform(135.45, 135.6, 40)
+    graph = NeighborGraph(lats, lons, k=4, radius_m=4000)
+
+    for pos in range(len(lats)):
+        distances = haversine_m(lats[pos], lons[pos], lats, lons)
+        distances[pos] = np.inf
+        expected = [p for p in np.argsort(distances, kind="stable")[:4] if distances[p] <= 4000]
+        positions, _ = graph.nearby(pos)
+        assert positions.tolist() == expected
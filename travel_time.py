@@ -0,0 +1,69 @@
+import numpy as np
+
+# =========================================================
+# 숙소(허브) 기준 소요 시간 계산 엔진
+# =========================================================
+# 기존 calculate_total_time()을 행마다 apply하던 방식 대신,
+# 데이터 로드 시점에 "모든 숙소 허브 x 모든 장소"의 총 소요 시간을 한 번에 계산해 둡니다.
+# -> 숙소를 바꾸면 미리 계산된 열(column) 하나만 꺼내면 됨
+
+# 허브 순서 = 코드 번호 (0: 난바, 1: 우메다, 2: 교토역)
+HUBS = ["난바", "우메다", "교토역"]
+
+# 한국어/영어 허브 이름 -> 허브 코드
+HUB_CODES = {
+    "난바": 0, "Namba": 0,
+    "우메다": 1, "Umeda": 1,
+    "교토역": 2, "Kyoto Station": 2,
+}
+
+# 허브 간 이동 시간 (분) - 기존 if/elif 규칙과 동일
+TRANSIT_MINUTES = np.array([
+    [0, 20, 50],   # 난바
+    [20, 0, 30],   # 우메다
+    [50, 30, 0],   # 교토역
+], dtype=np.int32)
+
+# 소요 시간 필터 구간 (min < Total_Time <= max), UI 옵션 순서와 동일
+# 0: 30분 이내 / 1: 30분~1시간 / 2: 1시간~2시간
+TIME_BUCKETS = [(None, 30), (30, 60), (60, 120)]
+
+
+def hub_code(name):
+    """허브 이름 -> 코드 (모르는 허브는 -1)"""
+    return HUB_CODES.get(str(name).strip(), -1)
+
+
+class TravelTimeTable:
+    def __init__(self, place_hubs, deep_times):
+        place_codes = np.array([hub_code(h) for h in place_hubs], dtype=np.int8)
+        deep = np.asarray(deep_times, dtype=np.int32)
+
+        # transit[i, h] = 장소 i의 허브 -> 사용자 허브 h 이동 시간
+        # (허브를 알 수 없는 장소는 기존 로직처럼 이동 시간 0)
+        transit = np.zeros((len(place_codes), len(HUBS)), dtype=np.int32)
+        known = place_codes >= 0
+        transit[known] = TRANSIT_MINUTES[place_codes[known]]
+
+        # total[i, h] = 사용자가 허브 h에 묵을 때 장소 i까지의 총 소요 시간
+        self.deep = deep
+        self.total = transit + deep[:, None]
+
+    def for_hub(self, user_hub):
+        """사용자 숙소 기준 Total_Time 배열 (모르는 허브면 이동 시간 없이 Deep_Time만)"""
+        code = hub_code(user_hub)
+        if code < 0:
+            return self.deep
+        return self.total[:, code]
+
+    def bucket_mask(self, user_hub, bucket_ids):
+        """선택한 시간 구간들 중 하나에 속하는 장소 (bool 배열)"""
+        total = self.for_hub(user_hub)
+        mask = np.zeros(len(total), dtype=bool)
+        for bucket_id in bucket_ids:
+            low, high = TIME_BUCKETS[bucket_id]
+            in_bucket = total <= high
+            if low is not None:
+                in_bucket &= total > low
+            mask |= in_bucket
+        return mask